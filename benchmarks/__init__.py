@@ -0,0 +1 @@
+"""Benchmarks for Library Management System"""
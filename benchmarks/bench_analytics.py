@@ -0,0 +1,56 @@
+"""Benchmark: circulation reports on a large catalog
+
+For each record count a seeded catalog (N books, N // 10 members, N // 20
+loans) is loaded into a dict-backed and a columnar Library, then the
+benchmark times circulation_report() (answered from the incremental
+counters), adhoc_report() (a pass over a columnar snapshot, or a plain
+loop over a dict of books) and, for comparison, the same ad-hoc count
+written as a loop over lib.books.
+
+Usage:
+    python benchmarks/bench_analytics.py [N ...]    (default: 10000 100000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.catalog import EPOCH, generate_catalog
+from library_system.services.library import Library
+
+def best_time(fn, repeat=5):
+    """Return the best wall time of fn() over repeat calls, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def loop_report(lib):
+    """Count overdue books per author by iterating over every book"""
+    counts = Counter()
+    for book in lib.books.values():
+        if book.due_at is not None and book.due_at < EPOCH:
+            counts[book.author] += 1
+    return counts.most_common(10)
+
+def main(sizes):
+    print(f"{'records':>8} {'books':>9} {'top-k ms':>9} {'ad-hoc ms':>10} {'loop ms':>8}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            generate_catalog(data_dir, n, n // 10, n // 20)
+            for name, columnar in (("dict", False), ("columnar", True)):
+                lib = Library(data_dir=data_dir, columnar=columnar)
+                assert lib.adhoc_report("author", "overdue", now=EPOCH) == loop_report(lib)
+                top_k = best_time(lib.circulation_report)
+                adhoc = best_time(lambda: lib.adhoc_report("author", "overdue", now=EPOCH))
+                loop = best_time(lambda: loop_report(lib))
+                print(f"{n:>8} {name:>9} {top_k * 1000:>9.2f} {adhoc * 1000:>10.1f} {loop * 1000:>8.1f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
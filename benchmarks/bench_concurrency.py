@@ -0,0 +1,108 @@
+"""Benchmark: checkout throughput of a threadsafe Library as threads are added
+
+Each thread is one desk serving its own member: it borrows a random book
+and returns it again, so desks only contend when they pick the same book.
+Each backend runs with synchronous writes and with a 50 ms group commit
+("+gc"), and the p50/p99 latency of borrow_book is reported.
+
+Usage:
+    python benchmarks/bench_concurrency.py [THREADS ...]    (default: 1 2 4 8 16)
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library_system.services.library import Library
+from library_system.storage import SqliteStorage
+
+BOOKS = 2000
+OPS_PER_THREAD = 2000  # Borrow/return attempts per desk
+
+GROUP_COMMIT = 0.05  # Window of the "+gc" runs, in seconds
+
+def open_library(backend, data_dir):
+    """Open a threadsafe Library on a fresh data directory"""
+    name, _, group_commit = backend.partition("+")
+    options = {"threadsafe": True, "group_commit": GROUP_COMMIT if group_commit else None}
+    if name == "sqlite":
+        storage = SqliteStorage(os.path.join(data_dir, "library.db"))
+        return Library(data_dir=data_dir, storage=storage, **options)
+    return Library(data_dir=data_dir, journaled=True, compact_threshold=1 << 40, **options)
+
+def run(backend, threads):
+    """
+    Run one measurement
+    
+    Returns:
+        (operations per second, failed attempts, sorted borrow latencies,
+        mean records per flush or None)
+    """
+    with tempfile.TemporaryDirectory() as data_dir:
+        lib = open_library(backend, data_dir)
+        books = lib.add_books([(f"Book {i}", "Author", str(i)) for i in range(BOOKS)])
+        members = lib.add_members([(f"Desk {i}", f"desk{i}@example.com") for i in range(threads)])
+        book_ids = [book.book_id for book in books]
+        failures = [0] * threads
+        latencies = [[] for _ in range(threads)]
+        barrier = threading.Barrier(threads + 1)
+        
+        def desk(n):
+            rng = random.Random(n)
+            member_id = members[n].user_id
+            barrier.wait()
+            for _ in range(OPS_PER_THREAD // 2):
+                book_id = rng.choice(book_ids)
+                start = time.perf_counter()
+                borrowed = lib.borrow_book(member_id, book_id)
+                latencies[n].append(time.perf_counter() - start)
+                if not borrowed:
+                    failures[n] += 1
+                    continue
+                lib.return_book(member_id, book_id)
+        
+        pool = [threading.Thread(target=desk, args=(n,)) for n in range(threads)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            for thread in pool:
+                thread.start()
+            barrier.wait()
+            start = time.perf_counter()
+            for thread in pool:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        
+        # Invariant: every book is back on the shelf and no member holds one
+        assert lib.count_available_books() == BOOKS
+        assert not any(member.borrowed_books for member in lib.list_all_members())
+        lib.flush()
+        stats = lib.write_stats()
+        lib.close()
+        ops = (threads * OPS_PER_THREAD - sum(failures)) / elapsed
+        per_flush = stats["mean_per_flush"] if stats else None
+        return ops, sum(failures), sorted(sum(latencies, [])), per_flush
+
+def percentile(samples, fraction):
+    """Return the given percentile of a sorted list"""
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+def main(thread_counts):
+    print(f"{'backend':>10} {'threads':>8} {'ops/s':>10} {'scaling':>8} {'busy':>6} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'per flush':>9}")
+    for backend in ("journal", "journal+gc", "sqlite", "sqlite+gc"):
+        baseline = None
+        for threads in thread_counts:
+            ops, failures, latencies, per_flush = run(backend, threads)
+            baseline = baseline or ops
+            flush = f"{per_flush:>9.1f}" if per_flush is not None else f"{'-':>9}"
+            print(f"{backend:>10} {threads:>8} {ops:>10.0f} {ops / baseline:>7.2f}x {failures:>6} "
+                  f"{percentile(latencies, 0.5) * 1000:>8.3f} {percentile(latencies, 0.99) * 1000:>8.3f} {flush}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 2, 4, 8, 16])
@@ -0,0 +1,82 @@
+"""Benchmark: memory used by the in-memory book representations
+
+Usage:
+    python benchmarks/bench_memory.py [N]    (default: 1000000)
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library_system.models.book import Book
+from library_system.models.book_store import BookStore
+from library_system.models.member import Member
+
+class DictBook:
+    """The pre-__slots__ Book layout, kept as a baseline"""
+    
+    def __init__(self, book_id, title, author, isbn):
+        """Initialize a DictBook"""
+        self.book_id = book_id
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.is_available = True
+        self.borrowed_by = None
+
+def records(n):
+    """Yield fresh (id, title, author, isbn) tuples like json.load produces"""
+    for i in range(n):
+        yield 1000 + i, f"Title number {i}", "Author %d" % (i % 10000), "978-%010d" % i
+
+def build_dict_books(n):
+    """Build n baseline books in a dict"""
+    return {book_id: DictBook(book_id, t, a, isbn) for book_id, t, a, isbn in records(n)}
+
+def build_slot_books(n):
+    """Build n Book objects in a dict"""
+    books = {}
+    for book_id, title, author, isbn in records(n):
+        book = Book(title, author, isbn)
+        book.book_id = book_id
+        books[book_id] = book
+    return books
+
+def build_book_store(n):
+    """Copy n books into a BookStore"""
+    store = BookStore()
+    book = Book("", "", "")
+    for book_id, book.title, book.author, book.isbn in records(n):
+        store[book_id] = book
+    return store
+
+def build_members(n):
+    """Build n Member objects in a dict"""
+    members = {}
+    for i in range(n):
+        member = Member(f"Member {i}", f"member{i}@example.com")
+        members[member.user_id] = member
+    return members
+
+def measure(build, n):
+    """Return the bytes allocated by build(n) and still alive afterwards"""
+    tracemalloc.start()
+    result = build(n)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+def main(n):
+    print(f"{'representation':>28} {'MB per ' + str(n):>16} {'bytes/record':>13}")
+    for name, build in [("dict-backed Book (baseline)", build_dict_books),
+                        ("__slots__ Book", build_slot_books),
+                        ("columnar BookStore", build_book_store),
+                        ("__slots__ Member", build_members)]:
+        used = measure(build, n)
+        print(f"{name:>28} {used / 1e6:>16.0f} {used / n:>13.0f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,72 @@
+"""Benchmark: indexed search_books vs. the original full scan
+
+Usage:
+    python benchmarks/bench_search.py [N ...]    (default: 10000 100000 1000000)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library_system.models.book import Book
+from library_system.services.library import Library
+
+WORDS = ["python", "programming", "clean", "code", "design", "patterns", "data",
+         "systems", "algorithms", "introduction", "advanced", "practical", "guide",
+         "networks", "database", "learning", "machine", "theory", "modern", "art"]
+QUERIES = [("python", "title"), ("design patterns", "title"), ("zzz", "title"),
+           ("author 42", "author"), ("smith", "author")]
+SURNAMES = ["Smith", "Martin", "Rossum", "Knuth", "Gamma", "Bentley", "Lippman"]
+
+def scan_search(books, keyword, search_type):
+    """The original full-scan implementation of search_books"""
+    results = []
+    keyword_lower = keyword.lower()
+    for book in books.values():
+        if search_type == "title" and keyword_lower in book.title.lower():
+            results.append(book)
+        elif search_type == "author" and keyword_lower in book.author.lower():
+            results.append(book)
+    return results
+
+def build_library(n, data_dir, seed=42):
+    """Build a Library with n synthetic books without persisting them"""
+    rng = random.Random(seed)
+    lib = Library(data_dir=data_dir, search_cache_size=0)  # Time the index, not cache hits
+    for i in range(n):
+        title = " ".join(rng.choice(WORDS) for _ in range(3)) + f" vol {i % 500}"
+        author = f"{rng.choice(SURNAMES)} Author {rng.randrange(n // 10 + 1)}"
+        book = Book(title, author, f"isbn-{i}")
+        lib.books[book.book_id] = book
+    start = time.perf_counter()
+    lib._rebuild_indexes()
+    return lib, time.perf_counter() - start
+
+def time_call(fn, repeat):
+    """Return the mean wall time of fn() over repeat calls"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def main(sizes):
+    print(f"{'books':>9} {'query':>18} {'hits':>7} {'scan ms':>9} {'index ms':>9} {'speedup':>8}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            lib, build_time = build_library(n, data_dir)
+            print(f"{n:>9} index build: {build_time * 1000:.0f} ms")
+            repeat = max(1, 100000 // n)
+            for keyword, search_type in QUERIES:
+                expected = scan_search(lib.books, keyword, search_type)
+                assert lib.search_books(keyword, search_type) == expected
+                scan = time_call(lambda: scan_search(lib.books, keyword, search_type), repeat)
+                index = time_call(lambda: lib.search_books(keyword, search_type), repeat)
+                print(f"{n:>9} {keyword!r:>18} {len(expected):>7} {scan * 1000:>9.2f} "
+                      f"{index * 1000:>9.2f} {scan / index:>7.1f}x")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
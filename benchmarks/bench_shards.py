@@ -0,0 +1,64 @@
+"""Benchmark: single-file JSON vs. sharded storage
+
+For each record count a seeded catalog is written both as books.json/
+members.json and as shards, then the benchmark times loading each
+(sharded with one and with several threads) and the write behind one
+borrow_book() + return_book() pair.
+
+Usage:
+    python benchmarks/bench_shards.py [N ...]    (default: 10000 100000)
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.catalog import generate_catalog
+from library_system.services.library import Library
+from library_system.storage import JsonStorage, ShardedStorage
+
+SHARDS = 16
+
+def time_borrow_return(lib, pairs=20):
+    """Return the mean time of one borrow_book + return_book pair, in seconds"""
+    member_id = next(iter(lib.members))
+    book_ids = [book.book_id for book in lib.get_available_books()[:pairs]]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for book_id in book_ids:
+            lib.borrow_book(member_id, book_id)
+            lib.return_book(member_id, book_id)
+    return (time.perf_counter() - start) / len(book_ids)
+
+def main(sizes):
+    print(f"{'records':>8} {'storage':>12} {'load ms':>8} {'borrow+return ms':>17}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            generate_catalog(data_dir, n, n // 10, n // 20)
+            json_storage = JsonStorage(os.path.join(data_dir, "books.json"),
+                                       os.path.join(data_dir, "members.json"))
+            books, members = json_storage.load()
+            shard_dir = os.path.join(data_dir, "shards")
+            ShardedStorage(shard_dir, SHARDS).save({book.book_id: book for book in books},
+                                                   {member.user_id: member for member in members})
+            
+            cases = {
+                "json": lambda: json_storage,
+                "sharded-1": lambda: ShardedStorage(shard_dir, load_workers=1),
+                f"sharded-{SHARDS}": lambda: ShardedStorage(shard_dir, load_workers=SHARDS),
+            }
+            for name, make_storage in cases.items():
+                start = time.perf_counter()
+                make_storage().load()
+                load = time.perf_counter() - start
+                lib = Library(data_dir=data_dir, storage=make_storage())
+                write = time_borrow_return(lib)
+                print(f"{n:>8} {name:>12} {load * 1000:>8.0f} {write * 1000:>17.1f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,55 @@
+"""Benchmark: loading the JSON files vs. a binary snapshot
+
+For each record count a seeded catalog (N books, N // 10 members, N // 20
+loans) is written as JSON, converted to a binary snapshot, and both are
+loaded through their storage backend and through a cold Library().
+
+Usage:
+    python benchmarks/bench_snapshot.py [N ...]    (default: 10000 100000 500000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.catalog import generate_catalog
+from library_system.services.library import Library
+from library_system.storage import BinaryStorage, JsonStorage
+from library_system.storage.binary_storage import json_to_binary
+
+def best_time(fn, repeat=3):
+    """Return the best wall time of fn() over repeat calls, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(sizes):
+    print(f"{'records':>8} {'format':>7} {'file MB':>8} {'load ms':>8} {'startup ms':>11}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            generate_catalog(data_dir, n, n // 10, n // 20)
+            books_file = os.path.join(data_dir, "books.json")
+            members_file = os.path.join(data_dir, "members.json")
+            snapshot = os.path.join(data_dir, "library.snap")
+            json_to_binary(books_file, members_file, snapshot)
+            
+            formats = {
+                "json": (JsonStorage(books_file, members_file),
+                         os.path.getsize(books_file) + os.path.getsize(members_file),
+                         lambda: Library(data_dir=data_dir)),
+                "binary": (BinaryStorage(snapshot), os.path.getsize(snapshot),
+                           lambda: Library(data_dir=data_dir, storage=BinaryStorage(snapshot))),
+            }
+            for name, (storage, size, open_library) in formats.items():
+                load = best_time(storage.load)
+                startup = best_time(open_library)
+                print(f"{n:>8} {name:>7} {size / 1e6:>8.1f} {load * 1000:>8.0f} {startup * 1000:>11.0f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 500000])
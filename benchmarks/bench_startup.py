@@ -0,0 +1,58 @@
+"""Benchmark: cold start of an eager vs. lazy Library
+
+Usage:
+    python benchmarks/bench_startup.py [N ...]    (default: 10000 100000 500000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library_system.models.book import Book
+from library_system.models.member import Member
+from library_system.services.library import Library
+from library_system.storage import JsonStorage, SqliteStorage
+
+def write_catalog(data_dir, n_books, n_members):
+    """Write n_books books and n_members members to JSON and SQLite"""
+    books = {}
+    for i in range(n_books):
+        book = Book(f"Title {i}", f"Author {i % 1000}", f"isbn-{i}")
+        books[book.book_id] = book
+    members = {}
+    for i in range(n_members):
+        member = Member(f"Member {i}", f"member{i}@example.com")
+        members[member.user_id] = member
+    JsonStorage(os.path.join(data_dir, "books.json"), os.path.join(data_dir, "members.json")).save(books, members)
+    sqlite = SqliteStorage(os.path.join(data_dir, "library.db"))
+    sqlite.save(books, members)
+    sqlite.close()
+    return next(iter(members))
+
+def time_session(data_dir, member_id, lazy, sqlite):
+    """Time opening the Library and logging one member in"""
+    start = time.perf_counter()
+    storage = SqliteStorage(os.path.join(data_dir, "library.db")) if sqlite else None
+    lib = Library(data_dir=data_dir, storage=storage, lazy=lazy)
+    opened = time.perf_counter()
+    assert lib.authenticate_member(member_id) is not None
+    done = time.perf_counter()
+    lib.close()
+    return opened - start, done - start
+
+def main(sizes):
+    print(f"{'records':>8} {'mode':>12} {'startup ms':>11} {'login ms':>9}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            member_id = write_catalog(data_dir, n, n // 10)
+            for sqlite in (False, True):
+                for lazy in (False, True):
+                    mode = ("sqlite" if sqlite else "json") + ("-lazy" if lazy else "")
+                    startup, login = time_session(data_dir, member_id, lazy, sqlite)
+                    print(f"{n:>8} {mode:>12} {startup * 1000:>11.0f} {login * 1000:>9.0f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 500000])
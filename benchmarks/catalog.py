@@ -0,0 +1,132 @@
+"""Seeded synthetic catalog generator for the benchmarks
+
+generate_catalog() writes N books, M members and K active loans straight
+to a data directory through a storage backend, without going through
+Library, so large catalogs are cheap to build. The same seed always
+produces the same titles, authors, members and loans, so timings taken
+on different runs measure the code rather than the data.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library_system.models.book import Book
+from library_system.models.member import Member
+from library_system.storage import JsonStorage, SqliteStorage
+
+WORDS = ["python", "programming", "clean", "code", "design", "patterns", "data",
+         "systems", "algorithms", "introduction", "advanced", "practical", "guide",
+         "networks", "database", "learning", "machine", "theory", "modern", "art"]
+SURNAMES = ["Smith", "Martin", "Rossum", "Knuth", "Gamma", "Bentley", "Lippman"]
+FIRST_NAMES = ["Ada", "Alan", "Barbara", "Donald", "Edsger", "Grace", "Ken", "Linus",
+               "Margaret", "Niklaus"]
+
+FIRST_ID = 1000  # Book and member IDs start here, as in a fresh library
+LOAN_PERIOD = 14 * 24 * 60 * 60
+EPOCH = 1700000000.0  # Loan timestamps are relative to this, not to time.time()
+
+class Catalog:
+    """IDs and sizes of a generated catalog"""
+    
+    def __init__(self, book_ids, member_ids, loans, seed):
+        """
+        Initialize a Catalog
+        
+        Args:
+            book_ids (list): IDs of the generated books
+            member_ids (list): IDs of the generated members
+            loans (list): (member_id, book_id) of every active loan
+            seed (int): Seed the catalog was generated from
+        """
+        self.book_ids = book_ids
+        self.member_ids = member_ids
+        self.loans = loans
+        self.seed = seed
+    
+    def __repr__(self):
+        """String representation of Catalog"""
+        return (f"Catalog(books={len(self.book_ids)}, members={len(self.member_ids)}, "
+                f"loans={len(self.loans)}, seed={self.seed})")
+
+def make_books(n, rng):
+    """Build n synthetic books with IDs FIRST_ID, FIRST_ID + 1, ..."""
+    books = {}
+    for i in range(n):
+        title = " ".join(rng.choice(WORDS) for _ in range(3)) + f" vol {i % 500}"
+        author = f"{rng.choice(SURNAMES)} Author {rng.randrange(n // 10 + 1)}"
+        book = Book(title, author, f"978{i:010d}", FIRST_ID + i)
+        books[book.book_id] = book
+    return books
+
+def make_members(n, rng):
+    """Build n synthetic members with IDs FIRST_ID, FIRST_ID + 1, ..."""
+    members = {}
+    for i in range(n):
+        member = Member(f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}", f"member{i}@example.com",
+                        FIRST_ID + i)
+        members[member.user_id] = member
+    return members
+
+def lend(books, members, loans, rng):
+    """
+    Lend loans distinct books to random members
+    
+    About one loan in ten is already overdue at EPOCH.
+    
+    Returns:
+        List of (member_id, book_id)
+    """
+    if loans > len(books) or (loans and not members):
+        raise ValueError(f"Cannot lend {loans} books from {len(books)} books to {len(members)} members")
+    member_ids = list(members)
+    lent = []
+    for book_id in rng.sample(list(books), loans):
+        member_id = rng.choice(member_ids)
+        book = books[book_id]
+        book.is_available = False
+        book.borrowed_by = member_id
+        book.borrowed_at = EPOCH - rng.uniform(0, 1.1) * LOAN_PERIOD
+        book.due_at = book.borrowed_at + LOAN_PERIOD
+        members[member_id].borrow_book(book_id)
+        lent.append((member_id, book_id))
+    return lent
+
+def generate_catalog(data_dir, books, members, loans=0, seed=42, storage="json"):
+    """
+    Write a synthetic catalog to a data directory
+    
+    Args:
+        data_dir (str): Directory to write books.json/members.json or library.db to
+        books (int): Number of books
+        members (int): Number of members
+        loans (int): Number of books on loan
+        seed (int): Random seed
+        storage (str): "json" or "sqlite"
+    
+    Returns:
+        Catalog describing what was written
+    """
+    rng = random.Random(seed)
+    book_map = make_books(books, rng)
+    member_map = make_members(members, rng)
+    lent = lend(book_map, member_map, loans, rng)
+    if storage == "sqlite":
+        backend = SqliteStorage(os.path.join(data_dir, "library.db"))
+    else:
+        backend = JsonStorage(os.path.join(data_dir, "books.json"), os.path.join(data_dir, "members.json"))
+    try:
+        backend.save(book_map, member_map)
+    finally:
+        backend.close()
+    return Catalog(list(book_map), list(member_map), lent, seed)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        raise SystemExit("Usage: python benchmarks/catalog.py DATA_DIR BOOKS MEMBERS [LOANS [SEED]]")
+    start = time.perf_counter()
+    catalog = generate_catalog(sys.argv[1], *(int(arg) for arg in sys.argv[2:6]))
+    print(f"✓ Wrote {catalog} in {time.perf_counter() - start:.1f}s")
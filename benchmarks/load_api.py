@@ -0,0 +1,152 @@
+"""Load generator for the HTTP/JSON API
+
+Starts a server on a temporary journaled library (or targets a running
+one with --port) and drives it with many concurrent keep-alive clients.
+Each client is one patron: it mostly searches and looks books up, and
+sometimes borrows a book and returns it. Reports requests per second and
+p50/p99 latency per request kind.
+
+Usage:
+    python benchmarks/load_api.py [--clients 300] [--duration 10] [--books 5000]
+    python benchmarks/load_api.py --port 8080      (against `python main.py serve`)
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library_system.api import ApiClient, LibraryServer
+from library_system.services.library import Library
+
+WORDS = ["python", "programming", "clean", "code", "design", "patterns", "data",
+         "systems", "algorithms", "introduction", "advanced", "practical", "guide"]
+
+def serve(data_dir, books, port_queue):
+    """Server process: seed a threadsafe library and serve it"""
+    rng = random.Random(42)
+    library = Library(data_dir=data_dir, journaled=True, threadsafe=True)
+    library.add_books([(" ".join(rng.choice(WORDS) for _ in range(3)), f"Author {i % 100}", str(i))
+                       for i in range(books)])
+    
+    async def main():
+        server = LibraryServer(library, port=0)
+        await server.start()
+        port_queue.put(server.port)
+        await server.serve_forever()
+    
+    with contextlib.redirect_stdout(io.StringIO()):  # Library prints every loan
+        asyncio.run(main())
+
+def percentile(samples, fraction):
+    """Return the given percentile of a sorted list"""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+async def patron(client, member_id, book_ids, deadline, rng, latencies, errors):
+    """One simulated client issuing requests until the deadline"""
+    async def timed(kind, method, path, body=None):
+        start = time.perf_counter()
+        try:
+            status, _ = await client.request(method, path, body)
+        except (OSError, asyncio.IncompleteReadError):
+            errors[kind] = errors.get(kind, 0) + 1
+            await client.close()
+            return None
+        latencies.setdefault(kind, []).append(time.perf_counter() - start)
+        if status >= 500:
+            errors[kind] = errors.get(kind, 0) + 1
+        return status
+    
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        if roll < 0.6:
+            await timed("search", "GET", f"/books?q={rng.choice(WORDS)}&limit=20")
+        elif roll < 0.8:
+            await timed("get", "GET", f"/books/{rng.choice(book_ids)}")
+        else:
+            book_id = rng.choice(book_ids)
+            if await timed("borrow", "POST", f"/books/{book_id}/borrow", {"member_id": member_id}) == 200:
+                await timed("return", "POST", f"/books/{book_id}/return", {"member_id": member_id})
+
+async def run_load(host, port, clients, duration):
+    """Register one member per client, then run every client for duration seconds"""
+    setup = ApiClient(host, port)
+    _, data = await setup.request("GET", "/books?limit=5000")
+    book_ids = [book["book_id"] for book in data["books"]]
+    if not book_ids:
+        raise SystemExit("The server has no books to borrow")
+    tag = uuid.uuid4().hex[:8]
+    member_ids = []
+    for i in range(clients):
+        _, member = await setup.request("POST", "/members", {
+            "name": f"Load Patron {i}", "email": f"load-{tag}-{i}@example.com"})
+        member_ids.append(member["user_id"])
+    await setup.close()
+    
+    pool = [ApiClient(host, port) for _ in range(clients)]
+    await asyncio.gather(*(client.connect() for client in pool))
+    latencies, errors = {}, {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        patron(client, member_id, book_ids, deadline, random.Random(i), latencies, errors)
+        for i, (client, member_id) in enumerate(zip(pool, member_ids))))
+    elapsed = time.perf_counter() - start
+    for client in pool:
+        await client.close()
+    return latencies, errors, elapsed
+
+def report(latencies, errors, elapsed, clients):
+    """Print throughput and latency percentiles"""
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"{clients} clients, {elapsed:.1f}s, {total} requests, {total / elapsed:.0f} req/s")
+    print(f"{'kind':>8} {'count':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    everything = []
+    for kind in ("search", "get", "borrow", "return"):
+        samples = sorted(latencies.get(kind, []))
+        everything.extend(samples)
+        print(f"{kind:>8} {len(samples):>8} {percentile(samples, 0.5) * 1000:>8.2f} "
+              f"{percentile(samples, 0.99) * 1000:>8.2f} {errors.get(kind, 0):>7}")
+    everything.sort()
+    print(f"{'all':>8} {len(everything):>8} {percentile(everything, 0.5) * 1000:>8.2f} "
+          f"{percentile(everything, 0.99) * 1000:>8.2f} {sum(errors.values()):>7}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the Library HTTP API")
+    parser.add_argument("--clients", type=int, default=300, help="Concurrent keep-alive clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--books", type=int, default=5000, help="Books seeded into the spawned server")
+    parser.add_argument("--host", default="127.0.0.1", help="Host of a running server")
+    parser.add_argument("--port", type=int, help="Port of a running server (default: spawn one)")
+    args = parser.parse_args()
+    
+    server = None
+    port = args.port
+    with tempfile.TemporaryDirectory() as data_dir:
+        if port is None:
+            port_queue = multiprocessing.Queue()
+            server = multiprocessing.Process(target=serve, args=(data_dir, args.books, port_queue),
+                                             daemon=True)
+            server.start()
+            port = port_queue.get(timeout=120)
+        try:
+            latencies, errors, elapsed = asyncio.run(run_load(args.host, port, args.clients, args.duration))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.join()
+    report(latencies, errors, elapsed, args.clients)
+
+if __name__ == "__main__":
+    main()
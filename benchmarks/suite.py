@@ -0,0 +1,217 @@
+"""Benchmark suite: core Library operations at several catalog sizes
+
+For each scale N a seeded catalog of N books, N // 10 members and N // 20
+active loans is generated, then the suite times:
+
+    cold_start        Library() loading the data files (ms)
+    cold_start_lazy   Library(lazy=True) (ms)
+    save              save_data() writing a full snapshot (ms)
+    search_title      search_books() by title, mean over the query set (ms)
+    search_author     search_books() by author, mean over the query set (ms)
+    list_all          list_all_books() (ms)
+    list_available    get_available_books() (ms)
+    borrow_return     borrow_book() + return_book() pairs, journaled (ops/s)
+
+Timings are the best of --repeat runs. Results are written as JSON so two
+runs can be compared; --compare exits with status 1 when any case got
+slower than the baseline by more than --threshold.
+
+Usage:
+    python benchmarks/suite.py [--scales 1000 10000 100000] [--output results.json]
+    python benchmarks/suite.py --compare baseline.json [--threshold 0.25]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.catalog import SURNAMES, generate_catalog
+from library_system.services.library import Library
+from library_system.storage import SqliteStorage
+
+FORMAT_VERSION = 1
+TITLE_QUERIES = ["python", "design patterns", "vol 42", "zzz"]
+AUTHOR_QUERIES = [name.lower() for name in SURNAMES[:3]] + ["author 42"]
+BORROW_PAIRS = 2000  # borrow_book + return_book pairs per borrow_return run
+
+def open_library(data_dir, storage, **options):
+    """Open a Library on a generated data directory"""
+    if storage == "sqlite":
+        options["storage"] = SqliteStorage(os.path.join(data_dir, "library.db"))
+    return Library(data_dir=data_dir, **options)
+
+def best_time(fn, repeat):
+    """Return the best wall time of fn() over repeat calls, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def time_cold_start(data_dir, storage, repeat, lazy=False):
+    """Time opening the Library, closing it again after each run"""
+    def cold_start():
+        open_library(data_dir, storage, lazy=lazy).close()
+    return best_time(cold_start, repeat)
+
+def time_queries(lib, queries, search_type, repeat):
+    """Return the mean time of one search over the query set"""
+    def run():
+        for query in queries:
+            lib.search_books(query, search_type)
+    return best_time(run, repeat) / len(queries)
+
+def borrow_return_throughput(data_dir, storage, catalog, seed):
+    """Borrow and return random available books; return operations per second"""
+    lib = open_library(data_dir, storage, journaled=True, compact_threshold=1 << 40)
+    rng = random.Random(seed)
+    lent = {book_id for _, book_id in catalog.loans}
+    shelf = [book_id for book_id in catalog.book_ids if book_id not in lent]
+    pairs = [(rng.choice(catalog.member_ids), rng.choice(shelf)) for _ in range(BORROW_PAIRS)]
+    start = time.perf_counter()
+    for member_id, book_id in pairs:
+        assert lib.borrow_book(member_id, book_id)
+        assert lib.return_book(member_id, book_id)
+    elapsed = time.perf_counter() - start
+    lib.close()
+    return 2 * len(pairs) / elapsed
+
+def run_scale(n, storage, repeat, seed):
+    """
+    Run every case on a catalog of n books
+    
+    Returns:
+        List of result dicts
+    """
+    results = []
+    
+    def record(case, value, unit, better="lower"):
+        results.append({"case": case, "scale": n, "value": value, "unit": unit, "better": better})
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        catalog = generate_catalog(data_dir, n, max(10, n // 10), n // 20, seed, storage)
+        with contextlib.redirect_stdout(io.StringIO()):  # Library prints every loan
+            record("cold_start", time_cold_start(data_dir, storage, repeat) * 1000, "ms")
+            record("cold_start_lazy", time_cold_start(data_dir, storage, repeat, lazy=True) * 1000, "ms")
+            
+            lib = open_library(data_dir, storage, search_cache_size=0)  # Searches hit the index, not the cache
+            record("save", best_time(lib.save_data, repeat) * 1000, "ms")
+            lib.search_books(TITLE_QUERIES[0])  # Leave index warm-up out of the timings
+            record("search_title", time_queries(lib, TITLE_QUERIES, "title", repeat) * 1000, "ms")
+            record("search_author", time_queries(lib, AUTHOR_QUERIES, "author", repeat) * 1000, "ms")
+            record("list_all", best_time(lib.list_all_books, repeat) * 1000, "ms")
+            record("list_available", best_time(lib.get_available_books, repeat) * 1000, "ms")
+            lib.close()
+            
+            ops = borrow_return_throughput(data_dir, storage, catalog, seed)
+            record("borrow_return", ops, "ops/s", better="higher")
+    return results
+
+def git_revision():
+    """Return the current git commit, or None outside a checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(scales, storage="json", repeat=5, seed=42):
+    """
+    Run the suite at every scale
+    
+    Returns:
+        dict with "meta" (environment and settings) and "results"
+    """
+    results = []
+    for n in scales:
+        results.extend(run_scale(n, storage, repeat, seed))
+    return {
+        "version": FORMAT_VERSION,
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage": storage,
+            "scales": list(scales),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+def compare(baseline, current, threshold):
+    """
+    Compare two suite results case by case
+    
+    Returns:
+        List of (case, scale, unit, baseline value, current value, change, regressed)
+        where change is the relative slowdown (positive is worse)
+    """
+    previous = {(r["case"], r["scale"]): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = previous.get((result["case"], result["scale"]))
+        if old is None or not old["value"] or not result["value"]:
+            continue
+        if result["better"] == "higher":
+            change = old["value"] / result["value"] - 1
+        else:
+            change = result["value"] / old["value"] - 1
+        rows.append((result["case"], result["scale"], result["unit"], old["value"], result["value"],
+                     change, change > threshold))
+    return rows
+
+def print_results(results):
+    """Print one line per case and scale"""
+    print(f"{'case':>16} {'scale':>9} {'value':>12} {'unit':>6}")
+    for r in results:
+        print(f"{r['case']:>16} {r['scale']:>9} {r['value']:>12.3f} {r['unit']:>6}")
+
+def print_comparison(rows):
+    """Print a comparison table and return True if anything regressed"""
+    print(f"{'case':>16} {'scale':>9} {'baseline':>12} {'current':>12} {'change':>8}")
+    for case, scale, unit, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{case:>16} {scale:>9} {old:>12.3f} {new:>12.3f} {change:>+7.0%}{flag}")
+    return any(row[-1] for row in rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark core Library operations")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Catalog sizes in books")
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json", help="Storage backend")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing (the best is kept)")
+    parser.add_argument("--seed", type=int, default=42, help="Catalog and workload seed")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare with an earlier results file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+    
+    report = run_suite(args.scales, args.storage, args.repeat, args.seed)
+    print_results(report["results"])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare} ({baseline['meta'].get('git') or 'unknown revision'}):")
+        if print_comparison(compare(baseline, report, args.threshold)):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""HTTP/JSON API package for Library Management System"""
+
+from library_system.api.server import LibraryServer, HTTPError, run_server
+from library_system.api.client import ApiClient
+
+__all__ = ["LibraryServer", "HTTPError", "run_server", "ApiClient"]
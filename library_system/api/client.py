@@ -0,0 +1,81 @@
+"""Minimal asyncio HTTP/JSON client for the Library API"""
+
+import asyncio
+import json
+
+class ApiClient:
+    """
+    Keep-alive HTTP/1.1 client speaking JSON to a LibraryServer
+    
+    One client owns one connection and sends one request at a time.
+    
+    Example:
+        client = ApiClient("127.0.0.1", 8080)
+        status, data = await client.request("GET", "/books?q=python")
+        await client.close()
+    """
+    
+    def __init__(self, host, port):
+        """
+        Initialize an ApiClient
+        
+        Args:
+            host (str): Server host
+            port (int): Server port
+        """
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+    
+    async def connect(self):
+        """Open the connection (done automatically by request())"""
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+    
+    async def close(self):
+        """Close the connection"""
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.reader = self.writer = None
+    
+    async def request(self, method, path, body=None):
+        """
+        Send a request and wait for its response
+        
+        Args:
+            method (str): HTTP method
+            path (str): Path with an optional query string
+            body (dict): JSON body, if any
+        
+        Returns:
+            (status, decoded JSON payload, or the text of a non-JSON response)
+        """
+        if self.writer is None:
+            await self.connect()
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n")
+        self.writer.write(head.encode("latin-1") + data)
+        await self.writer.drain()
+        
+        lines = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        payload = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        if not payload:
+            return status, None
+        if not headers.get("content-type", "").startswith("application/json"):
+            return status, payload.decode("utf-8")
+        return status, json.loads(payload)
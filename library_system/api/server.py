@@ -0,0 +1,467 @@
+"""Asyncio HTTP/JSON API for Library Management System"""
+
+import asyncio
+import json
+import re
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+class HTTPError(Exception):
+    """Error answered with an HTTP status and a JSON error message"""
+    
+    def __init__(self, status, message):
+        """
+        Initialize an HTTPError
+        
+        Args:
+            status (int): HTTP status code
+            message (str): Error message sent to the client
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class LibraryServer:
+    """
+    HTTP/JSON front end to a Library, served from one asyncio event loop
+    
+    Lookups of one book or member are answered on the event loop straight
+    from the in-memory indexes. Mutations persist through the storage
+    backend, and listings, searches and reports take time that grows with
+    the catalog (a first fuzzy search also builds the trigram index), so
+    they run on worker threads and the loop keeps serving other clients
+    meanwhile; the Library must therefore be opened with threadsafe=True.
+    Connections are kept alive between requests.
+    
+    Routes:
+        GET    /books                  ?q=&type=title|author&match=substring|prefix|fuzzy
+                                       &available=1&limit=&after=
+        POST   /books                  {"title", "author", "isbn"[, "duplicates"]}
+        GET    /books/<id>
+        DELETE /books/<id>
+        POST   /books/<id>/borrow      {"member_id"[, "due_at"]}
+        POST   /books/<id>/return      {"member_id"} (hands the book to the next holder)
+        POST   /books/<id>/hold        {"member_id"}
+        DELETE /books/<id>/hold        ?member_id=
+        GET    /books/<id>/holds
+        GET    /members                ?q=&email=&limit=
+        POST   /members                {"name", "email"[, "is_admin"]}
+        GET    /members/<id>
+        DELETE /members/<id>
+        GET    /members/<id>/holds
+        GET    /loans/overdue          ?limit=
+        GET    /analytics              ?k= (top-k titles, authors and members)
+        GET    /analytics/adhoc        ?group_by=title|author|member
+                                       &status=all|available|on_loan|overdue&k=
+        GET    /metrics                ?format=json (Prometheus text by default;
+                                       404 unless the Library has metrics)
+    """
+    
+    MAX_BODY = 1024 * 1024  # Largest accepted request body in bytes
+    
+    def __init__(self, library, host="127.0.0.1", port=8080):
+        """
+        Initialize a LibraryServer
+        
+        Args:
+            library (Library): Library to serve, opened with threadsafe=True
+            host (str): Interface to listen on
+            port (int): Port to listen on (0 picks a free port)
+        """
+        if not library.threadsafe:
+            raise ValueError("LibraryServer needs a Library opened with threadsafe=True")
+        self.library = library
+        self.host = host
+        self.port = port
+        self.server = None
+        self.routes = [
+            ("GET", re.compile(r"/books"), self.list_books),
+            ("POST", re.compile(r"/books"), self.add_book),
+            ("GET", re.compile(r"/books/(\d+)"), self.get_book),
+            ("DELETE", re.compile(r"/books/(\d+)"), self.remove_book),
+            ("POST", re.compile(r"/books/(\d+)/borrow"), self.borrow_book),
+            ("POST", re.compile(r"/books/(\d+)/return"), self.return_book),
+            ("POST", re.compile(r"/books/(\d+)/hold"), self.place_hold),
+            ("DELETE", re.compile(r"/books/(\d+)/hold"), self.cancel_hold),
+            ("GET", re.compile(r"/books/(\d+)/holds"), self.hold_queue),
+            ("GET", re.compile(r"/members"), self.list_members),
+            ("POST", re.compile(r"/members"), self.add_member),
+            ("GET", re.compile(r"/members/(\d+)"), self.get_member),
+            ("DELETE", re.compile(r"/members/(\d+)"), self.remove_member),
+            ("GET", re.compile(r"/members/(\d+)/holds"), self.member_holds),
+            ("GET", re.compile(r"/loans/overdue"), self.overdue_loans),
+            ("GET", re.compile(r"/analytics"), self.analytics),
+            ("GET", re.compile(r"/analytics/adhoc"), self.adhoc_analytics),
+            ("GET", re.compile(r"/metrics"), self.metrics),
+        ]
+    
+    # ==================== SERVER LIFECYCLE ====================
+    
+    async def start(self):
+        """Start listening; self.port is set to the bound port"""
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+    
+    async def serve_forever(self):
+        """Start listening and serve until cancelled"""
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+    
+    async def close(self):
+        """Stop accepting connections"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+    
+    # ==================== HTTP HANDLING ====================
+    
+    async def _handle_connection(self, reader, writer):
+        """Serve requests on one connection until either side closes it"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break  # Client closed the connection
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {"error": "Request headers too large"}, False)
+                    break
+                
+                try:
+                    method, target, keep_alive, length = self._parse_head(head)
+                    body = await reader.readexactly(length) if length else b""
+                except HTTPError as e:
+                    # The body was not consumed, so the connection cannot be reused
+                    await self._respond(writer, e.status, {"error": e.message}, False)
+                    break
+                except asyncio.IncompleteReadError:
+                    break
+                
+                try:
+                    status, payload = await self._dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                except Exception as e:
+                    status, payload = 500, {"error": f"Internal error: {e}"}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    
+    def _parse_head(self, head):
+        """
+        Parse the request line and headers
+        
+        Returns:
+            (method, target, keep_alive, content_length)
+        """
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = connection == "keep-alive"
+        else:
+            keep_alive = connection != "close"
+        
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0 or length > self.MAX_BODY:
+            raise HTTPError(413, "Request body too large")
+        return method.upper(), target, keep_alive, length
+    
+    async def _respond(self, writer, status, payload, keep_alive):
+        """Write a JSON response, or a plain-text one if payload is a str"""
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload).encode("utf-8")
+            content_type = "application/json"
+        head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+    
+    async def _dispatch(self, method, target, body):
+        """
+        Route a request to its handler
+        
+        Returns:
+            (status, JSON-serializable payload)
+        """
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        
+        path_matched = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            args = [int(group) for group in match.groups()]
+            if method in ("POST", "PUT"):
+                args.append(self._parse_body(body))
+            else:
+                args.append(query)
+            return await handler(*args)
+        if path_matched:
+            raise HTTPError(405, f"Method {method} not allowed on {path}")
+        raise HTTPError(404, f"No route for {path}")
+    
+    @staticmethod
+    def _parse_body(body):
+        """Decode a JSON object request body"""
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return data
+    
+    @staticmethod
+    def _field(data, name, kind=str, default=None):
+        """Return a typed field of a request body or query string"""
+        value = data.get(name, default)
+        if value is None:
+            raise HTTPError(400, f"Missing field: {name}")
+        try:
+            return kind(value)
+        except (TypeError, ValueError):
+            raise HTTPError(400, f"Invalid value for {name}: {value!r}")
+    
+    @staticmethod
+    async def _offload(function, *args):
+        """Run a blocking Library call on a worker thread (the loop's default executor)"""
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+    
+    # ==================== BOOK ROUTES ====================
+    
+    async def list_books(self, query):
+        """Search or list books, paged by book ID"""
+        return await self._offload(self._list_books, query)
+    
+    def _list_books(self, query):
+        """Answer list_books() on a worker thread"""
+        limit = self._field(query, "limit", int, 0) or None
+        after = self._field(query, "after", int, -1)
+        if "q" in query:
+            search_type = query.get("type", "title")
+            match = query.get("match", "substring")
+            if search_type not in ("title", "author") or match not in ("substring", "prefix", "fuzzy"):
+                raise HTTPError(400, "type must be title or author, match substring, prefix or fuzzy")
+            if match == "fuzzy":  # Ranked, so not paged by book ID
+                ranked = self.library.fuzzy_search_books(query["q"], search_type, limit)
+                return 200, {"books": [dict(book.to_dict(), score=round(score, 3))
+                                       for book, score in ranked]}
+            books = self.library.search_books(query["q"], search_type, match)
+        elif query.get("available") in ("1", "true"):
+            books = self.library.get_available_books(limit, after if after >= 0 else None)
+        else:
+            books = self.library.list_all_books()
+        books = [book for book in books if book.book_id > after][:limit]
+        return 200, {"books": [book.to_dict() for book in books]}
+    
+    async def get_book(self, book_id, query):
+        """Return one book"""
+        return 200, self._require_book(book_id).to_dict()
+    
+    async def add_book(self, data):
+        """Add a book"""
+        duplicates = data.get("duplicates", "allow")
+        if duplicates not in ("allow", "flag", "reject"):
+            raise HTTPError(400, "duplicates must be allow, flag or reject")
+        book = await self._offload(self.library.add_book, self._field(data, "title"),
+                                   self._field(data, "author"), self._field(data, "isbn"), duplicates)
+        if book is None:
+            raise HTTPError(409, "Book was not added")
+        return 201, book.to_dict()
+    
+    async def remove_book(self, book_id, query):
+        """Remove a book"""
+        self._require_book(book_id)
+        if not await self._offload(self.library.remove_book, book_id):
+            self._require_book(book_id)  # Removed meanwhile: 404
+            raise HTTPError(409, f"Book {book_id} is on loan")
+        return 200, {"removed": book_id}
+    
+    async def borrow_book(self, book_id, data):
+        """Lend a book to a member"""
+        member_id = self._field(data, "member_id", int)
+        self._require_member(member_id)
+        book = self._require_book(book_id)
+        due_at = self._field(data, "due_at", float) if data.get("due_at") is not None else None
+        if not await self._offload(self.library.borrow_book, member_id, book_id, due_at):
+            raise HTTPError(409, f"Book {book_id} is not available")
+        return 200, book.to_dict()
+    
+    async def return_book(self, book_id, data):
+        """Take a book back from a member"""
+        member_id = self._field(data, "member_id", int)
+        self._require_member(member_id)
+        book = self._require_book(book_id)
+        if not await self._offload(self.library.return_book, member_id, book_id):
+            raise HTTPError(409, f"Member {member_id} has not borrowed book {book_id}")
+        return 200, book.to_dict()
+    
+    # ==================== HOLD ROUTES ====================
+    
+    async def place_hold(self, book_id, data):
+        """Put a member in the hold queue of a book on loan"""
+        member_id = self._field(data, "member_id", int)
+        self._require_member(member_id)
+        self._require_book(book_id)
+        position = await self._offload(self.library.place_hold, member_id, book_id)
+        if position is None:
+            raise HTTPError(409, f"Member {member_id} cannot hold book {book_id}")
+        return 201, {"book_id": book_id, "member_id": member_id, "position": position}
+    
+    async def cancel_hold(self, book_id, query):
+        """Take a member out of the hold queue of a book"""
+        member_id = self._field(query, "member_id", int)
+        if not await self._offload(self.library.cancel_hold, member_id, book_id):
+            raise HTTPError(404, f"Member {member_id} has no hold on book {book_id}")
+        return 200, {"cancelled": book_id, "member_id": member_id}
+    
+    async def hold_queue(self, book_id, query):
+        """Return the members waiting for a book, first in line first"""
+        self._require_book(book_id)
+        return 200, {"queue": await self._offload(self.library.get_hold_queue, book_id)}
+    
+    # ==================== MEMBER ROUTES ====================
+    
+    async def list_members(self, query):
+        """Find members by email or name prefix"""
+        return await self._offload(self._list_members, query)
+    
+    def _list_members(self, query):
+        """Answer list_members() on a worker thread"""
+        if "email" in query:
+            member = self.library.get_member_by_email(query["email"])
+            members = [member] if member else []
+        else:
+            limit = self._field(query, "limit", int, 0) or None
+            members = self.library.find_members(query.get("q", ""), limit)
+        return 200, {"members": [member.to_dict() for member in members]}
+    
+    async def get_member(self, user_id, query):
+        """Return one member"""
+        return 200, self._require_member(user_id).to_dict()
+    
+    async def add_member(self, data):
+        """Register a member"""
+        member = await self._offload(self.library.add_member, self._field(data, "name"),
+                                     self._field(data, "email"), bool(data.get("is_admin", False)))
+        if member is None:
+            raise HTTPError(409, "Email is already registered")
+        return 201, member.to_dict()
+    
+    async def remove_member(self, user_id, query):
+        """Remove a member with no borrowed books"""
+        self._require_member(user_id)
+        if not await self._offload(self.library.remove_member, user_id):
+            raise HTTPError(409, f"Member {user_id} still has borrowed books")
+        return 200, {"removed": user_id}
+    
+    async def member_holds(self, user_id, query):
+        """Return a member's holds and their places in the queues"""
+        self._require_member(user_id)
+        holds = await self._offload(self.library.get_holds, user_id)
+        return 200, {"holds": [{"book_id": book_id, "position": position} for book_id, position in holds]}
+    
+    # ==================== LOAN ROUTES ====================
+    
+    async def overdue_loans(self, query):
+        """Return overdue loans, most overdue first"""
+        limit = self._field(query, "limit", int, 0) or None
+        loans = await self._offload(self.library.get_overdue_loans, limit)
+        return 200, {"loans": [loan.to_dict() for loan in loans]}
+    
+    # ==================== ANALYTICS ROUTES ====================
+    
+    async def analytics(self, query):
+        """Return the top-k circulation figures"""
+        report = await self._offload(self.library.circulation_report, self._field(query, "k", int, 10))
+        return 200, {
+            "most_borrowed_titles": [{"title": title, "borrows": borrows}
+                                     for title, borrows in report["most_borrowed_titles"]],
+            "author_utilization": [{"author": author, "on_loan": on_loan, "copies": copies}
+                                   for author, on_loan, copies in report["author_utilization"]],
+            "most_active_members": [{"member_id": member_id, "name": name, "loans": loans}
+                                    for member_id, name, loans in report["most_active_members"]],
+        }
+    
+    async def adhoc_analytics(self, query):
+        """Count books with a status per title, author or member, largest groups first"""
+        group_by = query.get("group_by", "author")
+        k = self._field(query, "k", int, 10)
+        try:
+            counts = await self._offload(self.library.adhoc_report, group_by,
+                                         query.get("status", "on_loan"), k)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        if group_by == "member":
+            return 200, {"groups": [{"member_id": member_id, "name": name, "count": count}
+                                    for (member_id, name), count in counts]}
+        return 200, {"groups": [{group_by: group, "count": count} for group, count in counts]}
+    
+    # ==================== METRICS ROUTE ====================
+    
+    async def metrics(self, query):
+        """Export the Library's operation metrics"""
+        metrics = self.library.metrics
+        if metrics is None:
+            raise HTTPError(404, "Metrics are not enabled")
+        if query.get("format") == "json":
+            return 200, metrics.snapshot()
+        return 200, metrics.to_prometheus()
+    
+    def _require_book(self, book_id):
+        """Return a book or answer 404"""
+        book = self.library.get_book(book_id)
+        if book is None:
+            raise HTTPError(404, f"Book {book_id} not found")
+        return book
+    
+    def _require_member(self, user_id):
+        """Return a member or answer 404"""
+        member = self.library.get_member(user_id)
+        if member is None:
+            raise HTTPError(404, f"Member {user_id} not found")
+        return member
+
+def run_server(library, host="127.0.0.1", port=8080):
+    """Serve a Library over HTTP until interrupted"""
+    server = LibraryServer(library, host, port)
+    
+    async def serve():
+        await server.start()
+        print(f"✓ Serving the library on http://{server.host}:{server.port}")
+        await server.serve_forever()
+    
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\n✓ Server stopped")
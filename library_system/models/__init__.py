@@ -4,5 +4,7 @@ from library_system.models.book import Book
 from library_system.models.user import User
 from library_system.models.member import Member
 from library_system.models.admin import Admin
+from library_system.models.book_store import BookStore, BookView
+from library_system.models.loan import Loan
 
-__all__ = ["Book", "User", "Member", "Admin"]
+__all__ = ["Book", "User", "Member", "Admin", "BookStore", "BookView", "Loan"]
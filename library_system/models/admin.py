@@ -5,15 +5,18 @@ from library_system.models.member import Member
 class Admin(Member):
     """Represents an admin user with special privileges"""
     
-    def __init__(self, name, email):
+    __slots__ = ()
+    
+    def __init__(self, name, email, user_id=None):
         """
         Initialize an Admin object
         
         Args:
             name (str): Name of the admin
             email (str): Email of the admin
+            user_id (int): ID of the admin (None takes the next free one)
         """
-        super().__init__(name, email)
+        super().__init__(name, email, user_id)
     
     def get_role(self):
         """Return the role of the user"""
@@ -29,7 +32,9 @@ class Admin(Member):
         print("3. View All Books")
         print("4. Search Book")
         print("5. View All Members")
-        print("6. Logout")
+        print("6. View Overdue Loans")
+        print("7. Circulation Reports")
+        print("8. Logout")
         print("="*50)
     
     def __repr__(self):
@@ -44,11 +49,7 @@ class Admin(Member):
     @staticmethod
     def from_dict(data):
         """Create Admin object from dictionary"""
-        admin = Admin(data["name"], data["email"])
-        admin.user_id = data["user_id"]
+        admin = Admin(data["name"], data["email"], data["user_id"])
         admin.borrowed_books = data.get("borrowed_books", [])
-        # Update counter to avoid ID conflicts
-        from library_system.models.user import User
-        if data["user_id"] >= User.user_counter:
-            User.user_counter = data["user_id"] + 1
+        admin.holds = data.get("holds", [])
         return admin
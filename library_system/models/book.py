@@ -1,11 +1,14 @@
 """Book class for Library Management System"""
 
+from library_system.models.id_allocator import local_ids
+
 class Book:
     """Represents a book in the library"""
     
-    book_counter = 1000  # Class variable for unique book IDs
+    __slots__ = ("book_id", "title", "author", "isbn", "is_available", "borrowed_by",
+                 "borrowed_at", "due_at")
     
-    def __init__(self, title, author, isbn):
+    def __init__(self, title, author, isbn, book_id=None):
         """
         Initialize a Book object
         
@@ -13,14 +16,17 @@ class Book:
             title (str): Title of the book
             author (str): Author of the book
             isbn (str): ISBN of the book
+            book_id (int): ID of the book (None takes one from local_ids; a
+                Library passes IDs from its own IdAllocator)
         """
-        self.book_id = Book.book_counter
-        Book.book_counter += 1
+        self.book_id = local_ids.allocate("book") if book_id is None else book_id
         self.title = title
         self.author = author
         self.isbn = isbn
         self.is_available = True
         self.borrowed_by = None  # Member ID who borrowed this book
+        self.borrowed_at = None  # Timestamp of the current loan
+        self.due_at = None  # Timestamp when the current loan is due
     
     def __repr__(self):
         """String representation of Book"""
@@ -35,17 +41,17 @@ class Book:
             "author": self.author,
             "isbn": self.isbn,
             "is_available": self.is_available,
-            "borrowed_by": self.borrowed_by
+            "borrowed_by": self.borrowed_by,
+            "borrowed_at": self.borrowed_at,
+            "due_at": self.due_at
         }
     
     @staticmethod
     def from_dict(data):
         """Create Book object from dictionary"""
-        book = Book(data["title"], data["author"], data["isbn"])
-        book.book_id = data["book_id"]
+        book = Book(data["title"], data["author"], data["isbn"], data["book_id"])
         book.is_available = data["is_available"]
         book.borrowed_by = data["borrowed_by"]
-        # Update counter to avoid ID conflicts
-        if data["book_id"] >= Book.book_counter:
-            Book.book_counter = data["book_id"] + 1
+        book.borrowed_at = data.get("borrowed_at")
+        book.due_at = data.get("due_at")
         return book
@@ -0,0 +1,274 @@
+"""Columnar book storage for Library Management System"""
+
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from library_system.models.book import Book
+
+NO_MEMBER = -1  # borrowed_by column value for "not borrowed"
+NO_TIME = float("nan")  # borrowed_at/due_at column value for "no loan"
+DELETED = -1  # state column value for a removed row
+
+class BookView:
+    """
+    Lightweight Book-compatible view of one row in a BookStore
+    
+    Reading or assigning an attribute reads or writes the store's columns,
+    so a view behaves like the Book it replaces.
+    """
+    
+    __slots__ = ("_store", "book_id")
+    
+    def __init__(self, store, book_id):
+        """
+        Initialize a BookView
+        
+        Args:
+            store (BookStore): Store holding the row
+            book_id (int): ID of the book
+        """
+        self._store = store
+        self.book_id = book_id
+    
+    @property
+    def title(self):
+        """Title of the book"""
+        return self._store.titles[self._store.row(self.book_id)]
+    
+    @property
+    def author(self):
+        """Author of the book"""
+        return self._store.authors[self._store.row(self.book_id)]
+    
+    @property
+    def isbn(self):
+        """ISBN of the book"""
+        return self._store.isbns[self._store.row(self.book_id)]
+    
+    @property
+    def is_available(self):
+        """Whether the book can be borrowed"""
+        return self._store.state[self._store.row(self.book_id)] == 1
+    
+    @is_available.setter
+    def is_available(self, value):
+        self._store.state[self._store.row(self.book_id)] = 1 if value else 0
+    
+    @property
+    def borrowed_by(self):
+        """Member ID who borrowed this book, or None"""
+        member_id = self._store.borrowed_by[self._store.row(self.book_id)]
+        return None if member_id == NO_MEMBER else member_id
+    
+    @borrowed_by.setter
+    def borrowed_by(self, value):
+        self._store.borrowed_by[self._store.row(self.book_id)] = NO_MEMBER if value is None else value
+    
+    @property
+    def borrowed_at(self):
+        """Timestamp of the current loan, or None"""
+        return _from_time(self._store.borrowed_at[self._store.row(self.book_id)])
+    
+    @borrowed_at.setter
+    def borrowed_at(self, value):
+        self._store.borrowed_at[self._store.row(self.book_id)] = _to_time(value)
+    
+    @property
+    def due_at(self):
+        """Timestamp when the current loan is due, or None"""
+        return _from_time(self._store.due_at[self._store.row(self.book_id)])
+    
+    @due_at.setter
+    def due_at(self, value):
+        self._store.due_at[self._store.row(self.book_id)] = _to_time(value)
+    
+    def __eq__(self, other):
+        """Views are equal when they show the same row of the same store"""
+        return (isinstance(other, BookView) and other._store is self._store
+                and other.book_id == self.book_id)
+    
+    def __hash__(self):
+        """Hash of BookView"""
+        return hash((id(self._store), self.book_id))
+    
+    def __repr__(self):
+        """String representation of the book, identical to Book"""
+        status = "Available" if self.is_available else f"Borrowed by Member #{self.borrowed_by}"
+        return f"Book(ID: {self.book_id}, Title: '{self.title}', Author: '{self.author}', Status: {status})"
+    
+    def to_dict(self):
+        """Convert book to dictionary for JSON storage"""
+        return {
+            "book_id": self.book_id,
+            "title": self.title,
+            "author": self.author,
+            "isbn": self.isbn,
+            "is_available": self.is_available,
+            "borrowed_by": self.borrowed_by,
+            "borrowed_at": self.borrowed_at,
+            "due_at": self.due_at
+        }
+
+def _to_time(value):
+    """Convert an optional timestamp to a column value"""
+    return NO_TIME if value is None else value
+
+def _from_time(value):
+    """Convert a column value back to an optional timestamp"""
+    return None if value != value else value  # NaN marks "no loan"
+
+class BookStore(MutableMapping):
+    """
+    Columnar mapping of book_id -> BookView
+    
+    IDs, availability, borrowed_by and loan timestamps live in array-backed
+    columns; titles, authors and ISBNs are interned strings in parallel
+    lists. Rows are kept sorted by book_id, so a lookup is a binary search
+    and no per-book dictionary or object is stored. Removed rows become tombstones that are
+    compacted away once they make up half of the store.
+    """
+    
+    def __init__(self, books=()):
+        """
+        Initialize a BookStore
+        
+        Args:
+            books (iterable): Book objects to copy into the store
+        """
+        self.ids = array('q')
+        self.state = array('b')  # 1 available, 0 borrowed, DELETED removed
+        self.borrowed_by = array('q')
+        self.borrowed_at = array('d')
+        self.due_at = array('d')
+        self.titles = []
+        self.authors = []
+        self.isbns = []
+        self._size = 0
+        for book in books:
+            self[book.book_id] = book
+    
+    def _find(self, book_id):
+        """Return the row of book_id (including tombstones), or -1"""
+        ids = self.ids
+        if ids and ids[-1] == book_id:
+            return len(ids) - 1
+        i = bisect_left(ids, book_id)
+        if i < len(ids) and ids[i] == book_id:
+            return i
+        return -1
+    
+    def row(self, book_id):
+        """Return the row of a stored book"""
+        i = self._find(book_id)
+        if i < 0 or self.state[i] == DELETED:
+            raise KeyError(book_id)
+        return i
+    
+    def __getitem__(self, book_id):
+        """Return a view of the book"""
+        self.row(book_id)
+        return BookView(self, book_id)
+    
+    def __setitem__(self, book_id, book):
+        """Copy a Book (or BookView) into the store"""
+        title = sys.intern(book.title)
+        author = sys.intern(book.author)
+        state = 1 if book.is_available else 0
+        borrowed_by = NO_MEMBER if book.borrowed_by is None else book.borrowed_by
+        borrowed_at = _to_time(book.borrowed_at)
+        due_at = _to_time(book.due_at)
+        
+        i = self._find(book_id)
+        if i < 0:
+            i = len(self.ids)
+            if self.ids and self.ids[-1] > book_id:
+                i = bisect_left(self.ids, book_id)
+            self.ids.insert(i, book_id)
+            self.state.insert(i, state)
+            self.borrowed_by.insert(i, borrowed_by)
+            self.borrowed_at.insert(i, borrowed_at)
+            self.due_at.insert(i, due_at)
+            self.titles.insert(i, title)
+            self.authors.insert(i, author)
+            self.isbns.insert(i, book.isbn)
+            self._size += 1
+            return
+        if self.state[i] == DELETED:
+            self._size += 1
+        self.state[i] = state
+        self.borrowed_by[i] = borrowed_by
+        self.borrowed_at[i] = borrowed_at
+        self.due_at[i] = due_at
+        self.titles[i] = title
+        self.authors[i] = author
+        self.isbns[i] = book.isbn
+    
+    def __delitem__(self, book_id):
+        """Remove a book, leaving a tombstone row"""
+        i = self.row(book_id)
+        self.state[i] = DELETED
+        self.titles[i] = self.authors[i] = self.isbns[i] = ""
+        self._size -= 1
+        if self._size < len(self.ids) // 2:
+            self._compact()
+    
+    def pop(self, book_id, *default):
+        """Remove a book and return a detached Book copy of it"""
+        i = self._find(book_id)
+        if i < 0 or self.state[i] == DELETED:
+            if default:
+                return default[0]
+            raise KeyError(book_id)
+        book = self.detach(book_id)
+        del self[book_id]
+        return book
+    
+    def detach(self, book_id):
+        """Return a standalone Book object with the current values of a row"""
+        i = self.row(book_id)
+        book = Book.__new__(Book)
+        book.book_id = book_id
+        book.title = self.titles[i]
+        book.author = self.authors[i]
+        book.isbn = self.isbns[i]
+        book.is_available = self.state[i] == 1
+        book.borrowed_by = None if self.borrowed_by[i] == NO_MEMBER else self.borrowed_by[i]
+        book.borrowed_at = _from_time(self.borrowed_at[i])
+        book.due_at = _from_time(self.due_at[i])
+        return book
+    
+    def _compact(self):
+        """Drop tombstone rows"""
+        keep = [i for i, state in enumerate(self.state) if state != DELETED]
+        self.ids = array('q', (self.ids[i] for i in keep))
+        self.state = array('b', (self.state[i] for i in keep))
+        self.borrowed_by = array('q', (self.borrowed_by[i] for i in keep))
+        self.borrowed_at = array('d', (self.borrowed_at[i] for i in keep))
+        self.due_at = array('d', (self.due_at[i] for i in keep))
+        self.titles = [self.titles[i] for i in keep]
+        self.authors = [self.authors[i] for i in keep]
+        self.isbns = [self.isbns[i] for i in keep]
+    
+    def __contains__(self, book_id):
+        """Check whether a book is stored"""
+        i = self._find(book_id)
+        return i >= 0 and self.state[i] != DELETED
+    
+    def __iter__(self):
+        """Iterate over book IDs in ID order"""
+        for book_id, state in zip(self.ids, self.state):
+            if state != DELETED:
+                yield book_id
+    
+    def __len__(self):
+        """Return the number of books"""
+        return self._size
+    
+    def clear(self):
+        """Remove every book"""
+        self.__init__()
+    
+    def __repr__(self):
+        """String representation of BookStore"""
+        return f"BookStore({len(self)} books)"
@@ -0,0 +1,132 @@
+"""Block-reserving ID allocator for Library Management System"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+FIRST_ID = 1000  # First book and member ID of a new library
+
+class IdAllocator:
+    """
+    Hands out unique IDs per kind ("book", "user") in hi/lo style
+    
+    The file stores, per kind, the high-water mark below which every ID has
+    been handed to some allocator. An allocator takes a block of block_size
+    IDs by raising that mark once, under an fcntl lock on the file, and
+    then mints IDs from the block in memory, so only one insert in
+    block_size touches the file. Several threads can share one allocator,
+    and several processes can share the file without ever minting the same
+    ID. IDs left in a block when a process exits are never reused.
+    
+    Without a path the marks are kept in memory only.
+    """
+    
+    KINDS = ("book", "user")
+    
+    def __init__(self, path=None, block_size=64):
+        """
+        Initialize an IdAllocator
+        
+        Args:
+            path (str): File holding the high-water marks, or None to keep
+                them in memory
+            block_size (int): IDs reserved from the file at a time
+        """
+        self.path = path
+        self.block_size = block_size
+        self.fresh = path is None or not os.path.exists(path)  # No marks stored yet
+        self.blocks_reserved = 0  # Blocks taken from the marks so far
+        self._blocks = {}  # Kind -> [next ID, end of block]
+        self._marks = dict.fromkeys(self.KINDS, FIRST_ID)  # High-water marks without a file
+        self._lock = threading.Lock()
+    
+    def allocate(self, kind):
+        """
+        Return the next unused ID of a kind
+        
+        Args:
+            kind (str): "book" or "user"
+        """
+        with self._lock:
+            block = self._blocks.get(kind)
+            if block is None or block[0] >= block[1]:
+                block = self._blocks[kind] = self._reserve(kind, self.block_size)
+            next_id = block[0]
+            block[0] += 1
+            return next_id
+    
+    def allocate_many(self, kind, count):
+        """
+        Return count consecutive unused IDs of a kind
+        
+        Taken from the current block when it has room, otherwise reserved
+        from the file as one block of exactly count IDs.
+        
+        Returns:
+            range of IDs
+        """
+        with self._lock:
+            block = self._blocks.get(kind)
+            if block is not None and block[1] - block[0] >= count:
+                start = block[0]
+                block[0] += count
+                return range(start, start + count)
+            start, end = self._reserve(kind, count)
+            return range(start, end)
+    
+    def ensure_above(self, kind, record_id):
+        """
+        Make sure no ID up to record_id is handed out
+        
+        Used to seed a new allocator from records that already exist.
+        """
+        with self._lock:
+            block = self._blocks.get(kind)
+            if block is not None and block[0] <= record_id:
+                del self._blocks[kind]
+            with self._locked_marks() as marks:
+                marks[kind] = max(marks.get(kind, FIRST_ID), record_id + 1)
+    
+    def reset(self):
+        """Start every kind over at FIRST_ID (for an emptied library)"""
+        with self._lock:
+            self._blocks.clear()
+            with self._locked_marks() as marks:
+                marks.update(dict.fromkeys(self.KINDS, FIRST_ID))
+    
+    def _reserve(self, kind, count):
+        """Raise the high-water mark of a kind by count; the caller holds _lock"""
+        with self._locked_marks() as marks:
+            start = marks.get(kind, FIRST_ID)
+            marks[kind] = start + count
+        self.blocks_reserved += 1
+        return [start, start + count]
+    
+    @contextmanager
+    def _locked_marks(self):
+        """Yield the high-water marks; with a file, under its lock and written back after"""
+        if self.path is None:
+            yield self._marks
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            data = os.pread(fd, 4096, 0)
+            marks = json.loads(data) if data.strip() else {}
+            yield marks
+            data = json.dumps(marks, sort_keys=True).encode()
+            os.pwrite(fd, data, 0)
+            os.ftruncate(fd, len(data))
+            self.fresh = False
+        finally:
+            os.close(fd)  # Also releases the lock
+
+# Allocator for records created outside a Library, such as Book(...) in tests
+local_ids = IdAllocator()
@@ -0,0 +1,63 @@
+"""ISBN normalization helpers for Library Management System"""
+
+def clean_isbn(isbn):
+    """Strip hyphens and spaces and uppercase a trailing X"""
+    return isbn.replace("-", "").replace(" ", "").strip().upper()
+
+def _isbn10_valid(digits):
+    """Check the ISBN-10 checksum (weights 10..1, X = 10 in the last place)"""
+    if len(digits) != 10 or not digits[:9].isdigit():
+        return False
+    if not (digits[9].isdigit() or digits[9] == "X"):
+        return False
+    total = sum((10 - i) * int(d) for i, d in enumerate(digits[:9]))
+    total += 10 if digits[9] == "X" else int(digits[9])
+    return total % 11 == 0
+
+def _isbn13_valid(digits):
+    """Check the ISBN-13 checksum (alternating weights 1 and 3)"""
+    if len(digits) != 13 or not digits.isdigit():
+        return False
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return total % 10 == 0
+
+def is_valid_isbn(isbn):
+    """
+    Check whether a string is a valid ISBN-10 or ISBN-13
+    
+    Args:
+        isbn (str): ISBN, hyphens and spaces allowed
+    
+    Returns:
+        True if the checksum is valid, False otherwise
+    """
+    digits = clean_isbn(isbn)
+    return _isbn10_valid(digits) or _isbn13_valid(digits)
+
+def normalize_isbn(isbn):
+    """
+    Convert a valid ISBN-10 or ISBN-13 to its ISBN-13 form
+    
+    Args:
+        isbn (str): ISBN, hyphens and spaces allowed
+    
+    Returns:
+        13-digit string, or None if the ISBN is not valid
+    """
+    digits = clean_isbn(isbn)
+    if _isbn13_valid(digits):
+        return digits
+    if _isbn10_valid(digits):
+        body = "978" + digits[:9]
+        total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(body))
+        return body + str((10 - total % 10) % 10)
+    return None
+
+def isbn_key(isbn):
+    """
+    Return the lookup key for an ISBN
+    
+    Valid ISBNs map to their ISBN-13 form, so the ISBN-10 and ISBN-13 of a
+    book share a key. Anything else falls back to the cleaned string.
+    """
+    return normalize_isbn(isbn) or clean_isbn(isbn)
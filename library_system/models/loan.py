@@ -0,0 +1,43 @@
+"""Loan class for Library Management System"""
+
+import time
+
+class Loan:
+    """Represents one book lent to one member"""
+    
+    __slots__ = ("book_id", "member_id", "borrowed_at", "due_at")
+    
+    def __init__(self, book_id, member_id, borrowed_at, due_at):
+        """
+        Initialize a Loan object
+        
+        Args:
+            book_id (int): ID of the borrowed book
+            member_id (int): ID of the borrowing member
+            borrowed_at (float): Timestamp when the book went out
+            due_at (float): Timestamp when the book is due back
+        """
+        self.book_id = book_id
+        self.member_id = member_id
+        self.borrowed_at = borrowed_at
+        self.due_at = due_at
+    
+    def is_overdue(self, now=None):
+        """Check whether the loan is past its due date"""
+        if self.due_at is None:
+            return False
+        return self.due_at < (time.time() if now is None else now)
+    
+    def __repr__(self):
+        """String representation of Loan"""
+        due = time.strftime("%Y-%m-%d", time.localtime(self.due_at)) if self.due_at else "unknown"
+        return f"Loan(Book #{self.book_id}, Member #{self.member_id}, Due: {due})"
+    
+    def to_dict(self):
+        """Convert loan to dictionary"""
+        return {
+            "book_id": self.book_id,
+            "member_id": self.member_id,
+            "borrowed_at": self.borrowed_at,
+            "due_at": self.due_at
+        }
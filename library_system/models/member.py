@@ -5,16 +5,66 @@ from library_system.models.user import User
 class Member(User):
     """Represents a library member/user"""
     
-    def __init__(self, name, email):
+    __slots__ = ("_borrowed", "_holds")
+    
+    def __init__(self, name, email, user_id=None):
         """
         Initialize a Member object
         
         Args:
             name (str): Name of the member
             email (str): Email of the member
+            user_id (int): ID of the member (None takes the next free one)
+        """
+        super().__init__(name, email, user_id)
+        self._borrowed = {}  # Ordered set of borrowed book IDs (dict keys)
+        self._holds = {}  # Held book ID -> ticket in its hold queue, in the order placed
+    
+    @property
+    def borrowed_books(self):
+        """List of borrowed book IDs, in borrowing order"""
+        return list(self._borrowed)
+    
+    @borrowed_books.setter
+    def borrowed_books(self, book_ids):
+        self._borrowed = dict.fromkeys(book_ids)
+    
+    def has_borrowed(self, book_id):
+        """Check in O(1) whether the member has borrowed a book"""
+        return book_id in self._borrowed
+    
+    @property
+    def holds(self):
+        """Dictionary of held book IDs -> queue tickets, in the order the holds were placed"""
+        return dict(self._holds)
+    
+    @holds.setter
+    def holds(self, holds):
+        self._holds = dict(holds)
+    
+    def has_hold(self, book_id):
+        """Check in O(1) whether the member holds a book"""
+        return book_id in self._holds
+    
+    def place_hold(self, book_id, ticket):
+        """
+        Add a hold on a book
+        
+        Args:
+            book_id (int): ID of the book
+            ticket (int): Place of the hold in the book's queue; lower
+                tickets are served first
+        """
+        self._holds[book_id] = ticket
+    
+    def cancel_hold(self, book_id):
+        """
+        Remove a hold on a book
+        
+        Returns:
+            Ticket of the hold, or None if the member did not hold the book
         """
-        super().__init__(name, email)
-        self.borrowed_books = []  # List of book IDs
+        return self._holds.pop(book_id, None)
     
     def get_role(self):
         """Return the role of the user"""
@@ -27,8 +77,8 @@ class Member(User):
         Args:
             book_id (int): ID of the book to borrow
         """
-        if book_id not in self.borrowed_books:
-            self.borrowed_books.append(book_id)
+        if book_id not in self._borrowed:
+            self._borrowed[book_id] = None
             return True
         return False
     
@@ -39,14 +89,14 @@ class Member(User):
         Args:
             book_id (int): ID of the book to return
         """
-        if book_id in self.borrowed_books:
-            self.borrowed_books.remove(book_id)
+        if book_id in self._borrowed:
+            del self._borrowed[book_id]
             return True
         return False
     
     def view_borrowed_books(self):
         """Return list of borrowed book IDs"""
-        return self.borrowed_books.copy()
+        return list(self._borrowed)
     
     def display_menu(self):
         """Display member menu options"""
@@ -57,26 +107,25 @@ class Member(User):
         print("2. Borrow Book")
         print("3. Return Book")
         print("4. View My Borrowed Books")
-        print("5. Logout")
+        print("5. View My Holds")
+        print("6. Logout")
         print("="*50)
     
     def __repr__(self):
         """String representation of Member"""
-        return f"Member(ID: {self.user_id}, Name: '{self.name}', Borrowed Books: {len(self.borrowed_books)})"
+        return f"Member(ID: {self.user_id}, Name: '{self.name}', Borrowed Books: {len(self._borrowed)})"
     
     def to_dict(self):
         """Convert member to dictionary for JSON storage"""
         data = super().to_dict()
         data["borrowed_books"] = self.borrowed_books
+        data["holds"] = [[book_id, ticket] for book_id, ticket in self._holds.items()]
         return data
     
     @staticmethod
     def from_dict(data):
         """Create Member object from dictionary"""
-        member = Member(data["name"], data["email"])
-        member.user_id = data["user_id"]
+        member = Member(data["name"], data["email"], data["user_id"])
         member.borrowed_books = data.get("borrowed_books", [])
-        # Update counter to avoid ID conflicts
-        if data["user_id"] >= User.user_counter:
-            User.user_counter = data["user_id"] + 1
+        member.holds = data.get("holds", [])
         return member
@@ -1,22 +1,24 @@
 """Abstract User class for Library Management System"""
 
 from abc import ABC, abstractmethod
+from library_system.models.id_allocator import local_ids
 
 class User(ABC):
     """Abstract base class for all users in the system"""
     
-    user_counter = 1000  # Class variable for unique user IDs
+    __slots__ = ("user_id", "name", "email")
     
-    def __init__(self, name, email):
+    def __init__(self, name, email, user_id=None):
         """
         Initialize a User object
         
         Args:
             name (str): Name of the user
             email (str): Email of the user
+            user_id (int): ID of the user (None takes one from local_ids; a
+                Library passes IDs from its own IdAllocator)
         """
-        self.user_id = User.user_counter
-        User.user_counter += 1
+        self.user_id = local_ids.allocate("user") if user_id is None else user_id
         self.name = name
         self.email = email
     
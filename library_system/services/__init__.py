@@ -1,5 +1,8 @@
 """Services package for Library Management System"""
 
 from library_system.services.library import Library
+from library_system.services.importer import CatalogImporter, ImportReport
+from library_system.services.metrics import Metrics
+from library_system.services.pagination import Page
 
-__all__ = ["Library"]
+__all__ = ["Library", "CatalogImporter", "ImportReport", "Metrics", "Page"]
@@ -0,0 +1,369 @@
+"""Circulation analytics for Library Management System"""
+
+import heapq
+import json
+import os
+import time
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+from operator import attrgetter, eq, lt, ne
+from library_system.models.book_store import BookStore, DELETED, NO_MEMBER
+
+GROUP_BY = ("title", "author", "member")
+STATUSES = ("all", "available", "on_loan", "overdue")
+GROUP_COLUMNS = {"title": "titles", "author": "authors", "member": "borrowed_by"}
+STATUS_COLUMNS = {"all": "state", "available": "state", "on_loan": "state", "overdue": "due_at"}
+
+def _decrement(counter, key):
+    """Subtract one from a Counter entry, dropping it at zero"""
+    if counter[key] <= 1:
+        del counter[key]
+    else:
+        counter[key] -= 1
+
+class CirculationStats:
+    """
+    Circulation counters kept current by Library as books move
+    
+    Lifetime borrow counts per book, title and author grow by one for each
+    committed borrow (rolled-back and replayed borrows are not counted).
+    Library counts borrows with record_borrows() once their records are
+    written and then appends them to a log next to the JSON file with
+    append_log(), so no count is lost if the process never closes the
+    library. save() folds the log into the JSON file, which Library also
+    does once the log grows past LOG_LIMIT bytes; processes sharing a data
+    directory append to the same log and so never overwrite each other's
+    counts.
+    
+    Active loans per member and per author, and copies per author, follow
+    the current state of the books through add(), remove() and update(),
+    which Library calls alongside its other index updates. Top-k queries
+    then read these Counters instead of the catalog: their cost grows with
+    the number of distinct titles, authors or members, not with the number
+    of books.
+    """
+    
+    LOG_LIMIT = 1024 * 1024  # Log size (bytes) that triggers folding it into the file
+    
+    def __init__(self, path=None):
+        """
+        Initialize CirculationStats
+        
+        Args:
+            path (str): JSON file holding the lifetime borrow counts (the log
+                is path + ".log"), or None to keep them in memory only
+        """
+        self.path = path
+        self.log_path = None if path is None else path + ".log"
+        self.borrows_by_book = Counter()
+        self.borrows_by_title = Counter()
+        self.borrows_by_author = Counter()
+        self.active_by_member = Counter()
+        self.active_by_author = Counter()
+        self.copies_by_author = Counter()
+        self._loans = {}  # book_id -> (member_id, author) of the loans counted above
+        self.load()
+    
+    # ==================== LIFETIME COUNTS ====================
+    
+    def record_borrows(self, books):
+        """
+        Count one committed borrow of each book in memory
+        
+        Returns:
+            List of (book_id, title, author) entries for append_log()
+        """
+        entries = [(book.book_id, book.title, book.author) for book in books]
+        if entries:
+            self._add(self._lifetime(), entries)
+        return entries
+    
+    def append_log(self, entries):
+        """
+        Append borrow entries from record_borrows() to the log
+        
+        The caller serializes this with save() between processes (Library
+        holds the inter-process lock in shared mode).
+        
+        Returns:
+            True if the log has grown past LOG_LIMIT and should be saved
+        """
+        if not entries or self.log_path is None:
+            return False
+        with open(self.log_path, 'a') as f:
+            f.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+            return f.tell() > self.LOG_LIMIT
+    
+    def _lifetime(self):
+        """Return the lifetime counters by book, title and author"""
+        return self.borrows_by_book, self.borrows_by_title, self.borrows_by_author
+    
+    @staticmethod
+    def _add(counters, entries):
+        """Add (book_id, title, author) borrow entries to three counters"""
+        for counter, keys in zip(counters, zip(*entries)):
+            counter.update(keys)
+    
+    def load(self):
+        """Read the lifetime borrow counts from the file and the log"""
+        self.borrows_by_book, self.borrows_by_title, self.borrows_by_author = self._read()
+    
+    def _read(self):
+        """Return the counters stored in the file plus the log (empty if there are none)"""
+        counters = Counter(), Counter(), Counter()
+        if self.path is None:
+            return counters
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            counters[0].update({int(book_id): n for book_id, n in data.get("books", {}).items()})
+            counters[1].update(data.get("titles", {}))
+            counters[2].update(data.get("authors", {}))
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'r') as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            if entries:
+                self._add(counters, entries)
+        return counters
+    
+    def save(self):
+        """
+        Fold the log into the JSON file
+        
+        The caller serializes saves between processes (Library holds the
+        inter-process lock in shared mode).
+        """
+        if self.path is None or not os.path.exists(self.log_path):
+            return
+        stored = self._read()
+        data = {"books": {str(book_id): n for book_id, n in stored[0].items()},
+                "titles": dict(stored[1]), "authors": dict(stored[2])}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        os.remove(self.log_path)
+        self.borrows_by_book, self.borrows_by_title, self.borrows_by_author = stored
+    
+    def reset(self):
+        """Forget every count and remove the file and the log"""
+        for counter in self._lifetime():
+            counter.clear()
+        for path in (self.path, self.log_path):
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+    
+    # ==================== CURRENT STATE ====================
+    
+    def rebuild(self, books):
+        """Recount active loans and copies from an iterable of books"""
+        self.active_by_member = Counter()
+        self.active_by_author = Counter()
+        self.copies_by_author = Counter()
+        self._loans = {}
+        for book in books:
+            self.add(book)
+    
+    def add(self, book):
+        """Count a book added to the catalog"""
+        self.copies_by_author[book.author] += 1
+        self.update(book)
+    
+    def remove(self, book):
+        """Stop counting a book removed from the catalog"""
+        _decrement(self.copies_by_author, book.author)
+        loan = self._loans.pop(book.book_id, None)
+        if loan is not None:
+            _decrement(self.active_by_member, loan[0])
+            _decrement(self.active_by_author, loan[1])
+    
+    def update(self, book):
+        """Follow a book being borrowed or returned"""
+        on_loan = not book.is_available and book.borrowed_by is not None
+        loan = (book.borrowed_by, book.author) if on_loan else None
+        previous = self._loans.get(book.book_id)
+        if previous == loan:
+            return
+        if previous is not None:
+            _decrement(self.active_by_member, previous[0])
+            _decrement(self.active_by_author, previous[1])
+            del self._loans[book.book_id]
+        if loan is not None:
+            self.active_by_member[loan[0]] += 1
+            self.active_by_author[loan[1]] += 1
+            self._loans[book.book_id] = loan
+    
+    # ==================== TOP-K QUERIES ====================
+    
+    def most_borrowed_titles(self, k=10):
+        """Return the k most borrowed titles as (title, borrows) pairs"""
+        return self.borrows_by_title.most_common(k)
+    
+    def most_borrowed_books(self, k=10):
+        """Return the k most borrowed books as (book_id, borrows) pairs"""
+        return self.borrows_by_book.most_common(k)
+    
+    def most_active_members(self, k=10):
+        """Return the k members with the most active loans as (member_id, loans) pairs"""
+        return self.active_by_member.most_common(k)
+    
+    def author_utilization(self, k=10):
+        """
+        Return the k authors with the largest share of their copies on loan
+        
+        Returns:
+            List of (author, copies on loan, copies) tuples, ties broken by
+            the number of copies on loan
+        """
+        copies = self.copies_by_author
+        top = heapq.nlargest(k, self.active_by_author.items(),
+                             key=lambda item: (item[1] / copies[item[0]], item[1]))
+        return [(author, on_loan, copies[author]) for author, on_loan in top]
+
+class ColumnarSnapshot:
+    """
+    Column copy of the catalog for ad-hoc reports
+    
+    Each report is one pass over whole columns in C: itertools.compress
+    selects the rows matching a status mask built with map() over an
+    operator, and Counter tallies the selected column. No per-book Python
+    code runs, so a report over 100k books takes a few milliseconds.
+    
+    A snapshot may hold only some of the columns (the others are None);
+    columns_for() names the ones a report reads.
+    """
+    
+    __slots__ = ("titles", "authors", "state", "borrowed_by", "due_at")
+    
+    def __init__(self, titles=None, authors=None, state=None, borrowed_by=None, due_at=None):
+        """
+        Initialize a ColumnarSnapshot
+        
+        Args:
+            titles (list): Title of each book
+            authors (list): Author of each book
+            state (array): 1 for an available book, 0 for one on loan
+            borrowed_by (array): Member ID of each loan, NO_MEMBER if none
+            due_at (array): Due timestamp of each loan, NaN if none
+        """
+        self.titles = titles
+        self.authors = authors
+        self.state = state
+        self.borrowed_by = borrowed_by
+        self.due_at = due_at
+    
+    def __len__(self):
+        """Return the number of books in the snapshot"""
+        return len(next(getattr(self, name) for name in self.__slots__ if getattr(self, name) is not None))
+    
+    @staticmethod
+    def columns_for(group_by, status):
+        """
+        Return the names of the columns count_by(group_by, status) reads
+        
+        Raises:
+            ValueError: If group_by or status is unknown
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)}")
+        if status not in STATUSES:
+            raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+        return GROUP_COLUMNS[group_by], STATUS_COLUMNS[status]
+    
+    def mask(self, status, now=None):
+        """
+        Return an iterator of booleans selecting the books with a status
+        
+        Args:
+            status (str): "all", "available", "on_loan" or "overdue"
+            now (float): Current timestamp for "overdue" (defaults to time.time())
+        """
+        if status == "all":
+            return repeat(True, len(self))
+        if status == "available":
+            return map(eq, self.state, repeat(1))
+        if status == "on_loan":
+            return map(eq, self.state, repeat(0))
+        if status == "overdue":
+            return map(lt, self.due_at, repeat(time.time() if now is None else now))  # NaN is never less
+        raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+    
+    def count_by(self, group_by, status="all", k=10, now=None):
+        """
+        Count the books with a status per title, author or borrowing member
+        
+        Args:
+            group_by (str): "title", "author" or "member"
+            status (str): "all", "available", "on_loan" or "overdue"
+            k (int): Number of groups to return
+            now (float): Current timestamp for "overdue"
+        
+        Returns:
+            List of (group, count) pairs, largest first
+        """
+        column = getattr(self, self.columns_for(group_by, status)[0])
+        counts = Counter(compress(column, self.mask(status, now)))
+        counts.pop(NO_MEMBER, None)  # Books nobody borrowed, when grouping by member
+        return counts.most_common(k)
+
+# group_by -> Book attribute, and status -> test of a Book, for count_books() on a dict
+GROUP_ATTRIBUTES = {"title": attrgetter("title"), "author": attrgetter("author"),
+                    "member": attrgetter("borrowed_by")}
+STATUS_TESTS = {
+    "all": lambda book, now: True,
+    "available": lambda book, now: book.is_available,
+    "on_loan": lambda book, now: not book.is_available,
+    "overdue": lambda book, now: book.due_at is not None and book.due_at < now,
+}
+
+def count_books(books, group_by, status="all", k=10, now=None):
+    """
+    Count the books with a status per title, author or borrowing member
+    
+    A BookStore is counted through a ColumnarSnapshot of the columns the
+    report reads. Copying columns out of Book objects would cost more than
+    it saves, so a dict of books is counted in one plain pass instead.
+    
+    Args:
+        books (dict or BookStore): book_id -> Book or BookView
+        group_by (str): "title", "author" or "member"
+        status (str): "all", "available", "on_loan" or "overdue"
+        k (int): Number of groups to return
+        now (float): Current timestamp for "overdue" (defaults to time.time())
+    
+    Returns:
+        List of (group, count) pairs, largest first
+    
+    Raises:
+        ValueError: If group_by or status is unknown
+    """
+    columns = ColumnarSnapshot.columns_for(group_by, status)
+    if isinstance(books, BookStore):
+        return snapshot_columns(books, columns).count_by(group_by, status, k, now)
+    key, test = GROUP_ATTRIBUTES[group_by], STATUS_TESTS[status]
+    now = time.time() if now is None else now
+    counts = Counter(key(book) for book in books.values() if test(book, now))
+    counts.pop(None, None)  # Books nobody borrowed, when grouping by member
+    return counts.most_common(k)
+
+def snapshot_columns(store, columns=ColumnarSnapshot.__slots__):
+    """
+    Copy columns of a BookStore into a ColumnarSnapshot
+    
+    The columns are copied with a few memcpy-speed calls, dropping
+    tombstone rows if there are any.
+    
+    Args:
+        store (BookStore): Columnar book store
+        columns (iterable): Names of the columns to copy
+    """
+    if len(store) == len(store.ids):
+        return ColumnarSnapshot(**{name: getattr(store, name)[:] for name in columns})
+    live = list(map(ne, store.state, repeat(DELETED)))
+    return ColumnarSnapshot(**{name: _compress_column(getattr(store, name), live) for name in columns})
+
+def _compress_column(column, selectors):
+    """Keep the entries of a list or array column whose selector is true"""
+    kept = compress(column, selectors)
+    return array(column.typecode, kept) if isinstance(column, array) else list(kept)
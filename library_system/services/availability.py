@@ -0,0 +1,172 @@
+"""Sorted ID sets and the availability index for Library Management System"""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain
+
+class SortedIdSet:
+    """
+    Sorted set of record IDs, kept in sorted chunks
+    
+    A single sorted list makes add() and discard() shift every ID after
+    the one inserted or deleted, which is O(n). Instead the IDs are split
+    into sorted chunks of at most CHUNK_SIZE IDs, with the first ID of
+    each chunk in a separate list: add() and discard() bisect that list
+    and then insert into or delete from one chunk, so they cost
+    O(log n + CHUNK_SIZE). A full chunk is split in two.
+    
+    The set is also a read-only sorted sequence (len(), indexing, slicing),
+    so paginate() can bisect it like a list. Counting is O(1); a page of k
+    IDs after a given ID costs O(log n + k) once the chunk offsets, dropped
+    by every change, are rebuilt in O(n / CHUNK_SIZE).
+    """
+    
+    CHUNK_SIZE = 512  # IDs past which a chunk is split in two
+    
+    def __init__(self):
+        """Initialize an empty set"""
+        self.chunks = []  # Non-empty sorted lists of IDs, each below the next
+        self.firsts = []  # First ID of each chunk
+        self.size = 0
+        self._offsets = None  # Position of the first ID of each chunk, None after a change
+    
+    def add(self, record_id):
+        """Add an ID"""
+        if not self.chunks:
+            self.chunks.append([record_id])
+            self.firsts.append(record_id)
+        else:
+            c = self._chunk_index(record_id)
+            chunk = self.chunks[c]
+            if chunk[-1] < record_id:
+                chunk.append(record_id)
+            else:
+                i = bisect_left(chunk, record_id)
+                if chunk[i] == record_id:
+                    return
+                chunk.insert(i, record_id)
+                if i == 0:
+                    self.firsts[c] = record_id
+            if len(chunk) > self.CHUNK_SIZE:
+                half = len(chunk) // 2
+                self.chunks.insert(c + 1, chunk[half:])
+                self.firsts.insert(c + 1, chunk[half])
+                del chunk[half:]
+        self.size += 1
+        self._offsets = None
+    
+    def discard(self, record_id):
+        """Remove an ID if present"""
+        if not self.chunks:
+            return
+        c = self._chunk_index(record_id)
+        chunk = self.chunks[c]
+        i = bisect_left(chunk, record_id)
+        if i == len(chunk) or chunk[i] != record_id:
+            return
+        del chunk[i]
+        if not chunk:
+            del self.chunks[c]
+            del self.firsts[c]
+        elif i == 0:
+            self.firsts[c] = chunk[0]
+        self.size -= 1
+        self._offsets = None
+    
+    def rebuild_ids(self, ids):
+        """Replace the contents with an iterable of IDs"""
+        ids = sorted(ids)
+        fill = self.CHUNK_SIZE // 2  # Room to grow before the first splits
+        self.chunks = [ids[i:i + fill] for i in range(0, len(ids), fill)]
+        self.firsts = [chunk[0] for chunk in self.chunks]
+        self.size = len(ids)
+        self._offsets = None
+    
+    def _chunk_index(self, record_id):
+        """Return the index of the chunk an ID is or would be in; there is at least one chunk"""
+        return max(bisect_right(self.firsts, record_id) - 1, 0)
+    
+    def _chunk_offsets(self):
+        """Return the position of the first ID of each chunk, plus len(self)"""
+        if self._offsets is None:
+            self._offsets = [0]
+            self._offsets.extend(accumulate(map(len, self.chunks)))
+        return self._offsets
+    
+    def _locate(self, position):
+        """Return (chunk index, index within the chunk) of a position below len(self)"""
+        offsets = self._chunk_offsets()
+        c = bisect_right(offsets, position) - 1
+        return c, position - offsets[c]
+    
+    def bisect_right(self, record_id):
+        """Return the number of IDs less than or equal to record_id"""
+        if not self.chunks:
+            return 0
+        c = self._chunk_index(record_id)
+        return self._chunk_offsets()[c] + bisect_right(self.chunks[c], record_id)
+    
+    def page(self, after=None, limit=None):
+        """
+        Return IDs in ascending order
+        
+        Args:
+            after (int): Only return IDs greater than this one
+            limit (int): Maximum number of IDs to return
+        
+        Returns:
+            List of IDs
+        """
+        start = 0 if after is None else self.bisect_right(after)
+        end = self.size if limit is None else start + limit
+        return self[start:end]
+    
+    def __getitem__(self, index):
+        """Return the ID at a position, or a list of the IDs in a slice"""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.size)
+            if step != 1:
+                return list(self)[index]
+            ids = []
+            if start >= stop:
+                return ids
+            c, i = self._locate(start)
+            while len(ids) < stop - start:
+                ids.extend(self.chunks[c][i:i + stop - start - len(ids)])
+                c, i = c + 1, 0
+            return ids
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("SortedIdSet index out of range")
+        c, i = self._locate(index)
+        return self.chunks[c][i]
+    
+    def __iter__(self):
+        """Iterate over the IDs in ascending order"""
+        return chain.from_iterable(self.chunks)
+    
+    def __contains__(self, record_id):
+        """Check whether an ID is in the set"""
+        if not self.chunks:
+            return False
+        chunk = self.chunks[self._chunk_index(record_id)]
+        i = bisect_left(chunk, record_id)
+        return i < len(chunk) and chunk[i] == record_id
+    
+    def __len__(self):
+        """Return the number of IDs"""
+        return self.size
+
+class AvailabilityIndex(SortedIdSet):
+    """Sorted set of the IDs of books that can be borrowed"""
+    
+    def update(self, book):
+        """Add or discard a book according to its is_available flag"""
+        if book.is_available:
+            self.add(book.book_id)
+        else:
+            self.discard(book.book_id)
+    
+    def rebuild(self, books):
+        """Rebuild the index from an iterable of books"""
+        self.rebuild_ids(book.book_id for book in books if book.is_available)
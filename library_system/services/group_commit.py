@@ -0,0 +1,121 @@
+"""Background group-commit writer for Library Management System"""
+
+import threading
+import time
+from collections import deque
+
+class GroupCommitWriter:
+    """
+    Background thread that coalesces queued writes into one flush
+    
+    Mutations call notify() and return at once. The writer waits until
+    window seconds have passed since the first pending mutation, or until
+    max_ops mutations are pending, then calls flush_fn once for all of
+    them. flush() forces a flush from the calling thread and close()
+    flushes a final time and stops the thread.
+    """
+    
+    RECENT_FLUSHES = 100  # Flush sizes kept for stats()
+    
+    def __init__(self, flush_fn, window=0.05, max_ops=256):
+        """
+        Initialize and start a GroupCommitWriter
+        
+        Args:
+            flush_fn (callable): Writes everything queued and returns the
+                number of records written
+            window (float): Longest time in seconds a mutation waits to be written
+            max_ops (int): Pending mutations that trigger a flush right away
+        """
+        self.flush_fn = flush_fn
+        self.window = window
+        self.max_ops = max_ops
+        self._cond = threading.Condition()
+        self._pending = 0  # Mutations notified since the last flush
+        self._first_pending_at = None
+        self._stopping = False
+        self.flushes = 0
+        self.records = 0
+        self.largest_flush = 0
+        self.recent = deque(maxlen=self.RECENT_FLUSHES)  # Records written by recent flushes
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+    
+    def notify(self, count=1):
+        """Report that count mutations were queued"""
+        with self._cond:
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+            self._pending += count
+            if self._pending == count or self._pending >= self.max_ops:
+                self._cond.notify()
+    
+    def flush(self):
+        """
+        Write everything queued so far before returning
+        
+        Returns:
+            Number of records written by this call
+        """
+        with self._cond:
+            self._pending = 0
+            self._first_pending_at = None
+        return self._flush()
+    
+    def _flush(self):
+        """Call flush_fn and record how many records it absorbed"""
+        written = self.flush_fn()
+        if written:
+            with self._cond:
+                self.flushes += 1
+                self.records += written
+                self.largest_flush = max(self.largest_flush, written)
+                self.recent.append(written)
+        return written
+    
+    def _run(self):
+        """Writer thread: wait for a full window or batch, then flush"""
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                deadline = self._first_pending_at + self.window
+                while self._pending and self._pending < self.max_ops and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._pending:
+                    continue  # flush() got there first
+                self._pending = 0
+                self._first_pending_at = None
+            self._flush()
+    
+    def close(self):
+        """Stop the writer thread and write anything still queued"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+    
+    def stats(self):
+        """
+        Summarize the flushes done so far
+        
+        Returns:
+            dict with flushes, records, mean and largest records per flush,
+            and the sizes of the most recent flushes
+        """
+        with self._cond:
+            return {
+                "flushes": self.flushes,
+                "records": self.records,
+                "mean_per_flush": self.records / self.flushes if self.flushes else 0.0,
+                "largest_flush": self.largest_flush,
+                "recent": list(self.recent),
+                "pending": self._pending,
+            }
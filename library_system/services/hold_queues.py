@@ -0,0 +1,127 @@
+"""Hold queues for Library Management System"""
+
+from bisect import bisect_left
+from collections import deque
+
+class HoldQueues:
+    """
+    First-come, first-served hold queues per book
+    
+    Holds live on the members (Member.holds maps each held book to a
+    ticket), so they are persisted with the member records by whatever
+    storage backend the library uses. This index gathers them per book:
+    a deque of (ticket, member_id) pairs in ticket order, so the next
+    holder is taken off the front in O(1) when the book comes back and a
+    new hold, which gets the next ticket, is appended in O(1).
+    
+    Like MemberDirectory it is rebuilt from the members on load and kept
+    current through add() and remove().
+    """
+    
+    def __init__(self):
+        """Initialize empty HoldQueues"""
+        self.queues = {}  # Dictionary: book_id -> deque of (ticket, member_id), in ticket order
+    
+    def __len__(self):
+        """Return the number of holds in every queue"""
+        return sum(map(len, self.queues.values()))
+    
+    def rebuild(self, members):
+        """Rebuild the queues from an iterable of members"""
+        self.queues = {}
+        for member in members:
+            self.add(member)
+    
+    def add(self, member):
+        """Add every hold of a member"""
+        for book_id, ticket in member.holds.items():
+            self.place(member.user_id, book_id, ticket)
+    
+    def remove(self, member):
+        """Remove every hold of a member (the member keeps them)"""
+        for book_id, ticket in member.holds.items():
+            self.cancel(member.user_id, book_id, ticket)
+    
+    # ==================== QUEUE OPERATIONS ====================
+    
+    def next_ticket(self, book_id):
+        """Return the ticket that puts a new hold at the back of a book's queue"""
+        queue = self.queues.get(book_id)
+        return queue[-1][0] + 1 if queue else 1
+    
+    def place(self, member_id, book_id, ticket):
+        """
+        Add a hold to a book's queue, in ticket order
+        
+        Placing a hold that is already queued changes nothing, so records
+        can be replayed over a snapshot that contains them.
+        
+        Returns:
+            1-based position of the hold
+        """
+        queue = self.queues.setdefault(book_id, deque())
+        entry = (ticket, member_id)
+        if not queue or queue[-1] < entry:
+            queue.append(entry)
+            return len(queue)
+        index = bisect_left(queue, entry)
+        if queue[index] != entry:
+            queue.insert(index, entry)
+        return index + 1
+    
+    def cancel(self, member_id, book_id, ticket):
+        """
+        Take a hold out of a book's queue
+        
+        Returns:
+            True if the hold was queued
+        """
+        queue = self.queues.get(book_id)
+        if not queue:
+            return False
+        try:
+            queue.remove((ticket, member_id))
+        except ValueError:
+            return False
+        if not queue:
+            del self.queues[book_id]
+        return True
+    
+    def pop_next(self, book_id):
+        """
+        Take the first hold off a book's queue in O(1)
+        
+        Returns:
+            (member_id, ticket), or None if nobody holds the book
+        """
+        queue = self.queues.get(book_id)
+        if not queue:
+            return None
+        ticket, member_id = queue.popleft()
+        if not queue:
+            del self.queues[book_id]
+        return member_id, ticket
+    
+    def drop_book(self, book_id):
+        """
+        Remove the queue of a book
+        
+        Returns:
+            List of the (member_id, ticket) pairs that were in the queue, in order
+        """
+        queue = self.queues.pop(book_id, ())
+        return [(member_id, ticket) for ticket, member_id in queue]
+    
+    # ==================== LOOKUPS ====================
+    
+    def queue(self, book_id):
+        """Return the member IDs holding a book, first in line first"""
+        return [member_id for _, member_id in self.queues.get(book_id, ())]
+    
+    def position(self, member_id, book_id, ticket):
+        """Return the 1-based position of a member's hold on a book, or None"""
+        queue = self.queues.get(book_id, ())
+        index = bisect_left(queue, (ticket, member_id))
+        if index < len(queue) and queue[index] == (ticket, member_id):
+            return index + 1
+        return None
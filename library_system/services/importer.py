@@ -0,0 +1,174 @@
+"""Streaming bulk catalog importer for Library Management System"""
+
+import csv
+import json
+import os
+import re
+import time
+from library_system.models.isbn import is_valid_isbn
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+class ImportReport:
+    """Summary of a catalog import"""
+    
+    MAX_REJECT_SAMPLES = 100  # Rejected rows kept for display; the rest are only counted
+    
+    def __init__(self):
+        """Initialize an empty report"""
+        self.rows_read = 0
+        self.imported = 0
+        self.rejected = 0
+        self.rejects = []  # List of (row number, reason) for the first rejected rows
+        self.chunks = 0
+        self.elapsed = 0.0
+    
+    def reject(self, row_number, reason):
+        """Record a rejected row"""
+        self.rejected += 1
+        if len(self.rejects) < self.MAX_REJECT_SAMPLES:
+            self.rejects.append((row_number, reason))
+    
+    @property
+    def rows_per_second(self):
+        """Import throughput in rows per second"""
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+    
+    def __repr__(self):
+        """String representation of ImportReport"""
+        return (f"ImportReport(read: {self.rows_read}, imported: {self.imported}, "
+                f"rejected: {self.rejected}, {self.rows_per_second:.0f} rows/s)")
+
+class CatalogImporter:
+    """Streams books from CSV or JSONL files into a Library in chunks"""
+    
+    FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+    
+    def __init__(self, library, chunk_size=1000, progress=None):
+        """
+        Initialize a CatalogImporter
+        
+        Args:
+            library (Library): Library to import into
+            chunk_size (int): Rows validated and persisted together
+            progress (callable): Called with the ImportReport after each chunk
+        """
+        self.library = library
+        self.chunk_size = chunk_size
+        self.progress = progress
+    
+    def import_file(self, path, fmt=None):
+        """
+        Import a catalog file
+        
+        Only one chunk of rows is held in memory at a time, and each chunk
+        is inserted through Library.add_books with a single persistence flush.
+        
+        Args:
+            path (str): Path of the CSV or JSONL file
+            fmt (str): "csv" or "jsonl"; detected from the extension if None
+        
+        Returns:
+            ImportReport
+        """
+        if fmt is None:
+            fmt = self.FORMATS.get(os.path.splitext(path)[1].lower())
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported catalog format for {path!r}")
+        
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            rows = self._read_csv(f) if fmt == "csv" else self._read_jsonl(f)
+            return self.import_rows(rows)
+    
+    def import_rows(self, rows):
+        """
+        Import an iterable of (row number, record dict or error message) pairs
+        
+        Returns:
+            ImportReport
+        """
+        report = ImportReport()
+        start = time.perf_counter()
+        chunk = []
+        for row_number, record in rows:
+            report.rows_read += 1
+            if isinstance(record, str):
+                report.reject(row_number, record)
+                continue
+            book, reason = self.normalize(record)
+            if book is None:
+                report.reject(row_number, reason)
+                continue
+            chunk.append(book)
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk, report, start)
+                chunk = []
+        if chunk:
+            self._flush(chunk, report, start)
+        report.elapsed = time.perf_counter() - start
+        return report
+    
+    def _flush(self, chunk, report, start):
+        """Insert one validated chunk"""
+        added = self.library.add_books(chunk)
+        report.imported += len(added)
+        report.chunks += 1
+        if len(added) != len(chunk):
+            report.rejected += len(chunk) - len(added)
+        report.elapsed = time.perf_counter() - start
+        if self.progress is not None:
+            self.progress(report)
+    
+    @staticmethod
+    def normalize(record):
+        """
+        Validate and normalize one catalog record
+        
+        Args:
+            record (dict): Raw record; keys are matched case-insensitively
+        
+        Returns:
+            ((title, author, isbn), None) if valid, (None, reason) otherwise
+        """
+        fields = {}
+        for key, value in record.items():
+            if isinstance(key, str):
+                fields[key.strip().lower()] = value
+        
+        values = []
+        for name in ("title", "author", "isbn"):
+            value = fields.get(name)
+            if value is None:
+                return None, f"missing {name}"
+            value = WHITESPACE_RE.sub(" ", str(value)).strip()
+            if not value:
+                return None, f"empty {name}"
+            values.append(value)
+        
+        if not is_valid_isbn(values[2]):
+            return None, f"invalid isbn {values[2]!r}"
+        return tuple(values), None
+    
+    @staticmethod
+    def _read_csv(f):
+        """Yield (row number, record) pairs from a CSV file with a header row"""
+        reader = csv.DictReader(f)
+        for row_number, row in enumerate(reader, start=2):
+            yield row_number, row
+    
+    @staticmethod
+    def _read_jsonl(f):
+        """Yield (row number, record or error message) pairs from a JSONL file"""
+        for row_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row_number, f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield row_number, "record is not an object"
+                continue
+            yield row_number, record
@@ -0,0 +1,41 @@
+"""ISBN index for Library Management System"""
+
+from library_system.models.isbn import isbn_key
+
+class ISBNIndex:
+    """Normalized ISBN -> set of book IDs (a library may own several copies)"""
+    
+    def __init__(self):
+        """Initialize an empty index"""
+        self.book_ids = {}  # Dictionary: ISBN key -> set of book IDs
+    
+    def add(self, book):
+        """Index a book under its normalized ISBN"""
+        self.book_ids.setdefault(isbn_key(book.isbn), set()).add(book.book_id)
+    
+    def remove(self, book):
+        """Remove a book from the index"""
+        key = isbn_key(book.isbn)
+        ids = self.book_ids.get(key)
+        if ids is not None:
+            ids.discard(book.book_id)
+            if not ids:
+                del self.book_ids[key]
+    
+    def rebuild(self, books):
+        """Rebuild the index from an iterable of books"""
+        self.book_ids = {}
+        for book in books:
+            self.add(book)
+    
+    def get(self, isbn):
+        """
+        Look up the books with an ISBN
+        
+        Args:
+            isbn (str): ISBN-10 or ISBN-13, with or without hyphens
+        
+        Returns:
+            Sorted list of book IDs
+        """
+        return sorted(self.book_ids.get(isbn_key(isbn), ()))
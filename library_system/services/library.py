@@ -1,10 +1,30 @@
 """Library service class for Library Management System"""
 
-import json
+import atexit
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
 from library_system.models.book import Book
+from library_system.models.book_store import BookStore
 from library_system.models.member import Member
 from library_system.models.admin import Admin
+from library_system.models.id_allocator import IdAllocator
+from library_system.models.isbn import isbn_key
+from library_system.services.search_index import SearchIndex
+from library_system.services.hold_queues import HoldQueues
+from library_system.services.analytics import CirculationStats, count_books
+from library_system.services.availability import AvailabilityIndex, SortedIdSet
+from library_system.services.isbn_index import ISBNIndex
+from library_system.services.member_directory import MemberDirectory
+from library_system.services.loan_ledger import LoanLedger
+from library_system.services.locking import SnapshotLock, StripedLock
+from library_system.services.group_commit import GroupCommitWriter
+from library_system.services.pagination import Page, paginate
+from library_system.services.query_cache import QueryCache
+from library_system.storage.base import member_from_dict
+from library_system.storage.json_storage import JsonStorage
 
 class Library:
     """Manages all library operations"""
@@ -12,14 +32,116 @@ class Library:
     DATA_DIR = "library_system/data"
     BOOKS_FILE = os.path.join(DATA_DIR, "books.json")
     MEMBERS_FILE = os.path.join(DATA_DIR, "members.json")
+    JOURNAL_FILE = os.path.join(DATA_DIR, "journal.log")
+    LOCK_FILE = os.path.join(DATA_DIR, "library.lock")
+    COMPACT_THRESHOLD = 1024 * 1024  # Journal size (bytes) that triggers compaction
+    LOAN_PERIOD = 14 * 24 * 60 * 60  # Default loan period in seconds
+    FUZZY_LIMIT = 20  # Results of a fuzzy search unless a limit is given
     
-    def __init__(self):
-        """Initialize the Library"""
-        self.books = {}  # Dictionary: book_id -> Book object
+    DB_FILE = os.path.join(DATA_DIR, "library.db")
+    SNAPSHOT_FILE = os.path.join(DATA_DIR, "library.snap")
+    SHARD_DIR = os.path.join(DATA_DIR, "shards")
+    IDS_FILE = os.path.join(DATA_DIR, "ids.json")
+    CIRCULATION_FILE = os.path.join(DATA_DIR, "circulation.json")
+    
+    def __init__(self, data_dir=None, journaled=False, compact_threshold=None, storage=None,
+                 lazy=False, columnar=False, threadsafe=False, lock_stripes=64,
+                 group_commit=None, group_commit_ops=256, shared=False, metrics=None,
+                 search_cache_size=256, search_cache_ttl=None, id_block_size=64):
+        """
+        Initialize the Library
+        
+        Args:
+            data_dir (str): Directory for the data files (defaults to DATA_DIR)
+            journaled (bool): Append each mutation to a journal instead of
+                rewriting the whole snapshot
+            compact_threshold (int): Journal size in bytes that triggers compaction
+            storage (StorageBackend): Backend to use instead of the JSON files
+            lazy (bool): Index record locations at startup and build Book and
+                Member objects only when they are first accessed
+            columnar (bool): Keep books in a compact columnar BookStore and
+                hand out BookView objects (books are then loaded eagerly)
+            threadsafe (bool): Allow calls from several threads at once;
+                borrow/return lock only the book and member involved
+            lock_stripes (int): Number of striped locks in threadsafe mode
+            group_commit (float): If set, mutations return without waiting for
+                storage and a background writer flushes everything queued
+                within this many seconds together (implies threadsafe)
+            group_commit_ops (int): Queued mutations that trigger a group
+                commit before the window ends
+            shared (bool): Share the JSON data files with other processes:
+                mutations run under an inter-process file lock after
+                applying what other processes journaled (implies journaled;
+                not with lazy)
+            metrics (Metrics): Record call counts, latencies and errors of the
+                public operations and of storage calls (None disables it)
+            search_cache_size (int): Search results kept in an LRU cache
+                (0 disables the cache)
+            search_cache_ttl (float): Seconds a cached search result stays
+                valid (None: until the catalog changes)
+            id_block_size (int): Book and member IDs reserved from IDS_FILE
+                at a time
+        """
+        if data_dir is not None:
+            self.DATA_DIR = data_dir
+            self.BOOKS_FILE = os.path.join(data_dir, "books.json")
+            self.MEMBERS_FILE = os.path.join(data_dir, "members.json")
+            self.JOURNAL_FILE = os.path.join(data_dir, "journal.log")
+            self.LOCK_FILE = os.path.join(data_dir, "library.lock")
+            self.DB_FILE = os.path.join(data_dir, "library.db")
+            self.SNAPSHOT_FILE = os.path.join(data_dir, "library.snap")
+            self.SHARD_DIR = os.path.join(data_dir, "shards")
+            self.IDS_FILE = os.path.join(data_dir, "ids.json")
+            self.CIRCULATION_FILE = os.path.join(data_dir, "circulation.json")
+        if compact_threshold is not None:
+            self.COMPACT_THRESHOLD = compact_threshold
+        self.columnar = columnar
+        self.books = BookStore() if columnar else {}  # Dictionary: book_id -> Book object
         self.members = {}  # Dictionary: user_id -> Member/Admin object
         self.current_user = None
+        if shared and (storage is not None or group_commit is not None):
+            raise ValueError("shared mode uses the JSON journal and writes synchronously")
+        if shared and lazy:
+            # Lazy records are byte offsets into books.json, which other processes rewrite
+            raise ValueError("shared mode loads records eagerly")
+        self.shared = shared
+        if storage is None:
+            storage = JsonStorage(self.BOOKS_FILE, self.MEMBERS_FILE,
+                                  self.JOURNAL_FILE if journaled or shared else None,
+                                  self.COMPACT_THRESHOLD,
+                                  self.LOCK_FILE if shared else None)
+        self.storage = storage
+        self.lazy = lazy
+        self.search_index = SearchIndex()
+        self.book_ids = SortedIdSet()  # Every book ID, for paging in ID order
+        self.availability = AvailabilityIndex()
+        self.isbn_index = ISBNIndex()
+        self.directory = MemberDirectory()
+        self.holds = HoldQueues()  # Hold queues per book, built with the member directory
+        self.loans = LoanLedger()
+        self.circulation = CirculationStats(self.CIRCULATION_FILE)  # Borrow counts for reports
+        self.catalog_generation = 0  # Bumped whenever a book's indexed fields may have changed
+        self.search_cache = QueryCache(search_cache_size, search_cache_ttl) if search_cache_size else None
+        self._indexes_ready = False  # Indexes are built on first use in lazy mode
+        self._directory_ready = False
+        self._batch_records = None  # Records deferred by an open batch()
+        self._undo_records = None  # Inverse records used to roll back a batch()
+        self.threadsafe = threadsafe = threadsafe or group_commit is not None
+        self._locks = StripedLock(lock_stripes) if threadsafe else None  # Per-book/member locks
+        self._snapshot_lock = SnapshotLock()  # Shared by mutations, exclusive for snapshots
+        self._index_lock = threading.RLock()  # Guards the book/member maps and the indexes
+        self._write_lock = threading.Lock()  # Serializes calls into the storage backend
+        self._write_queue = deque()  # Records of applied mutations not yet written (threadsafe)
+        self.writer = None  # GroupCommitWriter flushing _write_queue (group_commit)
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.instrument(self)  # Before load_data, so loading is measured too
         self._ensure_data_dir()
+        self.ids = IdAllocator(self.IDS_FILE, id_block_size)  # Mints book and member IDs
         self.load_data()
+        if group_commit is not None:
+            self.writer = GroupCommitWriter(self._flush_queue, group_commit, group_commit_ops)
+            atexit.register(self.writer.close)  # Flush on interpreter exit
     
     def _ensure_data_dir(self):
         """Ensure data directory exists"""
@@ -28,7 +150,7 @@ class Library:
     
     # ==================== BOOK OPERATIONS ====================
     
-    def add_book(self, title, author, isbn):
+    def add_book(self, title, author, isbn, duplicates="allow"):
         """
         Add a new book to the library
         
@@ -36,14 +158,33 @@ class Library:
             title (str): Title of the book
             author (str): Author of the book
             isbn (str): ISBN of the book
+            duplicates (str): What to do when the ISBN is already in the
+                catalog: "allow" (another copy), "flag" (add but warn) or
+                "reject" (do not add)
         
         Returns:
             Book object if successful, None otherwise
         """
         try:
-            book = Book(title, author, isbn)
-            self.books[book.book_id] = book
-            self.save_data()
+            isbn_lock = ("isbn", isbn_key(isbn)) if duplicates != "allow" else None
+            with self._mutating(isbn_lock):
+                if duplicates != "allow":
+                    existing = self.get_books_by_isbn(isbn)
+                    if existing:
+                        ids = ", ".join(str(book.book_id) for book in existing)
+                        if duplicates == "reject":
+                            print(f"ISBN {isbn} is already in the catalog (Book ID: {ids}).")
+                            return None
+                        print(f"Warning: ISBN {isbn} is already in the catalog (Book ID: {ids}).")
+                
+                # A new ID is unknown to other threads, so it needs no lock of its own
+                book = Book(title, author, isbn, self.ids.allocate("book"))
+                with self._index_lock:
+                    self.books[book.book_id] = book
+                    book = self.books[book.book_id]  # The stored view in columnar mode
+                    self._index_book(book)
+                self._track_undo("remove_book", book_id=book.book_id)
+                self._persist("add_book", book=book.to_dict())
             return book
         except Exception as e:
             print(f"Error adding book: {e}")
@@ -53,6 +194,8 @@ class Library:
         """
         Remove a book from the library
         
+        Books on loan cannot be removed.
+        
         Args:
             book_id (int): ID of the book to remove
         
@@ -60,11 +203,27 @@ class Library:
             True if successful, False otherwise
         """
         try:
-            if book_id in self.books:
-                book = self.books.pop(book_id)
-                self.save_data()
-                return True
-            return False
+            with self._mutating(("book", book_id)):
+                self._ensure_directory()
+                with self._index_lock:
+                    book = self.books.get(book_id)
+                    if book is None:
+                        return False
+                    if not book.is_available:  # Checked under the book's lock, so no borrow can slip in
+                        print(f"Book '{book.title}' is on loan and cannot be removed.")
+                        return False
+                    book = self.books.pop(book_id)  # Detached from the store in columnar mode
+                    self._unindex_book(book)
+                    holders = self.holds.drop_book(book_id)
+                    for member_id, _ in holders:
+                        self.members[member_id].cancel_hold(book_id)
+                records = [("remove_book", {"book_id": book_id})]
+                for member_id, ticket in holders:
+                    self._track_undo("hold", member_id=member_id, book_id=book_id, ticket=ticket)
+                    records.append(("cancel_hold", {"member_id": member_id, "book_id": book_id}))
+                self._track_undo("add_book", book=book)
+                self._persist_records(records)
+            return True
         except Exception as e:
             print(f"Error removing book: {e}")
             return False
@@ -79,29 +238,130 @@ class Library:
         Returns:
             Book object or None
         """
+        self.refresh()
         return self.books.get(book_id)
     
-    def search_books(self, keyword, search_type="title"):
+    def get_books_by_isbn(self, isbn):
+        """
+        Get the books with an ISBN
+        
+        ISBN-10 and ISBN-13 forms of the same ISBN, with or without hyphens,
+        find the same books.
+        
+        Args:
+            isbn (str): ISBN to look up
+        
+        Returns:
+            List of Book objects (one per copy)
+        """
+        self.refresh()
+        with self._index_lock:
+            self._ensure_indexes()
+            return [self.books[book_id] for book_id in self.isbn_index.get(isbn)]
+    
+    def search_books(self, keyword, search_type="title", match="substring"):
         """
         Search books by title or author
         
         Args:
             keyword (str): Search keyword
             search_type (str): "title" or "author"
+            match (str): "substring" for a case-insensitive substring match,
+                "prefix" to match every keyword word against word prefixes, or
+                "fuzzy" for the FUZZY_LIMIT most similar books despite typos
+        
+        Returns:
+            List of matching Book objects (best first for "fuzzy")
+        """
+        self.refresh()
+        with self._index_lock:
+            return [self.books[book_id] for book_id in self._search_ids(keyword, search_type, match)]
+    
+    def fuzzy_search_books(self, keyword, search_type="title", limit=None):
+        """
+        Find the books whose title or author is most similar to keyword
+        
+        Tolerates typos and word order ("Clen Code", "Rossum Guido") by
+        comparing character trigrams.
+        
+        Args:
+            keyword (str): Search text
+            search_type (str): "title" or "author"
+            limit (int): Maximum number of results (defaults to FUZZY_LIMIT)
+        
+        Returns:
+            List of (Book, similarity from 0.0 to 1.0) pairs, best first
+        """
+        self.refresh()
+        limit = limit or self.FUZZY_LIMIT
+        with self._index_lock:
+            self._ensure_indexes()
+            key = (self._query_key(keyword, "fuzzy"), search_type, "fuzzy-scored", limit)
+            ranked = self._cached(key, lambda: self.search_index.fuzzy_search(
+                keyword, search_type, self.books, limit))
+            return [(self.books[book_id], score) for book_id, score in ranked]
+    
+    def search_cache_stats(self):
+        """
+        Report how often searches were answered from the cache
         
         Returns:
-            List of matching Book objects
+            dict from QueryCache.stats(), or None if the cache is disabled
+        """
+        return None if self.search_cache is None else self.search_cache.stats()
+    
+    @staticmethod
+    def _query_key(keyword, match):
+        """
+        Normalize a search keyword for the cache
+        
+        Case never matters. Whitespace only matters to substring searches,
+        where "code " and "code" match different titles.
         """
+        keyword = keyword.lower()
+        return keyword if match == "substring" else " ".join(keyword.split())
+    
+    def _cached(self, key, compute):
+        """Return a cached search result or compute and cache it; the caller holds the index lock"""
+        if self.search_cache is None:
+            return compute()
+        result = self.search_cache.get(key, self.catalog_generation)
+        if result is None:
+            result = compute()
+            self.search_cache.put(key, self.catalog_generation, result)
+        return result
+    
+    def _search_ids(self, keyword, search_type, match):
+        """
+        Return the IDs of matching books; the caller holds the index lock
+        
+        IDs are sorted, except for "fuzzy" where they are ranked best first.
+        Results are cached until the catalog changes.
+        """
+        self._ensure_indexes()
+        key = (self._query_key(keyword, match), search_type, match)
+        return self._cached(key, lambda: self._find_ids(keyword, search_type, match))
+    
+    def _find_ids(self, keyword, search_type, match):
+        """Run a search against the indexes; see _search_ids"""
+        if match == "fuzzy":
+            ranked = self.search_index.fuzzy_search(keyword, search_type, self.books, self.FUZZY_LIMIT)
+            return [book_id for book_id, _ in ranked]
+        book_ids = self.search_index.search(keyword, search_type, self.books, match)
+        if book_ids is not None:
+            return book_ids
+        
+        # Keyword has no word characters - fall back to a full scan
         results = []
         keyword_lower = keyword.lower()
         
         for book in self.books.values():
             if search_type == "title" and keyword_lower in book.title.lower():
-                results.append(book)
+                results.append(book.book_id)
             elif search_type == "author" and keyword_lower in book.author.lower():
-                results.append(book)
+                results.append(book.book_id)
         
-        return results
+        return sorted(results)
     
     def list_all_books(self):
         """
@@ -110,16 +370,154 @@ class Library:
         Returns:
             List of Book objects
         """
-        return list(self.books.values())
+        self.refresh()
+        with self._index_lock:
+            return list(self.books.values())
     
-    def get_available_books(self):
+    def get_available_books(self, limit=None, after=None):
         """
-        Get list of available books
+        Get list of available books in ID order
+        
+        Args:
+            limit (int): Maximum number of books to return (all if None)
+            after (int): Only return books with an ID greater than this one
         
         Returns:
             List of available Book objects
         """
-        return [book for book in self.books.values() if book.is_available]
+        self.refresh()
+        with self._index_lock:
+            self._ensure_indexes()
+            return [self.books[book_id] for book_id in self.availability.page(after, limit)]
+    
+    def count_available_books(self):
+        """
+        Count available books
+        
+        Returns:
+            Number of available books
+        """
+        self.refresh()
+        with self._index_lock:
+            self._ensure_indexes()
+            return len(self.availability)
+    
+    def page_books(self, page_size=20, cursor=None):
+        """
+        Get one page of all books in ID order
+        
+        Args:
+            page_size (int): Books per page
+            cursor (str): next_cursor or prev_cursor of an earlier page
+                (None for the first page)
+        
+        Returns:
+            Page of Book objects
+        """
+        self.refresh()
+        with self._index_lock:
+            self._ensure_indexes()
+            return self._page(self.book_ids, page_size, cursor, "books", self.books.__getitem__)
+    
+    def page_available_books(self, page_size=20, cursor=None):
+        """
+        Get one page of the available books in ID order
+        
+        Args:
+            page_size (int): Books per page
+            cursor (str): Cursor of an earlier page (None for the first page)
+        
+        Returns:
+            Page of Book objects
+        """
+        self.refresh()
+        with self._index_lock:
+            self._ensure_indexes()
+            return self._page(self.availability, page_size, cursor, "available",
+                              self.books.__getitem__)
+    
+    def page_search_books(self, keyword, search_type="title", match="substring", page_size=20,
+                          cursor=None):
+        """
+        Get one page of search_books() results in ID order (rank order for "fuzzy")
+        
+        Args:
+            keyword (str): Search keyword
+            search_type (str): "title" or "author"
+            match (str): "substring", "prefix" or "fuzzy"
+            page_size (int): Books per page
+            cursor (str): Cursor of an earlier page of the same search
+        
+        Returns:
+            Page of Book objects
+        """
+        self.refresh()
+        with self._index_lock:
+            book_ids = self._search_ids(keyword, search_type, match)
+            if match == "fuzzy":  # Page by rank rather than by ID
+                return self._page(list(enumerate(book_ids)), page_size, cursor, "search",
+                                  lambda key: self.books[key[1]])
+            return self._page(book_ids, page_size, cursor, "search", self.books.__getitem__)
+    
+    def iter_books(self, batch_size=1000):
+        """
+        Iterate over all books in ID order without building one big list
+        
+        Books are fetched batch_size at a time, so no lock is held while
+        the caller processes them.
+        
+        Args:
+            batch_size (int): Books fetched per step
+        
+        Yields:
+            Book objects
+        """
+        return self._iterate(self.page_books, batch_size)
+    
+    def iter_available_books(self, batch_size=1000):
+        """
+        Iterate over the available books in ID order
+        
+        Args:
+            batch_size (int): Books fetched per step
+        
+        Yields:
+            Book objects
+        """
+        return self._iterate(self.page_available_books, batch_size)
+    
+    def iter_search_books(self, keyword, search_type="title", match="substring", batch_size=1000):
+        """
+        Iterate over search_books() results in ID order
+        
+        Args:
+            keyword (str): Search keyword
+            search_type (str): "title" or "author"
+            match (str): "substring" or "prefix"
+            batch_size (int): Books fetched per step
+        
+        Yields:
+            Book objects
+        """
+        return self._iterate(lambda size, cursor: self.page_search_books(keyword, search_type, match,
+                                                                         size, cursor), batch_size)
+    
+    @staticmethod
+    def _page(keys, page_size, cursor, listing, lookup):
+        """Build a Page of lookup(key) for one page of sorted keys"""
+        page_keys, next_cursor, prev_cursor = paginate(keys, page_size, cursor, listing)
+        return Page([lookup(key) for key in page_keys], next_cursor, prev_cursor, len(keys))
+    
+    @staticmethod
+    def _iterate(fetch_page, batch_size):
+        """Yield every record of a paged listing, one fetch_page(size, cursor) at a time"""
+        cursor = None
+        while True:
+            page = fetch_page(batch_size, cursor)
+            yield from page.items
+            cursor = page.next_cursor
+            if cursor is None:
+                return
     
     # ==================== MEMBER OPERATIONS ====================
     
@@ -136,18 +534,112 @@ class Library:
             Member/Admin object if successful, None otherwise
         """
         try:
-            if is_admin:
-                member = Admin(name, email)
-            else:
-                member = Member(name, email)
-            
-            self.members[member.user_id] = member
-            self.save_data()
+            with self._mutating(("email", MemberDirectory.email_key(email))):
+                existing = self.get_member_by_email(email)
+                if existing is not None:
+                    print(f"Email {email} is already registered (Member ID: {existing.user_id}).")
+                    return None
+                
+                user_id = self.ids.allocate("user")
+                with self._index_lock:
+                    if is_admin:
+                        member = Admin(name, email, user_id)
+                    else:
+                        member = Member(name, email, user_id)
+                    self.members[member.user_id] = member
+                    self._index_member(member)
+                self._track_undo("remove_member", user_id=member.user_id)
+                self._persist("add_member", member=member.to_dict())
             return member
         except Exception as e:
             print(f"Error adding member: {e}")
             return None
     
+    def remove_member(self, user_id):
+        """
+        Remove a member from the library
+        
+        Members who still have borrowed books cannot be removed.
+        
+        Args:
+            user_id (int): ID of the member to remove
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            with self._mutating(("member", user_id)):
+                member = self.get_member(user_id)
+                if member is None:
+                    return False
+                with self._index_lock:  # Checked with the lock held, so a hold hand-off cannot slip in
+                    if member.borrowed_books:
+                        print(f"{member.name} still has {len(member.borrowed_books)} borrowed book(s).")
+                        return False
+                    del self.members[user_id]
+                    self._unindex_member(member)  # Takes its holds out of the queues
+                self._track_undo("add_member", member=member)
+                self._persist("remove_member", user_id=user_id)
+            return True
+        except Exception as e:
+            print(f"Error removing member: {e}")
+            return False
+    
+    def add_books(self, books):
+        """
+        Add many books in a single batch
+        
+        Args:
+            books (iterable): (title, author, isbn) tuples or dicts with those keys
+        
+        Returns:
+            List of added Book objects, or an empty list if the batch was
+            rolled back
+        """
+        try:
+            added = []
+            with self.batch():
+                for item in books:
+                    if isinstance(item, dict):
+                        book = self.add_book(item["title"], item["author"], item["isbn"])
+                    else:
+                        book = self.add_book(*item)
+                    if book is None:
+                        raise ValueError(f"could not add book {item!r}")
+                    added.append(book)
+            return added
+        except Exception as e:
+            print(f"Error adding books: {e}")
+            return []
+    
+    def add_members(self, members):
+        """
+        Add many members in a single batch
+        
+        Args:
+            members (iterable): (name, email[, is_admin]) tuples or dicts with
+                those keys
+        
+        Returns:
+            List of added Member/Admin objects, or an empty list if the batch
+            was rolled back
+        """
+        try:
+            added = []
+            with self.batch():
+                for item in members:
+                    if isinstance(item, dict):
+                        member = self.add_member(item["name"], item["email"], item.get("is_admin", False))
+                    else:
+                        member = self.add_member(*item)
+                    if member is None:
+                        raise ValueError(f"could not add member {item!r}")
+                    added.append(member)
+            return added
+        except Exception as e:
+            print(f"Error adding members: {e}")
+            return []
+    
     def get_member(self, user_id):
         """
         Get a member by ID
@@ -158,8 +650,42 @@ class Library:
         Returns:
             Member/Admin object or None
         """
+        self.refresh()
         return self.members.get(user_id)
     
+    def get_member_by_email(self, email):
+        """
+        Get a member by email (case-insensitive)
+        
+        Args:
+            email (str): Email of the member
+        
+        Returns:
+            Member/Admin object or None
+        """
+        self.refresh()
+        with self._index_lock:
+            self._ensure_directory()
+            user_id = self.directory.get_by_email(email)
+            return None if user_id is None else self.members[user_id]
+    
+    def find_members(self, name_prefix="", limit=None):
+        """
+        Find members by name prefix, sorted by name
+        
+        Args:
+            name_prefix (str): Case-insensitive prefix of the name or of any
+                later word of it ("" lists everyone)
+            limit (int): Maximum number of members to return
+        
+        Returns:
+            List of Member/Admin objects
+        """
+        self.refresh()
+        with self._index_lock:
+            self._ensure_directory()
+            return [self.members[user_id] for user_id in self.directory.find_by_name(name_prefix, limit)]
+    
     def list_all_members(self):
         """
         Get list of all members
@@ -167,7 +693,44 @@ class Library:
         Returns:
             List of Member/Admin objects
         """
-        return list(self.members.values())
+        self.refresh()
+        with self._index_lock:
+            return list(self.members.values())
+    
+    def page_members(self, name_prefix="", page_size=20, cursor=None):
+        """
+        Get one page of members in name order
+        
+        Args:
+            name_prefix (str): Case-insensitive prefix of the name or of any
+                later word of it ("" lists everyone)
+            page_size (int): Members per page
+            cursor (str): Cursor of an earlier page with the same prefix
+        
+        Returns:
+            Page of Member/Admin objects
+        """
+        self.refresh()
+        with self._index_lock:
+            self._ensure_directory()
+            if name_prefix.strip():
+                keys = sorted((self.directory.name_key(self.members[user_id].name), user_id)
+                              for user_id in self.directory.find_by_name(name_prefix))
+            else:
+                keys = self.directory.full_names  # Already (name key, user_id) in order
+            return self._page(keys, page_size, cursor, "members", lambda key: self.members[key[1]])
+    
+    def iter_members(self, batch_size=1000):
+        """
+        Iterate over all members in name order
+        
+        Args:
+            batch_size (int): Members fetched per step
+        
+        Yields:
+            Member/Admin objects
+        """
+        return self._iterate(lambda size, cursor: self.page_members("", size, cursor), batch_size)
     
     def authenticate_member(self, user_id):
         """
@@ -179,6 +742,7 @@ class Library:
         Returns:
             Member/Admin object if found, None otherwise
         """
+        self.refresh()
         if user_id in self.members:
             self.current_user = self.members[user_id]
             return self.current_user
@@ -186,39 +750,38 @@ class Library:
     
     # ==================== BORROW/RETURN OPERATIONS ====================
     
-    def borrow_book(self, member_id, book_id):
+    def borrow_book(self, member_id, book_id, due_at=None):
         """
         Borrow a book for a member
         
         Args:
             member_id (int): ID of the member
             book_id (int): ID of the book
+            due_at (float): Due timestamp (defaults to now + LOAN_PERIOD)
         
         Returns:
             True if successful, False otherwise
         """
         try:
-            member = self.get_member(member_id)
-            book = self.get_book(book_id)
-            
-            if not member:
-                print(f"Member {member_id} not found.")
-                return False
-            
-            if not book:
-                print(f"Book {book_id} not found.")
-                return False
-            
-            if not book.is_available:
-                print(f"Book '{book.title}' is not available.")
-                return False
-            
-            # Update book and member
-            book.is_available = False
-            book.borrowed_by = member_id
-            member.borrow_book(book_id)
-            
-            self.save_data()
+            with self._mutating(("book", book_id), ("member", member_id)):
+                member = self.get_member(member_id)
+                book = self.get_book(book_id)
+                
+                if not member:
+                    print(f"Member {member_id} not found.")
+                    return False
+                
+                if not book:
+                    print(f"Book {book_id} not found.")
+                    return False
+                
+                if not book.is_available:
+                    print(f"Book '{book.title}' is not available; place a hold to join the queue.")
+                    return False
+                
+                records = [self._lend(member, book, due_at)]
+                self._drop_hold(member, book_id, records)  # If borrowed before its turn came
+                self._persist_records(records)
             print(f"✓ {member.name} successfully borrowed '{book.title}'")
             return True
         except Exception as e:
@@ -237,80 +800,840 @@ class Library:
             True if successful, False otherwise
         """
         try:
-            member = self.get_member(member_id)
-            book = self.get_book(book_id)
-            
-            if not member:
-                print(f"Member {member_id} not found.")
-                return False
-            
-            if not book:
-                print(f"Book {book_id} not found.")
-                return False
-            
-            if book_id not in member.borrowed_books:
-                print(f"{member.name} has not borrowed this book.")
-                return False
-            
-            # Update book and member
-            book.is_available = True
-            book.borrowed_by = None
-            member.return_book(book_id)
-            
-            self.save_data()
+            with self._mutating(("book", book_id), ("member", member_id)):
+                member = self.get_member(member_id)
+                book = self.get_book(book_id)
+                
+                if not member:
+                    print(f"Member {member_id} not found.")
+                    return False
+                
+                if not book:
+                    print(f"Book {book_id} not found.")
+                    return False
+                
+                if not member.has_borrowed(book_id):
+                    print(f"{member.name} has not borrowed this book.")
+                    return False
+                
+                # Update book and member, closing the loan
+                self._track_undo("borrow", member_id=member_id, book_id=book_id,
+                                 borrowed_at=book.borrowed_at, due_at=book.due_at)
+                with self._index_lock:
+                    book.is_available = True
+                    book.borrowed_by = None
+                    book.borrowed_at = None
+                    book.due_at = None
+                    member.return_book(book_id)
+                    self._loan_changed(book)
+                
+                records = [("return", {"member_id": member_id, "book_id": book_id})]
+                holder = self._hand_off(book, records)
+                self._persist_records(records)  # Written together, so the hand-off is all or nothing
             print(f"✓ {member.name} successfully returned '{book.title}'")
+            if holder is not None:
+                print(f"✓ '{book.title}' handed to {holder.name}, next in the hold queue")
             return True
         except Exception as e:
             print(f"Error returning book: {e}")
             return False
     
+    def _lend(self, member, book, due_at=None):
+        """
+        Record a loan of an available book; the caller holds the mutation locks
+        
+        Args:
+            member (Member): Borrowing member
+            book (Book): Book to lend
+            due_at (float): Due timestamp (defaults to now + LOAN_PERIOD)
+        
+        Returns:
+            The "borrow" record, for the caller to persist
+        """
+        borrowed_at = time.time()
+        if due_at is None:
+            due_at = borrowed_at + self.LOAN_PERIOD
+        with self._index_lock:
+            book.is_available = False
+            book.borrowed_by = member.user_id
+            book.borrowed_at = borrowed_at
+            book.due_at = due_at
+            member.borrow_book(book.book_id)
+            self._loan_changed(book)
+        
+        self._track_undo("return", member_id=member.user_id, book_id=book.book_id)
+        return ("borrow", {"member_id": member.user_id, "book_id": book.book_id,
+                           "borrowed_at": borrowed_at, "due_at": due_at})
+    
+    def _hand_off(self, book, records):
+        """
+        Lend a returned book to the first member in its hold queue
+        
+        The holder is taken off the queue and lent the book under the index
+        lock, which remove_member also holds while it checks for loans and
+        takes the member's holds out of the queues, so the book can never
+        go to a member removed in between.
+        
+        Args:
+            book (Book): The returned book
+            records (list): Records of the return; the "cancel_hold" and
+                "borrow" records of the hand-off are appended
+        
+        Returns:
+            The member who now has the book, or None if nobody was waiting
+        """
+        self._ensure_directory()
+        with self._index_lock:
+            entry = self.holds.pop_next(book.book_id)
+            if entry is None:
+                return None
+            holder = self.members[entry[0]]
+            self._drop_hold(holder, book.book_id, records)
+            records.append(self._lend(holder, book))
+        return holder
+    
+    # ==================== HOLD OPERATIONS ====================
+    
+    def place_hold(self, member_id, book_id):
+        """
+        Join the hold queue of a book that is on loan
+        
+        When the book is returned it is lent to the first member in its
+        queue straight away.
+        
+        Args:
+            member_id (int): ID of the member
+            book_id (int): ID of the book
+        
+        Returns:
+            1-based position in the queue if successful, None otherwise
+        """
+        try:
+            with self._mutating(("book", book_id), ("member", member_id)):
+                member = self.get_member(member_id)
+                book = self.get_book(book_id)
+                
+                if not member:
+                    print(f"Member {member_id} not found.")
+                    return None
+                
+                if not book:
+                    print(f"Book {book_id} not found.")
+                    return None
+                
+                if book.is_available:
+                    print(f"Book '{book.title}' is available; borrow it instead.")
+                    return None
+                
+                if member.has_borrowed(book_id):
+                    print(f"{member.name} already has '{book.title}'.")
+                    return None
+                
+                if member.has_hold(book_id):
+                    print(f"{member.name} already holds '{book.title}'.")
+                    return None
+                
+                self._ensure_directory()
+                with self._index_lock:
+                    ticket = self.holds.next_ticket(book_id)
+                    position = self._add_hold(member, book_id, ticket)
+                self._track_undo("cancel_hold", member_id=member_id, book_id=book_id)
+                self._persist("hold", member_id=member_id, book_id=book_id, ticket=ticket)
+            print(f"✓ {member.name} is number {position} in line for '{book.title}'")
+            return position
+        except Exception as e:
+            print(f"Error placing hold: {e}")
+            return None
+    
+    def cancel_hold(self, member_id, book_id):
+        """
+        Leave the hold queue of a book
+        
+        Args:
+            member_id (int): ID of the member
+            book_id (int): ID of the book
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            with self._mutating(("book", book_id), ("member", member_id)):
+                member = self.get_member(member_id)
+                records = []
+                if member is None or not self._drop_hold(member, book_id, records):
+                    print(f"Member {member_id} has no hold on book {book_id}.")
+                    return False
+                self._persist_records(records)
+            return True
+        except Exception as e:
+            print(f"Error cancelling hold: {e}")
+            return False
+    
+    def get_holds(self, member_id):
+        """
+        Get the holds of a member, in the order they were placed
+        
+        Args:
+            member_id (int): ID of the member
+        
+        Returns:
+            List of (book_id, 1-based position in the queue) pairs
+        """
+        self.refresh()
+        self._ensure_directory()
+        with self._index_lock:
+            member = self.members.get(member_id)
+            if member is None:
+                return []
+            return [(book_id, self.holds.position(member_id, book_id, ticket))
+                    for book_id, ticket in member.holds.items()]
+    
+    def get_hold_queue(self, book_id):
+        """
+        Get the members waiting for a book, first in line first
+        
+        Args:
+            book_id (int): ID of the book
+        
+        Returns:
+            List of member IDs
+        """
+        self.refresh()
+        self._ensure_directory()
+        with self._index_lock:
+            return self.holds.queue(book_id)
+    
+    def _drop_hold(self, member, book_id, records):
+        """
+        Cancel a member's hold so an open batch can restore it
+        
+        Args:
+            member (Member): Member who may hold the book
+            book_id (int): ID of the book
+            records (list): The "cancel_hold" record is appended, for the
+                caller to persist with the rest of its mutation
+        
+        Returns:
+            True if the member held the book
+        """
+        with self._index_lock:
+            ticket = self._remove_hold(member, book_id)
+        if ticket is None:
+            return False
+        self._track_undo("hold", member_id=member.user_id, book_id=book_id, ticket=ticket)
+        records.append(("cancel_hold", {"member_id": member.user_id, "book_id": book_id}))
+        return True
+    
+    def _add_hold(self, member, book_id, ticket):
+        """
+        Give a member a hold and queue it; the caller holds the index lock
+        
+        Returns:
+            1-based position of the hold, or None if the queues are not built yet
+        """
+        self._remove_hold(member, book_id)
+        member.place_hold(book_id, ticket)
+        if self._directory_ready:
+            return self.holds.place(member.user_id, book_id, ticket)
+        return None
+    
+    def _remove_hold(self, member, book_id):
+        """
+        Take a member's hold away and out of its queue; the caller holds the index lock
+        
+        Returns:
+            Ticket of the hold, or None if the member did not hold the book
+        """
+        ticket = member.cancel_hold(book_id)
+        if ticket is not None and self._directory_ready:
+            self.holds.cancel(member.user_id, book_id, ticket)
+        return ticket
+    
+    def get_loan(self, book_id):
+        """
+        Get the active loan of a book
+        
+        Args:
+            book_id (int): ID of the book
+        
+        Returns:
+            Loan object, or None if the book is not on loan
+        """
+        self.refresh()
+        with self._index_lock:
+            self._ensure_indexes()
+            return self.loans.get(book_id)
+    
+    def get_loans_due_before(self, timestamp, limit=None):
+        """
+        Get active loans due before a timestamp, earliest first
+        
+        Args:
+            timestamp (float): Upper bound for the due date
+            limit (int): Maximum number of loans to return
+        
+        Returns:
+            List of Loan objects
+        """
+        self.refresh()
+        with self._index_lock:
+            self._ensure_indexes()
+            return self.loans.due_before(timestamp, limit)
+    
+    def get_overdue_loans(self, limit=None, now=None):
+        """
+        Get the loans that are past their due date, most overdue first
+        
+        Args:
+            limit (int): Maximum number of loans to return
+            now (float): Current timestamp (defaults to time.time())
+        
+        Returns:
+            List of Loan objects
+        """
+        return self.get_loans_due_before(time.time() if now is None else now, limit)
+    
+    # ==================== CIRCULATION REPORTS ====================
+    
+    def circulation_report(self, k=10):
+        """
+        Get the top-k circulation figures, kept current as books move
+        
+        Args:
+            k (int): Number of entries in each list
+        
+        Returns:
+            dict with "most_borrowed_titles" [(title, borrows)],
+            "author_utilization" [(author, copies on loan, copies)] and
+            "most_active_members" [(member_id, name, active loans)]
+        """
+        self.refresh()
+        with self._index_lock:
+            self._ensure_indexes()
+            if self.shared:
+                self.circulation.load()  # Pick up the counts other processes saved
+            circulation = self.circulation
+            return {
+                "most_borrowed_titles": circulation.most_borrowed_titles(k),
+                "author_utilization": circulation.author_utilization(k),
+                "most_active_members": [(member_id, self._member_name(member_id), loans)
+                                        for member_id, loans in circulation.most_active_members(k)],
+            }
+    
+    def adhoc_report(self, group_by="author", status="on_loan", k=10, now=None):
+        """
+        Count books with a status per title, author or borrowing member
+        
+        Runs one pass over the catalog (over a columnar snapshot with
+        columnar=True), so any grouping can be asked for without a counter
+        kept for it.
+        
+        Args:
+            group_by (str): "title", "author" or "member"
+            status (str): "all", "available", "on_loan" or "overdue"
+            k (int): Number of groups to return
+            now (float): Current timestamp for "overdue" (defaults to time.time())
+        
+        Returns:
+            List of (group, count) pairs, largest first; members are given
+            as (member_id, name) pairs
+        
+        Raises:
+            ValueError: If group_by or status is not one of the above
+        """
+        self.refresh()
+        with self._index_lock:
+            counts = count_books(self.books, group_by, status, k, now)
+        if group_by == "member":
+            return [((member_id, self._member_name(member_id)), count) for member_id, count in counts]
+        return counts
+    
+    def _member_name(self, member_id):
+        """Return a member's name, or a placeholder for a removed member"""
+        member = self.members.get(member_id)
+        return member.name if member else f"Member #{member_id}"
+    
     # ==================== FILE OPERATIONS ====================
     
+    def _persist(self, op, **data):
+        """
+        Persist a single mutation through the storage backend
+        
+        Args:
+            op (str): Name of the operation
+            **data: Operation payload
+        """
+        self._persist_records([(op, data)])
+    
+    def _persist_records(self, records):
+        """
+        Persist the records of one mutation in a single storage write
+        
+        Args:
+            records (list): (op, data) pairs in the order they were applied
+        """
+        if self._batch_records is not None:
+            self._batch_records.extend(records)
+            return
+        if self._locks is not None:
+            self._write_queue.extend(records)  # Written when the mutation completes, all in one flush
+            return
+        self._write_records(records)
+    
+    @contextmanager
+    def _mutating(self, *keys):
+        """
+        Serialize a mutation against others touching the same keys
+        
+        Without threadsafe this is a no-op. Otherwise the block runs under
+        the shared side of the snapshot lock while holding the stripes of
+        keys (such as ("book", book_id)), which makes check-then-set
+        sequences atomic per book and per member. Records queued by the
+        block are written after every lock is released.
+        
+        Args:
+            *keys: Lock keys; None entries are ignored
+        """
+        if self._locks is None:
+            with self._process_lock():
+                yield
+            return
+        with self._process_lock():
+            try:
+                with self._snapshot_lock.shared(), self._locks.holding(*keys):
+                    yield
+            finally:
+                self._queued()
+    
+    @contextmanager
+    def _process_lock(self):
+        """
+        Hold the inter-process lock and catch up with other processes
+        
+        A no-op unless shared. Taken outside every other lock, and records
+        are written before it is released, so processes see each other's
+        mutations in order.
+        """
+        if not self.shared:
+            yield
+            return
+        with self.storage.lock():
+            self._apply_changes()
+            yield
+    
+    def refresh(self):
+        """
+        Apply the mutations other processes made to shared data files
+        
+        Only the journal records written since the last refresh are read
+        and applied; the full data is reloaded only after falling more than
+        one compaction behind.
+        
+        Returns:
+            True if anything changed
+        """
+        if not self.shared or not self.storage.has_changes():
+            return False
+        with self.storage.lock(exclusive=False):
+            return self._apply_changes()
+    
+    def _apply_changes(self):
+        """Apply other processes' records; the caller holds storage.lock()"""
+        records = self.storage.changes()
+        if records is None:
+            with self._index_lock:
+                self.books.clear()
+                self.members.clear()
+                self.load_data()
+            return True
+        for record in records:
+            self._apply_record(record)
+        return bool(records)
+    
+    def _write_records(self, records):
+        """Hand mutation records to the storage backend"""
+        if not records:
+            return
+        if self._locks is not None:
+            self._write_queue.extend(records)
+            self._queued(len(records))
+            return
+        try:
+            self.storage.write(records, self.books, self.members)
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            return
+        self._count_borrows(records)
+    
+    def _queued(self, count=1):
+        """Write queued records now, or leave them to the group-commit writer"""
+        if self.writer is None:
+            self._flush_queue()
+        elif self._write_queue:
+            self.writer.notify(count)
+    
+    def flush(self):
+        """
+        Write every mutation made so far before returning
+        
+        Only needed with group_commit, where mutations return before they
+        are written.
+        
+        Returns:
+            Number of records written
+        """
+        if self.writer is not None:
+            return self.writer.flush()
+        return self._flush_queue()
+    
+    def write_stats(self):
+        """
+        Report how many mutations each group commit absorbed
+        
+        Returns:
+            dict from GroupCommitWriter.stats(), or None without group_commit
+        """
+        return None if self.writer is None else self.writer.stats()
+    
+    def _drain_queue(self):
+        """Remove and return the queued records, oldest first"""
+        records = []
+        while self._write_queue:
+            records.append(self._write_queue.popleft())
+        return records
+    
+    def _flush_queue(self):
+        """
+        Write the records queued by completed mutations (threadsafe mode)
+        
+        Records are queued in the order their mutations were applied and
+        whichever thread gets the write lock first writes all of them, so
+        concurrent mutations share one storage call. A write that makes the
+        backend rewrite its snapshot is done under the exclusive side of the
+        snapshot lock instead, so the snapshot never sees half a mutation.
+        
+        Returns:
+            Number of records written
+        """
+        try:
+            with self._write_lock:
+                if not self._write_queue:
+                    return 0
+                if not self.storage.will_snapshot():
+                    records = self._drain_queue()
+                    self.storage.write(records, self.books, self.members)
+                    self._count_borrows(records)
+                    return len(records)
+            with self._snapshot_lock.exclusive(), self._write_lock:
+                records = self._drain_queue()
+                if records:
+                    self.storage.write(records, self.books, self.members)
+                    self._count_borrows(records)
+                return len(records)
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            return 0
+    
+    def _track_undo(self, op, **data):
+        """Remember the inverse of a mutation so an open batch can roll it back"""
+        if self._undo_records is not None:
+            self._undo_records.append(dict(data, op=op))
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group many mutations into a single persistence flush
+        
+        Mutations inside the block apply in memory immediately and are
+        persisted once when the outermost batch exits. If the block raises,
+        its mutations are rolled back in memory and nothing is written.
+        Batches may be nested; an inner batch that raises only rolls back
+        its own mutations. In threadsafe mode a batch holds every other
+        thread's mutations off until it exits.
+        
+        Example:
+            with library.batch():
+                library.add_book(...)
+                library.add_member(...)
+        """
+        guard = nullcontext() if self._locks is None else self._snapshot_lock.exclusive()
+        with self._process_lock(), guard, self._batch():
+            yield self
+    
+    @contextmanager
+    def _batch(self):
+        """Open a batch; see batch()"""
+        outermost = self._batch_records is None
+        if outermost:
+            self._batch_records = []
+            self._undo_records = []
+        record_mark = len(self._batch_records)
+        undo_mark = len(self._undo_records)
+        try:
+            yield self
+        except BaseException:
+            while len(self._undo_records) > undo_mark:
+                self._apply_record(self._undo_records.pop())
+            del self._batch_records[record_mark:]
+            if outermost:
+                self._batch_records = self._undo_records = None
+            raise
+        if outermost:
+            records = self._batch_records
+            self._batch_records = self._undo_records = None
+            self._write_records(records)
+    
+    def _save_circulation(self):
+        """Fold the borrows logged since the last save into CIRCULATION_FILE"""
+        with self._index_lock:
+            self.circulation.save()
+    
+    def _count_borrows(self, records):
+        """
+        Add the borrows among records just written to the circulation counts
+        
+        Called once the storage backend has the records, under the same
+        locks as the write (so appends are serialized with
+        _save_circulation()), but the log is appended outside the index
+        lock.
+        """
+        try:
+            with self._index_lock:
+                borrowed = (self.books.get(data["book_id"]) for op, data in records if op == "borrow")
+                entries = self.circulation.record_borrows([book for book in borrowed if book is not None])
+            if self.circulation.append_log(entries):
+                self._save_circulation()
+        except Exception as e:
+            print(f"Error saving circulation counts: {e}")
+    
     def save_data(self):
-        """Save books and members to JSON files"""
+        """Save a full snapshot of books and members"""
         try:
-            # Save books
-            books_data = {str(book_id): book.to_dict() for book_id, book in self.books.items()}
-            with open(self.BOOKS_FILE, 'w') as f:
-                json.dump(books_data, f, indent=2)
-            
-            # Save members
-            members_data = {str(user_id): member.to_dict() for user_id, member in self.members.items()}
-            with open(self.MEMBERS_FILE, 'w') as f:
-                json.dump(members_data, f, indent=2)
+            with self._process_lock(), self._snapshot_lock.exclusive(), self._write_lock:
+                # The snapshot already contains queued mutations
+                records = self._drain_queue()
+                self.storage.track(records, self.books, self.members)
+                self.storage.save(self.books, self.members)
+                self._count_borrows(records)
+                self._save_circulation()
         except Exception as e:
             print(f"Error saving data: {e}")
     
+    def compact(self):
+        """Fold journaled records back into the snapshot"""
+        try:
+            with self._process_lock(), self._snapshot_lock.exclusive(), self._write_lock:
+                records = self._drain_queue()
+                if records:
+                    self.storage.write(records, self.books, self.members)
+                    self._count_borrows(records)
+                self.storage.compact(self.books, self.members)
+                self._save_circulation()
+        except Exception as e:
+            print(f"Error compacting data: {e}")
+    
+    def _apply_record(self, record):
+        """
+        Apply one journal record to the in-memory state
+        
+        Records are idempotent, so replaying a journal over a snapshot that
+        already contains some of its records is safe. Undo records built by
+        batch() may carry the Book or Member object itself instead of its dict.
+        
+        Args:
+            record (dict): Journal record
+        """
+        with self._index_lock:
+            self._apply_record_locked(record)
+    
+    def _apply_record_locked(self, record):
+        """Apply one journal record; the caller holds the index lock"""
+        op = record["op"]
+        if op == "add_book":
+            book = record["book"]
+            if not isinstance(book, Book):
+                book = Book.from_dict(book)
+            old = self.books.get(book.book_id)
+            if old is not None:
+                self._unindex_book(old)
+            self.books[book.book_id] = book
+            book = self.books[book.book_id]
+            self._index_book(book)
+        elif op == "remove_book":
+            book = self.books.pop(record["book_id"], None)
+            if book is not None:
+                self._unindex_book(book)
+        elif op == "add_member":
+            member = record["member"]
+            if not isinstance(member, Member):
+                member = member_from_dict(member)
+            old = self.members.get(member.user_id)
+            if old is not None:
+                self._unindex_member(old)
+            self.members[member.user_id] = member
+            self._index_member(member)
+        elif op == "remove_member":
+            member = self.members.pop(record["user_id"], None)
+            if member is not None:
+                self._unindex_member(member)
+        elif op in ("borrow", "return"):
+            book = self.books.get(record["book_id"])
+            member = self.members.get(record["member_id"])
+            if book is None or member is None:
+                return
+            if op == "borrow":
+                book.is_available = False
+                book.borrowed_by = member.user_id
+                book.borrowed_at = record.get("borrowed_at")
+                book.due_at = record.get("due_at")
+                member.borrow_book(book.book_id)
+            else:
+                book.is_available = True
+                book.borrowed_by = None
+                book.borrowed_at = None
+                book.due_at = None
+                member.return_book(book.book_id)
+            self._loan_changed(book)
+        elif op in ("hold", "cancel_hold"):
+            member = self.members.get(record["member_id"])
+            if member is None:
+                return
+            if op == "hold":
+                self._add_hold(member, record["book_id"], record["ticket"])
+            else:
+                self._remove_hold(member, record["book_id"])
+        else:
+            print(f"Unknown journal operation: {op}")
+    
     def load_data(self):
-        """Load books and members from JSON files"""
+        """Load books and members from storage, then replay pending records"""
         try:
-            # Load books
-            if os.path.exists(self.BOOKS_FILE):
-                with open(self.BOOKS_FILE, 'r') as f:
-                    books_data = json.load(f)
-                    for book_id, book_dict in books_data.items():
-                        book = Book.from_dict(book_dict)
+            with self.storage.lock(exclusive=False):
+                if self.lazy:
+                    self.books, self.members = self.storage.load_lazy()
+                    if self.columnar:
+                        self.books = BookStore(self.books.values())
+                else:
+                    books, members = self.storage.load()
+                    for book in books:
                         self.books[book.book_id] = book
-            
-            # Load members
-            if os.path.exists(self.MEMBERS_FILE):
-                with open(self.MEMBERS_FILE, 'r') as f:
-                    members_data = json.load(f)
-                    for user_id, member_dict in members_data.items():
-                        if member_dict.get("role") == "Admin":
-                            member = Admin.from_dict(member_dict)
-                        else:
-                            member = Member.from_dict(member_dict)
+                    for member in members:
                         self.members[member.user_id] = member
+                self._indexes_ready = self._directory_ready = False
+                if not self.lazy:
+                    self._rebuild_indexes()
+                    self._rebuild_directory()
+                
+                # Replay mutations journaled since the last snapshot
+                for record in self.storage.replay():
+                    self._apply_record(record)
+                if self.ids.fresh:
+                    self._seed_ids()
         except Exception as e:
             print(f"Error loading data: {e}")
     
+    def _seed_ids(self):
+        """Start a new IDS_FILE above the IDs of records stored before it existed"""
+        if self.books:
+            self.ids.ensure_above("book", max(self.books.keys()))
+        if self.members:
+            self.ids.ensure_above("user", max(self.members.keys()))
+    
+    # ==================== INDEX MAINTENANCE ====================
+    
+    def _rebuild_indexes(self):
+        """Rebuild the in-memory indexes from the loaded books and members"""
+        self.catalog_generation += 1
+        self.book_ids.rebuild_ids(self.books.keys())
+        self.search_index.rebuild(self.books.values())
+        self.availability.rebuild(self.books.values())
+        self.isbn_index.rebuild(self.books.values())
+        self.loans.rebuild(self.books.values())
+        self.circulation.rebuild(self.books.values())
+        self._indexes_ready = True
+    
+    def _ensure_indexes(self):
+        """Build the indexes if lazy loading has deferred them"""
+        if not self._indexes_ready:
+            with self._index_lock:
+                if not self._indexes_ready:
+                    self._rebuild_indexes()
+    
+    def _rebuild_directory(self):
+        """Rebuild the member directory and the hold queues from the loaded members"""
+        self.directory.rebuild(self.members.values())
+        self.holds.rebuild(self.members.values())
+        self._directory_ready = True
+    
+    def _ensure_directory(self):
+        """Build the member directory if lazy loading has deferred it"""
+        if not self._directory_ready:
+            with self._index_lock:
+                if not self._directory_ready:
+                    self._rebuild_directory()
+    
+    def _index_member(self, member):
+        """Add a member to the member directory and its holds to the queues"""
+        if self._directory_ready:
+            self.directory.add(member)
+            self.holds.add(member)
+    
+    def _unindex_member(self, member):
+        """Remove a member from the member directory and its holds from the queues"""
+        if self._directory_ready:
+            self.directory.remove(member)
+            self.holds.remove(member)
+    
+    def _index_book(self, book):
+        """Add a book to the indexes"""
+        self.catalog_generation += 1
+        if self._indexes_ready:
+            self.book_ids.add(book.book_id)
+            self.search_index.add(book)
+            self.availability.update(book)
+            self.isbn_index.add(book)
+            self.loans.update(book)
+            self.circulation.add(book)
+    
+    def _unindex_book(self, book):
+        """Remove a book from the indexes"""
+        self.catalog_generation += 1
+        if self._indexes_ready:
+            self.book_ids.discard(book.book_id)
+            self.search_index.remove(book)
+            self.availability.discard(book.book_id)
+            self.isbn_index.remove(book)
+            self.loans.close(book.book_id)
+            self.circulation.remove(book)
+    
+    def _loan_changed(self, book):
+        """Update the indexes after a book was borrowed or returned"""
+        if self._indexes_ready:
+            self.availability.update(book)
+            self.loans.update(book)
+            self.circulation.update(book)
+    
+    def close(self):
+        """Write anything still queued and release the storage backend"""
+        if self.writer is not None:
+            atexit.unregister(self.writer.close)
+            self.writer.close()
+            self.writer = None
+        try:
+            with self._process_lock():
+                self._save_circulation()
+        except Exception as e:
+            print(f"Error saving circulation counts: {e}")
+        self.storage.close()
+    
     def clear_all_data(self):
         """Clear all data and reset files"""
-        self.books.clear()
-        self.members.clear()
-        # Reset counters
-        Book.book_counter = 1000
-        from library_system.models.user import User
-        User.user_counter = 1000
-        self.save_data()
+        with self._snapshot_lock.exclusive():
+            with self._index_lock:
+                self.books.clear()
+                self.members.clear()
+                self._rebuild_indexes()
+                self._rebuild_directory()
+            self.ids.reset()
+            self.circulation.reset()
+            self.save_data()
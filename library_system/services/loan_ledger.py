@@ -0,0 +1,107 @@
+"""Loan ledger for Library Management System"""
+
+import heapq
+from itertools import count
+from library_system.models.loan import Loan
+
+class LoanLedger:
+    """
+    Active loans by book, plus a min-heap ordered by due date
+    
+    The heap uses lazy deletion: a returned or replaced loan leaves its
+    entry behind, and entries are checked against the active loans when
+    they reach the top. The heap is rebuilt once stale entries outnumber
+    live ones.
+    """
+    
+    def __init__(self):
+        """Initialize an empty ledger"""
+        self.active = {}  # Dictionary: book_id -> Loan
+        self.heap = []  # Entries: (due_at, sequence, Loan)
+        self._sequence = count()
+    
+    def update(self, book):
+        """Open, replace or close the loan of a book from its current state"""
+        if book.is_available or book.borrowed_by is None:
+            self.close(book.book_id)
+            return
+        loan = self.active.get(book.book_id)
+        if (loan is not None and loan.member_id == book.borrowed_by
+                and loan.borrowed_at == book.borrowed_at and loan.due_at == book.due_at):
+            return
+        self.open(Loan(book.book_id, book.borrowed_by, book.borrowed_at, book.due_at))
+    
+    def open(self, loan):
+        """Record an active loan"""
+        self.active[loan.book_id] = loan
+        if loan.due_at is not None:
+            heapq.heappush(self.heap, (loan.due_at, next(self._sequence), loan))
+            self._compact_if_stale()
+    
+    def close(self, book_id):
+        """
+        Close the active loan of a book
+        
+        Returns:
+            The closed Loan, or None if the book was not on loan
+        """
+        return self.active.pop(book_id, None)
+    
+    def rebuild(self, books):
+        """Rebuild the ledger from an iterable of books"""
+        self.active = {}
+        for book in books:
+            if not book.is_available and book.borrowed_by is not None:
+                self.active[book.book_id] = Loan(book.book_id, book.borrowed_by,
+                                                 book.borrowed_at, book.due_at)
+        self._rebuild_heap()
+    
+    def _rebuild_heap(self):
+        """Rebuild the heap from the active loans only"""
+        self.heap = [(loan.due_at, next(self._sequence), loan)
+                     for loan in self.active.values() if loan.due_at is not None]
+        heapq.heapify(self.heap)
+    
+    def _compact_if_stale(self):
+        """Drop stale entries once they outnumber the live ones"""
+        if len(self.heap) > 2 * len(self.active) + 64:
+            self._rebuild_heap()
+    
+    def _is_live(self, loan):
+        """Check whether a heap entry still describes an active loan"""
+        return self.active.get(loan.book_id) is loan
+    
+    def get(self, book_id):
+        """Return the active loan of a book, or None"""
+        return self.active.get(book_id)
+    
+    def due_before(self, timestamp, limit=None):
+        """
+        Return active loans due before a timestamp, earliest first
+        
+        Costs O((k + s) log n) for k results and s stale entries met on the
+        way, independent of the number of books.
+        
+        Args:
+            timestamp (float): Upper bound (exclusive) for the due date
+            limit (int): Maximum number of loans to return
+        
+        Returns:
+            List of Loan objects
+        """
+        results = []
+        popped = []
+        while self.heap and self.heap[0][0] < timestamp:
+            if limit is not None and len(results) >= limit:
+                break
+            entry = heapq.heappop(self.heap)
+            if self._is_live(entry[2]):
+                results.append(entry[2])
+                popped.append(entry)
+        for entry in popped:
+            heapq.heappush(self.heap, entry)
+        return results
+    
+    def __len__(self):
+        """Return the number of active loans"""
+        return len(self.active)
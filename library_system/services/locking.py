@@ -0,0 +1,116 @@
+"""Lock helpers for running a Library from several threads"""
+
+import threading
+from contextlib import contextmanager
+
+class StripedLock:
+    """
+    Fixed pool of locks shared out by key hash
+    
+    Each key (a book ID, a member ID, an email) maps onto one of a fixed
+    number of stripes, so unrelated keys rarely contend and memory does not
+    grow with the catalog. Several keys are always locked in stripe order,
+    which rules out deadlocks between threads locking overlapping keys.
+    """
+    
+    def __init__(self, stripes=64):
+        """
+        Initialize a StripedLock
+        
+        Args:
+            stripes (int): Number of underlying locks
+        """
+        self.stripes = [threading.Lock() for _ in range(stripes)]
+    
+    def _stripe(self, key):
+        """Return the stripe index of a key"""
+        return hash(key) % len(self.stripes)
+    
+    @contextmanager
+    def holding(self, *keys):
+        """
+        Lock the stripes of every key for the duration of the block
+        
+        Args:
+            *keys: Hashable keys; None entries are ignored
+        """
+        indexes = sorted({self._stripe(key) for key in keys if key is not None})
+        acquired = []
+        try:
+            for i in indexes:
+                self.stripes[i].acquire()
+                acquired.append(i)
+            yield
+        finally:
+            for i in reversed(acquired):
+                self.stripes[i].release()
+
+class SnapshotLock:
+    """
+    Readers-writer lock separating mutations from snapshots
+    
+    Any number of threads may hold the shared side while they apply
+    mutations; taking the exclusive side waits until they are done and
+    keeps new ones out, so a snapshot never sees half a mutation. Waiting
+    writers block new readers so snapshots are not starved. Both sides
+    are reentrant, and the exclusive holder may also take the shared side.
+    """
+    
+    def __init__(self):
+        """Initialize an unlocked SnapshotLock"""
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None  # Thread holding the exclusive side
+        self._writer_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()  # Per-thread shared depth
+    
+    @contextmanager
+    def shared(self):
+        """Hold the shared side for the duration of the block"""
+        me = threading.get_ident()
+        depth = getattr(self._local, "depth", 0)
+        if depth or self._writer == me:
+            # Reentrant: this thread already keeps writers out
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+            return
+        with self._cond:
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+    
+    @contextmanager
+    def exclusive(self):
+        """Hold the exclusive side for the duration of the block"""
+        me = threading.get_ident()
+        if getattr(self._local, "depth", 0):
+            raise RuntimeError("cannot take the exclusive side while holding the shared side")
+        with self._cond:
+            if self._writer != me:
+                self._writers_waiting += 1
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+                self._writers_waiting -= 1
+                self._writer = me
+            self._writer_depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer_depth -= 1
+                if not self._writer_depth:
+                    self._writer = None
+                    self._cond.notify_all()
@@ -0,0 +1,105 @@
+"""Member directory index for Library Management System"""
+
+from bisect import bisect_left, insort
+
+class MemberDirectory:
+    """
+    Indexes members by email and by name
+    
+    Emails are matched case-insensitively through a dictionary. Names are
+    kept in sorted lists of (key, user_id) entries - one list for full
+    names and one for the name starting at each later word - so a prefix
+    such as "jo" or "doe" finds "John Doe" with a binary search.
+    """
+    
+    def __init__(self):
+        """Initialize an empty directory"""
+        self.emails = {}  # Dictionary: normalized email -> user_id
+        self.full_names = []  # Sorted list of (full name key, user_id)
+        self.later_words = []  # Sorted list of (name key from the 2nd word on, user_id)
+    
+    @staticmethod
+    def email_key(email):
+        """Normalize an email for lookups"""
+        return email.strip().casefold()
+    
+    @staticmethod
+    def name_key(name):
+        """Normalize a name for sorting and prefix matching"""
+        return " ".join(name.casefold().split())
+    
+    @staticmethod
+    def _name_keys(name):
+        """Return the full-name key and the keys starting at each later word"""
+        words = name.casefold().split()
+        return " ".join(words), [" ".join(words[i:]) for i in range(1, len(words))]
+    
+    def add(self, member):
+        """Index a member; the first member registered with an email keeps it"""
+        self.emails.setdefault(self.email_key(member.email), member.user_id)
+        full_name, later_words = self._name_keys(member.name)
+        insort(self.full_names, (full_name, member.user_id))
+        for key in later_words:
+            insort(self.later_words, (key, member.user_id))
+    
+    def remove(self, member):
+        """Remove a member from the directory"""
+        key = self.email_key(member.email)
+        if self.emails.get(key) == member.user_id:
+            del self.emails[key]
+        full_name, later_words = self._name_keys(member.name)
+        self._remove_entry(self.full_names, (full_name, member.user_id))
+        for key in later_words:
+            self._remove_entry(self.later_words, (key, member.user_id))
+    
+    @staticmethod
+    def _remove_entry(entries, entry):
+        """Remove an entry from a sorted list"""
+        i = bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+    
+    def rebuild(self, members):
+        """Rebuild the directory from an iterable of members"""
+        self.emails = {}
+        self.full_names = []
+        self.later_words = []
+        for member in sorted(members, key=lambda m: m.user_id):
+            self.emails.setdefault(self.email_key(member.email), member.user_id)
+            full_name, later_words = self._name_keys(member.name)
+            self.full_names.append((full_name, member.user_id))
+            self.later_words.extend((key, member.user_id) for key in later_words)
+        self.full_names.sort()
+        self.later_words.sort()
+    
+    def get_by_email(self, email):
+        """Return the user_id registered with an email, or None"""
+        return self.emails.get(self.email_key(email))
+    
+    def find_by_name(self, prefix, limit=None):
+        """
+        Find members whose name, or a word of it, starts with prefix
+        
+        Args:
+            prefix (str): Case-insensitive name prefix ("" matches everyone)
+            limit (int): Maximum number of user IDs to return
+        
+        Returns:
+            List of user IDs: full-name matches in name order, then members
+            matched by a later word (e.g. the surname)
+        """
+        prefix = " ".join(prefix.casefold().split())
+        results = []
+        seen = set()
+        for entries in (self.full_names, self.later_words):
+            for i in range(bisect_left(entries, (prefix,)), len(entries)):
+                key, user_id = entries[i]
+                if not key.startswith(prefix):
+                    break
+                if user_id in seen:
+                    continue
+                if limit is not None and len(results) >= limit:
+                    return results
+                seen.add(user_id)
+                results.append(user_id)
+        return results
@@ -0,0 +1,281 @@
+"""Per-operation metrics for Library Management System"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from functools import wraps
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+class _CallDepth(threading.local):
+    """Per-thread count of instrumented Library calls in progress"""
+    
+    depth = 0
+
+class OperationStats:
+    """Call count, error count and latency histogram of one operation"""
+    
+    __slots__ = ("calls", "errors", "total", "max", "buckets")
+    
+    def __init__(self):
+        """Initialize empty OperationStats"""
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0  # Seconds spent in all calls
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # Last bucket is +Inf
+    
+    def observe(self, seconds, failed):
+        """Record one call"""
+        self.calls += 1
+        self.errors += failed
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    
+    def quantile(self, fraction):
+        """Estimate a latency quantile as the upper bound of its bucket"""
+        rank = fraction * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+    
+    def to_dict(self):
+        """Convert to a JSON-serializable dictionary"""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_seconds": self.total,
+            "mean_seconds": self.total / self.calls if self.calls else 0.0,
+            "max_seconds": self.max,
+            "p50_seconds": self.quantile(0.5),
+            "p99_seconds": self.quantile(0.99),
+            "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], self.buckets)),
+        }
+
+class Metrics:
+    """
+    Counts calls, errors and latency of Library and storage operations
+    
+    instrument(library) shadows the public Library methods listed in
+    OPERATIONS, and the storage calls in STORAGE_OPERATIONS, with timing
+    wrappers set on those instances. A Library opened without metrics is
+    never wrapped, so disabled instrumentation costs nothing. Calls a
+    Library method makes to other public methods (borrow_book looking up
+    the member, for instance) are not counted separately.
+    
+    Library methods report failure by returning False or None instead of
+    raising, so a call counts as an error if it raises or if it is one of
+    FAILS_ON_FALSY and returns a falsy value.
+    
+    Calls slower than slow_threshold seconds are kept in slow_ops and,
+    with slow_log set, appended to that file as JSON lines.
+    """
+    
+    OPERATIONS = (
+        "add_book", "add_books", "remove_book", "get_book", "get_books_by_isbn", "search_books",
+        "fuzzy_search_books", "list_all_books", "get_available_books", "count_available_books",
+        "page_books", "page_available_books", "page_search_books",
+        "add_member", "add_members", "remove_member", "get_member", "get_member_by_email",
+        "find_members", "list_all_members", "page_members", "authenticate_member",
+        "borrow_book", "return_book", "get_loan", "get_loans_due_before", "get_overdue_loans",
+        "place_hold", "cancel_hold", "get_holds", "get_hold_queue",
+        "circulation_report", "adhoc_report",
+        "save_data", "load_data", "compact", "flush", "refresh",
+    )
+    STORAGE_OPERATIONS = ("load", "load_lazy", "save", "write", "compact")
+    FAILS_ON_FALSY = frozenset({
+        "add_book", "add_books", "remove_book", "add_member", "add_members", "remove_member",
+        "borrow_book", "return_book", "place_hold", "cancel_hold",
+    })
+    SLOW_OPS_KEPT = 100  # Most recent slow calls kept in memory
+    
+    def __init__(self, slow_threshold=None, slow_log=None):
+        """
+        Initialize Metrics
+        
+        Args:
+            slow_threshold (float): Calls taking longer than this many seconds
+                are logged as slow (None disables the slow-operation log)
+            slow_log (str): File to append slow calls to as JSON lines
+        """
+        self.slow_threshold = slow_threshold
+        self.slow_log = slow_log
+        self.slow_ops = deque(maxlen=self.SLOW_OPS_KEPT)
+        self.slow_count = 0  # Slow calls ever seen, including ones no longer in slow_ops
+        self.operations = {}  # Operation name -> OperationStats
+        self.storage = None  # Storage backend whose bytes_written is exported
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._active = _CallDepth()
+    
+    # ==================== INSTRUMENTATION ====================
+    
+    def instrument(self, library):
+        """
+        Wrap the public operations of a Library and of its storage backend
+        
+        Args:
+            library (Library): Library to instrument
+        """
+        for name in self.OPERATIONS:
+            setattr(library, name, self._wrap(getattr(library, name), name, nested=False))
+        self.instrument_storage(library.storage)
+    
+    def instrument_storage(self, storage):
+        """Wrap the calls a Library makes into its storage backend"""
+        self.storage = storage
+        for name in self.STORAGE_OPERATIONS:
+            setattr(storage, name, self._wrap(getattr(storage, name), f"storage.{name}", nested=True))
+    
+    def _wrap(self, method, name, nested):
+        """
+        Return method wrapped to record its calls under name
+        
+        Args:
+            method (callable): Bound method to wrap
+            name (str): Operation name
+            nested (bool): Also record calls made while another operation runs
+        """
+        fails_on_falsy = name in self.FAILS_ON_FALSY
+        active = self._active
+        
+        @wraps(method)
+        def timed(*args, **kwargs):
+            if active.depth and not nested:
+                return method(*args, **kwargs)
+            active.depth += 1
+            failed = True
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+                failed = fails_on_falsy and not result
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                active.depth -= 1
+                self.observe(name, elapsed, failed, args)
+        
+        return timed
+    
+    def observe(self, name, seconds, failed=False, args=()):
+        """
+        Record one call of an operation
+        
+        Args:
+            name (str): Operation name
+            seconds (float): Duration of the call
+            failed (bool): Whether the call failed
+            args (tuple): Call arguments, shown in the slow-operation log
+        """
+        with self._lock:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = OperationStats()
+            stats.observe(seconds, failed)
+        if self.slow_threshold is not None and seconds > self.slow_threshold:
+            self._log_slow(name, seconds, args)
+    
+    def _log_slow(self, name, seconds, args):
+        """Remember a slow call and append it to the slow log"""
+        entry = {
+            "at": time.time(),
+            "op": name,
+            "seconds": round(seconds, 6),
+            "args": [repr(arg)[:80] for arg in args],
+        }
+        with self._lock:
+            self.slow_count += 1
+            self.slow_ops.append(entry)
+        if self.slow_log is not None:
+            try:
+                with open(self.slow_log, "a") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except OSError as e:
+                print(f"Error writing slow operation log: {e}")
+    
+    # ==================== EXPORT ====================
+    
+    def bytes_written(self):
+        """Return the bytes the instrumented storage backend has written"""
+        return getattr(self.storage, "bytes_written", 0)
+    
+    def snapshot(self):
+        """
+        Summarize everything recorded so far
+        
+        Returns:
+            dict with uptime, storage bytes written, per-operation stats and
+            the most recent slow calls
+        """
+        with self._lock:
+            operations = {name: stats.to_dict() for name, stats in sorted(self.operations.items())}
+            slow_ops = list(self.slow_ops)
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "storage_bytes_written": self.bytes_written(),
+            "operations": operations,
+            "slow_threshold_seconds": self.slow_threshold,
+            "slow_count": self.slow_count,
+            "slow_ops": slow_ops,
+        }
+    
+    def to_prometheus(self):
+        """
+        Render the metrics in the Prometheus text exposition format
+        
+        Returns:
+            str
+        """
+        with self._lock:
+            operations = sorted(self.operations.items())
+            lines = [
+                "# HELP library_operation_seconds Latency of Library operations",
+                "# TYPE library_operation_seconds histogram",
+            ]
+            for name, stats in operations:
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                    cumulative += count
+                    lines.append(f'library_operation_seconds_bucket{{op="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'library_operation_seconds_bucket{{op="{name}",le="+Inf"}} {stats.calls}')
+                lines.append(f'library_operation_seconds_sum{{op="{name}"}} {stats.total}')
+                lines.append(f'library_operation_seconds_count{{op="{name}"}} {stats.calls}')
+            lines.append("# HELP library_operation_errors_total Library operations that failed")
+            lines.append("# TYPE library_operation_errors_total counter")
+            for name, stats in operations:
+                lines.append(f'library_operation_errors_total{{op="{name}"}} {stats.errors}')
+        lines.append("# HELP library_storage_bytes_written_total Bytes written by the storage backend")
+        lines.append("# TYPE library_storage_bytes_written_total counter")
+        lines.append(f"library_storage_bytes_written_total {self.bytes_written()}")
+        lines.append("# HELP library_slow_operations_total Operations slower than the slow threshold")
+        lines.append("# TYPE library_slow_operations_total counter")
+        lines.append(f"library_slow_operations_total {self.slow_count}")
+        return "\n".join(lines) + "\n"
+    
+    def write(self, path):
+        """
+        Write the metrics to a file
+        
+        Files ending in .prom or .txt get the Prometheus text format (for
+        the node_exporter textfile collector); anything else gets JSON.
+        
+        Args:
+            path (str): File to write
+        """
+        if path.endswith((".prom", ".txt")):
+            data = self.to_prometheus()
+        else:
+            data = json.dumps(self.snapshot(), indent=2)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
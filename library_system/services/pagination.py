@@ -0,0 +1,137 @@
+"""Cursor pagination for Library Management System"""
+
+import base64
+import json
+from bisect import bisect_left, bisect_right
+
+class Page:
+    """
+    One page of a listing
+    
+    next_cursor and prev_cursor are opaque strings to pass back to the
+    same listing for the following or preceding page; they are None at
+    either end. Cursors point at the boundary key rather than at a
+    position, so records added or removed elsewhere do not shift or
+    repeat the rows of later pages.
+    """
+    
+    __slots__ = ("items", "next_cursor", "prev_cursor", "total")
+    
+    def __init__(self, items, next_cursor=None, prev_cursor=None, total=None):
+        """
+        Initialize a Page
+        
+        Args:
+            items (list): Records on this page
+            next_cursor (str): Cursor of the following page, or None
+            prev_cursor (str): Cursor of the preceding page, or None
+            total (int): Number of records in the whole listing
+        """
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+    
+    def __iter__(self):
+        """Iterate over the records on this page"""
+        return iter(self.items)
+    
+    def __len__(self):
+        """Return the number of records on this page"""
+        return len(self.items)
+    
+    def __repr__(self):
+        """String representation of Page"""
+        return (f"Page({len(self.items)} of {self.total}, next={self.next_cursor is not None}, "
+                f"prev={self.prev_cursor is not None})")
+
+def encode_cursor(listing, direction, key):
+    """
+    Build an opaque cursor
+    
+    Args:
+        listing (str): Name of the listing the cursor belongs to
+        direction (str): "next" (rows after key) or "prev" (rows before key)
+        key: Boundary sort key (an ID, or a tuple of JSON values)
+    """
+    data = json.dumps([listing, direction, key], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor, listing, sample=None):
+    """
+    Decode a cursor built by encode_cursor for the same listing
+    
+    Args:
+        cursor (str): The cursor
+        listing (str): Name of the listing the cursor must belong to
+        sample: A key of the listing; the decoded key must have the same
+            types, so it can be compared with the listing's keys (None
+            skips the check)
+    
+    Returns:
+        (direction, key)
+    
+    Raises:
+        ValueError: If the cursor is malformed or from another listing
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_listing, direction, key = json.loads(data)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if cursor_listing != listing or direction not in ("next", "prev"):
+        raise ValueError(f"Cursor does not belong to the {listing} listing")
+    key = _to_key(key)
+    if sample is not None and not _same_types(key, sample):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return direction, key
+
+def _to_key(value):
+    """Turn the JSON lists of a decoded key back into tuples"""
+    return tuple(map(_to_key, value)) if isinstance(value, list) else value
+
+def _same_types(key, sample):
+    """Check that a key has the types of sample, element by element for tuples"""
+    if isinstance(sample, tuple):
+        return (isinstance(key, tuple) and len(key) == len(sample)
+                and all(map(_same_types, key, sample)))
+    return type(key) is type(sample)
+
+def paginate(keys, page_size, cursor=None, listing=""):
+    """
+    Cut one page out of a sorted list of keys
+    
+    A "prev" page that would run past the start is filled up from the
+    first key instead, so every page but the last holds page_size keys.
+    Costs O(log n + page_size).
+    
+    Args:
+        keys (list): Sorted list of unique keys, or a sequence such as a
+            SortedIdSet that can be bisected and sliced like one
+        page_size (int): Keys per page
+        cursor (str): Cursor from a previous page, or None for the first page
+        listing (str): Name of the listing, checked against the cursor
+    
+    Returns:
+        (keys on the page, next cursor or None, previous cursor or None)
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    if cursor is None:
+        start = 0
+        end = page_size
+    else:
+        direction, key = decode_cursor(cursor, listing, keys[0] if len(keys) else None)
+        if direction == "next":
+            start = bisect_right(keys, key)
+            end = start + page_size
+        else:
+            end = bisect_left(keys, key)
+            start = max(0, end - page_size)
+            if start == 0:
+                end = page_size
+    page = keys[start:end]
+    end = start + len(page)
+    next_cursor = encode_cursor(listing, "next", page[-1]) if page and end < len(keys) else None
+    prev_cursor = encode_cursor(listing, "prev", page[0]) if page and start > 0 else None
+    return page, next_cursor, prev_cursor
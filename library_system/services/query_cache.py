@@ -0,0 +1,95 @@
+"""LRU cache of search results for Library Management System"""
+
+import threading
+import time
+from collections import OrderedDict
+
+class QueryCache:
+    """
+    Bounded LRU cache of query results tagged with a catalog generation
+    
+    Each entry remembers the catalog generation it was computed at. A
+    lookup made at any other generation is a miss, so a mutation that
+    bumps the generation invalidates every cached result at once without
+    walking the cache. Entries older than ttl seconds are misses too.
+    """
+    
+    def __init__(self, max_size=256, ttl=None):
+        """
+        Initialize a QueryCache
+        
+        Args:
+            max_size (int): Most entries kept; the least recently used goes first
+            ttl (float): Seconds an entry stays valid (None for no limit)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (generation, stored at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0  # Misses on an entry from an older generation or past its TTL
+    
+    def get(self, key, generation):
+        """
+        Look up a cached result
+        
+        Args:
+            key: Hashable query key
+            generation (int): Current catalog generation
+        
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_generation, stored_at, value = entry
+                if entry_generation == generation and (
+                        self.ttl is None or time.monotonic() - stored_at < self.ttl):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.stale += 1
+            self.misses += 1
+            return None
+    
+    def put(self, key, generation, value):
+        """Cache a result computed at generation"""
+        with self._lock:
+            self._entries[key] = (generation, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop every entry (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """
+        Report cache effectiveness
+        
+        Returns:
+            dict with hits, misses, hit_rate, evictions, stale, size and max_size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "stale": self.stale,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+            }
+    
+    def __len__(self):
+        """Return the number of cached entries"""
+        return len(self._entries)
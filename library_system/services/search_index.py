@@ -0,0 +1,215 @@
+"""Inverted token index for book search"""
+
+import bisect
+import re
+from library_system.services.trigram_index import TrigramIndex
+
+TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return TOKEN_RE.findall(text.lower())
+
+class _FieldIndex:
+    """Token -> book ID postings for one book field (title or author)"""
+    
+    def __init__(self):
+        """Initialize an empty field index"""
+        self.postings = {}  # Dictionary: token -> set of book IDs
+        self.sorted_tokens = []  # Vocabulary in sorted order, for prefix lookups
+        self.sorted_reversed = []  # Reversed tokens in sorted order, for suffix lookups
+    
+    def add(self, book_id, text):
+        """Index the tokens of text under book_id"""
+        for token in set(tokenize(text)):
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                bisect.insort(self.sorted_tokens, token)
+                bisect.insort(self.sorted_reversed, token[::-1])
+            ids.add(book_id)
+    
+    def remove(self, book_id, text):
+        """Drop book_id from the postings of every token in text"""
+        for token in set(tokenize(text)):
+            ids = self.postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(book_id)
+            if not ids:
+                del self.postings[token]
+                self._remove_sorted(self.sorted_tokens, token)
+                self._remove_sorted(self.sorted_reversed, token[::-1])
+    
+    def rebuild(self, pairs):
+        """Rebuild the index from (book_id, text) pairs"""
+        self.postings = {}
+        for book_id, text in pairs:
+            for token in set(tokenize(text)):
+                self.postings.setdefault(token, set()).add(book_id)
+        self.sorted_tokens = sorted(self.postings)
+        self.sorted_reversed = sorted(token[::-1] for token in self.postings)
+    
+    @staticmethod
+    def _remove_sorted(items, value):
+        """Remove value from a sorted list"""
+        i = bisect.bisect_left(items, value)
+        if i < len(items) and items[i] == value:
+            del items[i]
+    
+    @staticmethod
+    def _with_prefix(items, prefix):
+        """Return the entries of a sorted list that start with prefix"""
+        start = bisect.bisect_left(items, prefix)
+        end = bisect.bisect_left(items, prefix + "\U0010ffff")
+        return items[start:end]
+    
+    def _matching_tokens(self, token, starts_open, ends_open):
+        """
+        Find indexed tokens that a query token can match
+        
+        Args:
+            token (str): Query token
+            starts_open (bool): Query token is at the start of the query, so it
+                may match the tail of a longer token
+            ends_open (bool): Query token is at the end of the query, so it may
+                match the head of a longer token
+        
+        Returns:
+            List of matching vocabulary tokens
+        """
+        if starts_open and ends_open:
+            return [t for t in self.sorted_tokens if token in t]
+        if ends_open:
+            return self._with_prefix(self.sorted_tokens, token)
+        if starts_open:
+            return [t[::-1] for t in self._with_prefix(self.sorted_reversed, token[::-1])]
+        return [token] if token in self.postings else []
+    
+    def candidates(self, query, prefix_mode):
+        """
+        Return the IDs of books that may match query
+        
+        Args:
+            query (str): Lowercased query
+            prefix_mode (bool): Every query token must be a word prefix
+        
+        Returns:
+            Set of candidate book IDs, or None if the query has no tokens
+        """
+        matches = list(TOKEN_RE.finditer(query))
+        if not matches:
+            return None
+        
+        result = None
+        for match in matches:
+            if prefix_mode:
+                tokens = self._with_prefix(self.sorted_tokens, match.group())
+            else:
+                tokens = self._matching_tokens(
+                    match.group(), match.start() == 0, match.end() == len(query)
+                )
+            ids = set()
+            for token in tokens:
+                ids |= self.postings[token]
+            result = ids if result is None else result & ids
+            if not result:
+                break
+        return result
+
+class SearchIndex:
+    """
+    In-memory inverted index over book titles and authors
+    
+    Two query modes are supported:
+    
+    - "substring" (default): same results as a case-insensitive substring
+      test against the field. Query tokens are matched against the token
+      vocabulary to collect candidates, which are then verified.
+    - "prefix": every word of the query must be the prefix of some word in
+      the field, in any order ("pyth prog" matches "Python Programming").
+    
+    fuzzy_search() ranks books by trigram similarity instead, so typos and
+    reordered words still match. Its trigram indexes are built on the
+    first fuzzy query and kept up to date from then on.
+    """
+    
+    FIELDS = ("title", "author")
+    
+    def __init__(self):
+        """Initialize an empty search index"""
+        self.fields = {field: _FieldIndex() for field in self.FIELDS}
+        self.trigrams = None  # Field -> TrigramIndex, once a fuzzy query needed them
+    
+    def add(self, book):
+        """Index a book"""
+        for field, index in self.fields.items():
+            index.add(book.book_id, getattr(book, field))
+        if self.trigrams is not None:
+            for field, index in self.trigrams.items():
+                index.add(book.book_id, getattr(book, field))
+    
+    def remove(self, book):
+        """Remove a book from the index"""
+        for field, index in self.fields.items():
+            index.remove(book.book_id, getattr(book, field))
+        if self.trigrams is not None:
+            for field, index in self.trigrams.items():
+                index.remove(book.book_id, getattr(book, field))
+    
+    def rebuild(self, books):
+        """Rebuild the index from an iterable of books"""
+        books = list(books)
+        for field, index in self.fields.items():
+            index.rebuild((book.book_id, getattr(book, field)) for book in books)
+        self.trigrams = None  # Rebuilt by the next fuzzy query
+    
+    def search(self, keyword, field, books, mode="substring"):
+        """
+        Search the index
+        
+        Args:
+            keyword (str): Search keyword
+            field (str): "title" or "author"
+            books (dict): Mapping of book_id -> Book used to verify candidates
+            mode (str): "substring" or "prefix"
+        
+        Returns:
+            Sorted list of matching book IDs, or None when the keyword has no
+            word characters and the caller must fall back to a scan
+        """
+        index = self.fields.get(field)
+        if index is None:
+            return []
+        keyword_lower = keyword.lower()
+        candidates = index.candidates(keyword_lower, mode == "prefix")
+        if candidates is None:
+            return None
+        if mode == "prefix" or TOKEN_RE.fullmatch(keyword_lower):
+            # A single bare word is contained in every candidate already
+            return sorted(candidates)
+        return sorted(
+            book_id for book_id in candidates
+            if keyword_lower in getattr(books[book_id], field).lower()
+        )
+    
+    def fuzzy_search(self, keyword, field, books, limit):
+        """
+        Rank books by trigram similarity of a field to keyword
+        
+        Args:
+            keyword (str): Search text, possibly misspelled
+            field (str): "title" or "author"
+            books (dict): Mapping of book_id -> Book
+            limit (int): Maximum number of results
+        
+        Returns:
+            List of (book_id, score) pairs, best first
+        """
+        if field not in self.fields:
+            return []
+        if self.trigrams is None:
+            self.trigrams = {name: TrigramIndex() for name in self.FIELDS}
+            for name, index in self.trigrams.items():
+                index.rebuild((book.book_id, getattr(book, name)) for book in books.values())
+        return self.trigrams[field].search(keyword, lambda book_id: getattr(books[book_id], field), limit)
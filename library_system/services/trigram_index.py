@@ -0,0 +1,120 @@
+"""Character-trigram index for typo-tolerant book search"""
+
+import heapq
+import re
+from itertools import islice
+
+WORD_RE = re.compile(r"\w+")
+
+def trigrams(text):
+    """
+    Return the set of character trigrams of text
+    
+    Each word is padded with two spaces in front and one behind, so
+    "Code" gives "  c", " co", "cod", "ode" and "de ". Word order does not
+    matter, which lets "Rossum Guido" match "Guido van Rossum".
+    """
+    grams = set()
+    for word in WORD_RE.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def similarity(query_grams, text_grams):
+    """
+    Score how well a text matches a query, from 0.0 to 1.0
+    
+    The mean of the share of query trigrams found in the text (so a short
+    query is not penalized against a long title) and the Dice coefficient
+    (so closer-sized texts rank first among equal matches).
+    """
+    if not query_grams or not text_grams:
+        return 0.0
+    shared = len(query_grams & text_grams)
+    return (shared / len(query_grams) + 2 * shared / (len(query_grams) + len(text_grams))) / 2
+
+class TrigramIndex:
+    """
+    Trigram -> book ID postings for one book field
+    
+    A query looks at its rarest trigrams first and stops collecting
+    candidates once CANDIDATE_BUDGET postings have been read, keeps the
+    CANDIDATES_PER_RESULT * k candidates sharing the most trigrams, and
+    ranks only those by similarity(). Query cost is therefore bounded by
+    the budget rather than by the size of the catalog.
+    """
+    
+    CANDIDATE_BUDGET = 20000  # Postings read per query
+    CANDIDATES_PER_RESULT = 20  # Candidates scored per result requested
+    MIN_SIMILARITY = 0.3  # Results scoring lower are dropped
+    
+    def __init__(self):
+        """Initialize an empty trigram index"""
+        self.postings = {}  # Dictionary: trigram -> set of book IDs
+    
+    def add(self, book_id, text):
+        """Index the trigrams of text under book_id"""
+        for gram in trigrams(text):
+            self.postings.setdefault(gram, set()).add(book_id)
+    
+    def remove(self, book_id, text):
+        """Drop book_id from the postings of every trigram of text"""
+        for gram in trigrams(text):
+            ids = self.postings.get(gram)
+            if ids is None:
+                continue
+            ids.discard(book_id)
+            if not ids:
+                del self.postings[gram]
+    
+    def rebuild(self, pairs):
+        """Rebuild the index from (book_id, text) pairs"""
+        postings = {}
+        word_grams = {}  # Trigrams of each distinct word, computed once
+        for book_id, text in pairs:
+            grams = set()
+            for word in WORD_RE.findall(text.lower()):
+                cached = word_grams.get(word)
+                if cached is None:
+                    padded = f"  {word} "
+                    cached = word_grams[word] = [padded[i:i + 3] for i in range(len(padded) - 2)]
+                grams.update(cached)
+            for gram in grams:
+                ids = postings.get(gram)
+                if ids is None:
+                    postings[gram] = {book_id}
+                else:
+                    ids.add(book_id)
+        self.postings = postings
+    
+    def search(self, query, text_of, limit):
+        """
+        Find the books whose text is most similar to query
+        
+        Args:
+            query (str): Search text, possibly misspelled
+            text_of (callable): Returns the indexed text of a book ID
+            limit (int): Maximum number of results
+        
+        Returns:
+            List of (book_id, score) pairs, best first
+        """
+        query_grams = trigrams(query)
+        lists = sorted((self.postings[gram] for gram in query_grams if gram in self.postings), key=len)
+        counts = {}
+        budget = self.CANDIDATE_BUDGET
+        for ids in lists:
+            if budget <= 0:
+                break
+            for book_id in islice(ids, budget):
+                counts[book_id] = counts.get(book_id, 0) + 1
+            budget -= len(ids)
+        
+        candidates = heapq.nlargest(limit * self.CANDIDATES_PER_RESULT, counts.items(),
+                                    key=lambda item: item[1])
+        scored = []
+        for book_id, _ in candidates:
+            score = similarity(query_grams, trigrams(text_of(book_id)))
+            if score >= self.MIN_SIMILARITY:
+                scored.append((score, -book_id))
+        return [(-negated_id, score) for score, negated_id in heapq.nlargest(limit, scored)]
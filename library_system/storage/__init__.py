@@ -0,0 +1,11 @@
+"""Storage backends for Library Management System"""
+
+from library_system.storage.base import StorageBackend
+from library_system.storage.json_storage import JsonStorage
+from library_system.storage.sqlite_storage import SqliteStorage
+from library_system.storage.binary_storage import BinaryStorage
+from library_system.storage.sharded_storage import ShardedStorage
+from library_system.storage.journal import Journal
+
+__all__ = ["StorageBackend", "JsonStorage", "SqliteStorage", "BinaryStorage", "ShardedStorage",
+           "Journal"]
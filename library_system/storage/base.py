@@ -0,0 +1,123 @@
+"""Abstract storage backend for Library Management System"""
+
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from library_system.models.member import Member
+from library_system.models.admin import Admin
+
+def member_from_dict(member_dict):
+    """Create a Member or Admin object depending on the stored role"""
+    if member_dict.get("role") == "Admin":
+        return Admin.from_dict(member_dict)
+    return Member.from_dict(member_dict)
+
+class StorageBackend(ABC):
+    """
+    Abstract base class for Library persistence
+    
+    Mutations reach a backend as records: (op, data) pairs such as
+    ("add_book", {"book": {...}}) or ("borrow", {"member_id": .., "book_id": ..}).
+    """
+    
+    bytes_written = 0  # Bytes written to disk so far, for backends that track it
+    
+    @abstractmethod
+    def load(self):
+        """
+        Load the stored snapshot
+        
+        Returns:
+            (books, members) lists of Book and Member/Admin objects
+        """
+        pass
+    
+    @abstractmethod
+    def save(self, books, members):
+        """
+        Replace the stored state with a full snapshot
+        
+        Args:
+            books (dict): book_id -> Book
+            members (dict): user_id -> Member/Admin
+        """
+        pass
+    
+    @abstractmethod
+    def write(self, records, books, members):
+        """
+        Persist a list of mutation records
+        
+        Args:
+            records (list): (op, data) pairs in the order they were applied
+            books (dict): Current books, for backends that rewrite snapshots
+            members (dict): Current members, for backends that rewrite snapshots
+        """
+        pass
+    
+    def track(self, records, books, members):
+        """
+        Note mutations the next save() must include without writing them
+        
+        Called for records a snapshot makes redundant. Backends that write
+        only what changed use them to find what to rewrite (no-op by default).
+        """
+        pass
+    
+    def will_snapshot(self):
+        """
+        Check whether the next write() will rewrite the whole snapshot
+        
+        A thread-safe Library holds every mutation off during such writes,
+        since they read all books and members.
+        """
+        return False
+    
+    def load_lazy(self):
+        """
+        Load the stored snapshot as maps that build objects on first access
+        
+        Backends without a cheap record index load eagerly.
+        
+        Returns:
+            (books, members) mappings of ID -> Book and ID -> Member/Admin
+        """
+        books, members = self.load()
+        return ({book.book_id: book for book in books},
+                {member.user_id: member for member in members})
+    
+    def replay(self):
+        """Yield records stored since the last snapshot, to apply after load()"""
+        return iter(())
+    
+    def lock(self, exclusive=True):
+        """
+        Lock the stored data against other processes (no-op by default)
+        
+        Args:
+            exclusive (bool): Exclusive (for writes) or shared (for reads)
+        
+        Returns:
+            Context manager holding the lock
+        """
+        return nullcontext()
+    
+    def has_changes(self):
+        """Check whether other processes changed the stored data since it was read"""
+        return False
+    
+    def changes(self):
+        """
+        Return records other processes stored since this one last read
+        
+        Returns:
+            List of records, or None if the data must be reloaded from scratch
+        """
+        return []
+    
+    def compact(self, books, members):
+        """Fold pending records into the snapshot (no-op by default)"""
+        pass
+    
+    def close(self):
+        """Release any resources held by the backend"""
+        pass
@@ -0,0 +1,293 @@
+"""Binary snapshot storage backend for Library Management System"""
+
+import gc
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from library_system.models.admin import Admin
+from library_system.models.book import Book
+from library_system.models.member import Member
+from library_system.storage.base import StorageBackend
+from library_system.storage.journal import Journal
+from library_system.storage.json_storage import JsonStorage
+
+MAGIC = b"LIBS"
+VERSION = 2  # Version 1 files have no holds and are still read
+
+# magic, version, reserved, string count, string blob bytes, book count, member count
+HEADER = struct.Struct("<4sHHIIII")
+
+NO_MEMBER = -1  # borrowed_by value for "not borrowed"
+NO_TIME = float("nan")  # borrowed_at/due_at value for "no loan"
+ROLES = ("Member", "Admin")
+ROLE_CLASSES = (Member, Admin)
+
+# Typecode of each column, in file order
+BOOK_COLUMNS = (("book_id", "q"), ("title", "I"), ("author", "I"), ("isbn", "I"),
+                ("is_available", "B"), ("borrowed_by", "q"), ("borrowed_at", "d"), ("due_at", "d"))
+MEMBER_COLUMNS = (("user_id", "q"), ("name", "I"), ("email", "I"), ("role", "B"),
+                  ("borrowed_count", "I"), ("hold_count", "I"))
+
+class BinaryStorage(StorageBackend):
+    """
+    Stores books and members in one compact binary snapshot file
+    
+    The file is a fixed header, a table of every distinct string (each
+    stored once, so an author with a hundred books costs one entry), and
+    one little-endian array per field of books and members. Loading reads
+    the file with a single call, decodes every column with
+    array.frombytes() and builds the objects without going through
+    from_dict().
+    
+    Like JsonStorage, mutations either rewrite the snapshot or, with a
+    journal, are appended to it and folded back in past compact_threshold.
+    """
+    
+    def __init__(self, path, journal_file=None, compact_threshold=1024 * 1024):
+        """
+        Initialize a BinaryStorage
+        
+        Args:
+            path (str): Path of the snapshot file
+            journal_file (str): Path of the journal, or None to disable journaling
+            compact_threshold (int): Journal size in bytes that triggers compaction
+        """
+        self.path = path
+        self.journal = Journal(journal_file) if journal_file else None
+        self.compact_threshold = compact_threshold
+        self._snapshot_bytes = 0  # Bytes written to the snapshot file
+    
+    @property
+    def bytes_written(self):
+        """Bytes written to the snapshot and the journal so far"""
+        return self._snapshot_bytes + (self.journal.bytes_written if self.journal else 0)
+    
+    # ==================== READING ====================
+    
+    def load(self):
+        """Load books and members from the snapshot file"""
+        if not os.path.exists(self.path):
+            return [], []
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        reader = _Reader(data, self.path)
+        magic, version, _, n_strings, blob_size, n_books, n_members = reader.header()
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a library snapshot")
+        if version not in (1, VERSION):
+            raise ValueError(f"{self.path} has unsupported snapshot version {version}")
+        
+        lengths = reader.column("I", n_strings)
+        text = str(reader.raw(blob_size), "utf-8")
+        ends = list(accumulate(lengths))
+        strings = [text[end - length:end] for end, length in zip(ends, lengths)]
+        
+        book_columns = [reader.column(typecode, n_books) for _, typecode in BOOK_COLUMNS]
+        if version == 1:
+            member_columns = [reader.column(typecode, n_members) for _, typecode in MEMBER_COLUMNS[:-1]]
+            member_columns.append(array("I", [0]) * n_members)
+        else:
+            member_columns = [reader.column(typecode, n_members) for _, typecode in MEMBER_COLUMNS]
+        borrowed_ids = reader.column("q", sum(member_columns[-2]))
+        n_holds = sum(member_columns[-1])
+        held_ids = reader.column("q", n_holds)
+        tickets = reader.column("q", n_holds)
+        
+        # The new objects hold no reference cycles, so the cyclic collector
+        # would only rescan the growing heap over and over while they are made
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            books = self._build_books(book_columns, strings)
+            members = self._build_members(member_columns, borrowed_ids, held_ids, tickets, strings)
+        finally:
+            if enabled:
+                gc.enable()
+        return books, members
+    
+    @staticmethod
+    def _build_books(columns, strings):
+        """Create Book objects from decoded columns"""
+        books = []
+        new_book = Book.__new__
+        for book_id, title, author, isbn, available, borrowed_by, borrowed_at, due_at in zip(*columns):
+            book = new_book(Book)
+            book.book_id = book_id
+            book.title = strings[title]
+            book.author = strings[author]
+            book.isbn = strings[isbn]
+            book.is_available = available == 1
+            book.borrowed_by = None if borrowed_by == NO_MEMBER else borrowed_by
+            book.borrowed_at = None if borrowed_at != borrowed_at else borrowed_at  # NaN is NO_TIME
+            book.due_at = None if due_at != due_at else due_at
+            books.append(book)
+        return books
+    
+    @staticmethod
+    def _build_members(columns, borrowed_ids, held_ids, tickets, strings):
+        """Create Member/Admin objects from decoded columns"""
+        members = []
+        start = held = 0
+        for user_id, name, email, role, borrowed_count, hold_count in zip(*columns):
+            cls = ROLE_CLASSES[role]
+            member = cls.__new__(cls)
+            member.user_id = user_id
+            member.name = strings[name]
+            member.email = strings[email]
+            member.borrowed_books = borrowed_ids[start:start + borrowed_count]
+            start += borrowed_count
+            member.holds = zip(held_ids[held:held + hold_count], tickets[held:held + hold_count])
+            held += hold_count
+            members.append(member)
+        return members
+    
+    def replay(self):
+        """Yield the journal records written since the last snapshot"""
+        if self.journal is None:
+            return iter(())
+        return self.journal.replay()
+    
+    # ==================== WRITING ====================
+    
+    def save(self, books, members):
+        """Rewrite the snapshot file and reset the journal"""
+        strings = {}  # String -> index in the string table
+        
+        def intern(text):
+            return strings.setdefault(text, len(strings))
+        
+        book_columns = [array(typecode) for _, typecode in BOOK_COLUMNS]
+        ids, titles, authors, isbns, available, borrowed_by, borrowed_at, due_at = book_columns
+        for book in books.values():
+            ids.append(book.book_id)
+            titles.append(intern(book.title))
+            authors.append(intern(book.author))
+            isbns.append(intern(book.isbn))
+            available.append(1 if book.is_available else 0)
+            borrowed_by.append(NO_MEMBER if book.borrowed_by is None else book.borrowed_by)
+            borrowed_at.append(NO_TIME if book.borrowed_at is None else book.borrowed_at)
+            due_at.append(NO_TIME if book.due_at is None else book.due_at)
+        
+        member_columns = [array(typecode) for _, typecode in MEMBER_COLUMNS]
+        user_ids, names, emails, roles, borrowed_counts, hold_counts = member_columns
+        borrowed_ids = array("q")
+        held_ids = array("q")
+        tickets = array("q")
+        for member in members.values():
+            user_ids.append(member.user_id)
+            names.append(intern(member.name))
+            emails.append(intern(member.email))
+            roles.append(ROLES.index(member.get_role()))
+            borrowed = member.borrowed_books
+            borrowed_counts.append(len(borrowed))
+            borrowed_ids.extend(borrowed)
+            holds = member.holds
+            hold_counts.append(len(holds))
+            held_ids.extend(holds.keys())
+            tickets.extend(holds.values())
+        
+        lengths = array("I", [len(text) for text in strings])
+        blob = "".join(strings).encode("utf-8")
+        chunks = [HEADER.pack(MAGIC, VERSION, 0, len(strings), len(blob), len(ids), len(user_ids)),
+                  _to_bytes(lengths), blob]
+        chunks.extend(_to_bytes(column) for column in book_columns)
+        chunks.extend(_to_bytes(column) for column in member_columns)
+        chunks.extend((_to_bytes(borrowed_ids), _to_bytes(held_ids), _to_bytes(tickets)))
+        
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+            self._snapshot_bytes += f.tell()
+        os.replace(tmp_path, self.path)
+        
+        if self.journal is not None:
+            self.journal.truncate()  # The snapshot now contains every journaled mutation
+    
+    def write(self, records, books, members):
+        """Append records to the journal, or rewrite the snapshot without one"""
+        if self.journal is None:
+            self.save(books, members)
+            return
+        if self.journal.append_many(records) >= self.compact_threshold:
+            self.save(books, members)
+    
+    def will_snapshot(self):
+        """Without a journal, or with one past the threshold, writes rewrite the snapshot"""
+        return self.journal is None or self.journal.size() >= self.compact_threshold
+    
+    def compact(self, books, members):
+        """Fold the journal back into the binary snapshot"""
+        self.save(books, members)
+
+class _Reader:
+    """Sequential reader of the sections of a snapshot file"""
+    
+    def __init__(self, data, path):
+        """
+        Initialize a _Reader
+        
+        Args:
+            data (bytes): Contents of the snapshot file
+            path (str): Path of the file, for error messages
+        """
+        self.data = memoryview(data)
+        self.path = path
+        self.pos = 0
+    
+    def raw(self, size):
+        """Return a memoryview of the next size bytes"""
+        end = self.pos + size
+        if end > len(self.data):
+            raise ValueError(f"{self.path} is truncated")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+    
+    def header(self):
+        """Unpack the fixed header"""
+        return HEADER.unpack(self.raw(HEADER.size))
+    
+    def column(self, typecode, count):
+        """Decode the next column of count little-endian values"""
+        values = array(typecode)
+        values.frombytes(self.raw(values.itemsize * count))
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+def _to_bytes(values):
+    """Encode an array as little-endian bytes"""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def json_to_binary(books_file, members_file, snapshot_file):
+    """
+    Convert a books.json/members.json snapshot to a binary snapshot
+    
+    Only the snapshots are converted; compact a journal into the JSON
+    files first (or convert through a Library, which replays it).
+    
+    Returns:
+        (number of books, number of members)
+    """
+    books, members = JsonStorage(books_file, members_file).load()
+    BinaryStorage(snapshot_file).save({book.book_id: book for book in books},
+                                      {member.user_id: member for member in members})
+    return len(books), len(members)
+
+def binary_to_json(snapshot_file, books_file, members_file):
+    """
+    Convert a binary snapshot to books.json/members.json
+    
+    Returns:
+        (number of books, number of members)
+    """
+    books, members = BinaryStorage(snapshot_file).load()
+    JsonStorage(books_file, members_file).save({book.book_id: book for book in books},
+                                               {member.user_id: member for member in members})
+    return len(books), len(members)
@@ -0,0 +1,111 @@
+"""Append-only journal for Library Management System"""
+
+import json
+import os
+
+class Journal:
+    """Append-only log of library mutations, one compact JSON record per line"""
+    
+    def __init__(self, path):
+        """
+        Initialize a Journal
+        
+        Args:
+            path (str): Path of the journal file
+        """
+        self.path = path
+        self.bytes_written = 0  # Bytes appended through this object
+    
+    def append(self, op, data):
+        """
+        Append one mutation record to the journal
+        
+        Args:
+            op (str): Name of the operation (e.g. "add_book", "borrow")
+            data (dict): Operation payload
+        """
+        self.append_many([(op, data)])
+    
+    def append_many(self, records):
+        """
+        Append several mutation records with a single write
+        
+        Args:
+            records (list): (op, data) pairs
+        
+        Returns:
+            Size of the journal in bytes after the write
+        """
+        lines = []
+        for op, data in records:
+            record = {"op": op}
+            record.update(data)
+            lines.append(json.dumps(record, separators=(",", ":")) + "\n")
+        data = "".join(lines).encode("utf-8")
+        with open(self.path, "ab") as f:
+            f.write(data)
+            self.bytes_written += len(data)
+            return f.tell()
+    
+    def replay(self):
+        """
+        Iterate over the records stored in the journal
+        
+        A torn last line (e.g. from a crash mid-write) is skipped.
+        
+        Yields:
+            dict records in the order they were appended
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    print(f"Skipping corrupt journal record: {line[:60]}")
+    
+    def read_from(self, offset):
+        """
+        Read the complete records appended after a byte offset
+        
+        A partly written last line is left for the next call.
+        
+        Args:
+            offset (int): Byte offset to start reading at
+        
+        Returns:
+            (list of dict records, byte offset just past the last complete line)
+        """
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], offset
+        end = data.rfind(b"\n") + 1
+        records = []
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                print(f"Skipping corrupt journal record: {line[:60]!r}")
+        return records, offset + end
+    
+    def size(self):
+        """Return the size of the journal file in bytes"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+    
+    def truncate(self):
+        """Discard all journal records"""
+        with open(self.path, "w"):
+            pass
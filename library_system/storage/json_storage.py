@@ -0,0 +1,271 @@
+"""JSON file storage backend for Library Management System"""
+
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from library_system.models.book import Book
+from library_system.storage.base import StorageBackend, member_from_dict
+from library_system.storage.journal import Journal
+from library_system.storage.lazy import LazyRecordMap
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+# Top-level keys of a file written by json.dump(..., indent=2)
+RECORD_KEY_RE = re.compile(rb'\n  "(\d+)": \{')
+
+class JsonStorage(StorageBackend):
+    """
+    Stores books and members in books.json and members.json
+    
+    Without a journal every write rewrites both files. With a journal each
+    mutation is appended as one compact record, and the log is folded back
+    into the snapshot once it grows past compact_threshold bytes.
+    
+    With a lock_file the data directory can be shared by several processes.
+    Writes happen under an exclusive fcntl lock on that file, which also
+    stores a generation number bumped by every compaction. Each process
+    remembers how far it has read the journal, so changes() returns only
+    the records other processes appended since. Compaction moves the old
+    journal to <journal>.prev, so a process one generation behind can
+    still catch up record by record.
+    """
+    
+    def __init__(self, books_file, members_file, journal_file=None, compact_threshold=1024 * 1024,
+                 lock_file=None):
+        """
+        Initialize a JsonStorage
+        
+        Args:
+            books_file (str): Path of books.json
+            members_file (str): Path of members.json
+            journal_file (str): Path of the journal, or None to disable journaling
+            compact_threshold (int): Journal size in bytes that triggers compaction
+            lock_file (str): Path of the inter-process lock file, or None when
+                only this process uses the files (requires a journal)
+        """
+        self.books_file = books_file
+        self.members_file = members_file
+        self.journal = Journal(journal_file) if journal_file else None
+        self.compact_threshold = compact_threshold
+        self.lock_file = lock_file
+        self.generation = 0  # Journal generation this process has read
+        self.offset = 0  # Bytes of the current journal this process has applied
+        self._lock_fd = None
+        self._lock_mutex = threading.RLock()  # flock is per process, so threads take turns
+        self._lock_depth = 0
+        self._snapshot_bytes = 0  # Bytes written to the JSON files
+        if lock_file is not None:
+            if self.journal is None:
+                raise ValueError("Sharing the data files between processes requires a journal")
+            if fcntl is None:
+                raise RuntimeError("Sharing the data files between processes requires fcntl (POSIX)")
+            self._lock_fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+    
+    @property
+    def bytes_written(self):
+        """Bytes written to the JSON files and the journal so far"""
+        return self._snapshot_bytes + (self.journal.bytes_written if self.journal else 0)
+    
+    def load(self):
+        """Load books and members from the JSON files"""
+        books = []
+        if os.path.exists(self.books_file):
+            with open(self.books_file, 'r') as f:
+                for book_dict in json.load(f).values():
+                    books.append(Book.from_dict(book_dict))
+        
+        members = []
+        if os.path.exists(self.members_file):
+            with open(self.members_file, 'r') as f:
+                for member_dict in json.load(f).values():
+                    members.append(member_from_dict(member_dict))
+        return books, members
+    
+    def load_lazy(self):
+        """
+        Index record offsets in the JSON files without parsing them
+        
+        Each record is parsed and turned into a Book or Member the first
+        time it is looked up.
+        """
+        book_locators = self._scan_offsets(self.books_file)
+        member_locators = self._scan_offsets(self.members_file)
+        if book_locators is None or member_locators is None:
+            # Not in the layout save() writes - fall back to a full parse
+            return super().load_lazy()
+        books = LazyRecordMap(book_locators,
+                              lambda span: Book.from_dict(self._read_record(self.books_file, span)))
+        members = LazyRecordMap(member_locators,
+                                lambda span: member_from_dict(self._read_record(self.members_file, span)))
+        return books, members
+    
+    @staticmethod
+    def _scan_offsets(path):
+        """
+        Find the byte span of every top-level record in a JSON file
+        
+        Returns:
+            List of (record ID, (start, end)) pairs, or None if the file does
+            not have the layout written by save()
+        """
+        if not os.path.exists(path):
+            return []
+        with open(path, 'rb') as f:
+            data = f.read()
+        matches = list(RECORD_KEY_RE.finditer(data))
+        if not matches:
+            return [] if data.strip() in (b"", b"{}") else None
+        locators = []
+        for i, match in enumerate(matches):
+            start = match.end() - 1  # Offset of the opening brace
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(data)
+            locators.append((int(match.group(1)), (start, end)))
+        return locators
+    
+    @staticmethod
+    def _read_record(path, span):
+        """Parse the record stored at a byte span of a JSON file"""
+        start, end = span
+        with open(path, 'rb') as f:
+            f.seek(start)
+            chunk = f.read(end - start).decode("utf-8")
+        record, _ = json.JSONDecoder().raw_decode(chunk)
+        return record
+    
+    def replay(self):
+        """Yield the journal records written since the last snapshot"""
+        if self.journal is None:
+            return iter(())
+        if self._lock_fd is None:
+            return self.journal.replay()
+        self.generation = self._read_generation()
+        records, self.offset = self.journal.read_from(0)
+        return iter(records)
+    
+    # ==================== MULTI-PROCESS SHARING ====================
+    
+    @contextmanager
+    def lock(self, exclusive=True):
+        """
+        Hold the inter-process lock for the duration of the block
+        
+        Nested calls from the thread already holding it do not change the
+        lock mode. Without a lock_file this is a no-op.
+        
+        Args:
+            exclusive (bool): Exclusive (for writes) or shared (for reads)
+        """
+        if self._lock_fd is None:
+            yield
+            return
+        with self._lock_mutex:
+            if not self._lock_depth:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if not self._lock_depth:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+    
+    def _read_generation(self):
+        """Read the generation number stored in the lock file"""
+        try:
+            return int(os.pread(self._lock_fd, 32, 0) or b"0")
+        except ValueError:
+            return -1  # Being rewritten; treated as a change
+    
+    def _write_generation(self, generation):
+        """Store a new generation number in the lock file"""
+        data = str(generation).encode()
+        os.pwrite(self._lock_fd, data, 0)
+        os.ftruncate(self._lock_fd, len(data))
+        self.generation = generation
+    
+    def has_changes(self):
+        """Cheaply check, without locking, whether another process wrote since the last read"""
+        if self._lock_fd is None:
+            return False
+        return self._read_generation() != self.generation or self.journal.size() != self.offset
+    
+    def changes(self):
+        """
+        Return the records other processes wrote since this one last read
+        
+        The caller must hold lock().
+        
+        Returns:
+            List of records, or None when this process fell more than one
+            compaction behind and has to reload from scratch
+        """
+        if self._lock_fd is None:
+            return []
+        generation = self._read_generation()
+        if generation == self.generation:
+            records, self.offset = self.journal.read_from(self.offset)
+            return records
+        previous = Journal(self.journal.path + ".prev")
+        if generation == self.generation + 1 and os.path.exists(previous.path):
+            records, _ = previous.read_from(self.offset)
+            newer, self.offset = self.journal.read_from(0)
+            self.generation = generation
+            return records + newer
+        return None
+    
+    def _write_json(self, path, data):
+        """Atomically write data as pretty-printed JSON"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+            self._snapshot_bytes += f.tell()
+        os.replace(tmp_path, path)
+    
+    def save(self, books, members):
+        """Rewrite both JSON files and reset the journal"""
+        books_data = {str(book_id): book.to_dict() for book_id, book in books.items()}
+        self._write_json(self.books_file, books_data)
+        
+        members_data = {str(user_id): member.to_dict() for user_id, member in members.items()}
+        self._write_json(self.members_file, members_data)
+        
+        # The snapshot now contains every journaled mutation
+        if self._lock_fd is not None:
+            # Keep the old journal for processes that have not read it all yet
+            if os.path.exists(self.journal.path):
+                os.replace(self.journal.path, self.journal.path + ".prev")
+            self.journal.truncate()
+            self._write_generation(self.generation + 1)
+            self.offset = 0
+        elif self.journal is not None:
+            self.journal.truncate()
+    
+    def write(self, records, books, members):
+        """Append records to the journal, or rewrite the snapshot without one"""
+        if self.journal is None:
+            self.save(books, members)
+            return
+        size = self.journal.append_many(records)
+        if self._lock_fd is not None:
+            self.offset = size  # Caught up by the caller before writing
+        if size >= self.compact_threshold:
+            self.save(books, members)
+    
+    def will_snapshot(self):
+        """Without a journal, or with one past the threshold, writes rewrite both files"""
+        return self.journal is None or self.journal.size() >= self.compact_threshold
+    
+    def compact(self, books, members):
+        """Fold the journal back into the JSON snapshot"""
+        self.save(books, members)
+    
+    def close(self):
+        """Release the lock file"""
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
@@ -0,0 +1,87 @@
+"""Lazily materialized record maps for Library Management System"""
+
+import threading
+from collections.abc import MutableMapping
+
+class _Stub:
+    """Placeholder for a record that has not been materialized yet"""
+    
+    __slots__ = ("locator",)
+    
+    def __init__(self, locator):
+        """Initialize a stub for the record at locator"""
+        self.locator = locator
+
+class LazyRecordMap(MutableMapping):
+    """
+    Dictionary-like map of ID -> object that builds objects on first access
+    
+    Only the IDs and a small locator per record (a file offset, a row ID)
+    are kept at startup. Looking a record up, or iterating over values or
+    items, materializes it through the loader and caches the object.
+    """
+    
+    def __init__(self, locators, loader):
+        """
+        Initialize a LazyRecordMap
+        
+        Args:
+            locators (iterable): (record ID, locator) pairs in storage order
+            loader (callable): Builds the object for a locator
+        """
+        self._items = {record_id: _Stub(locator) for record_id, locator in locators}
+        self._loader = loader
+        self._lock = threading.Lock()  # Stops two threads materializing one record
+    
+    def __getitem__(self, record_id):
+        """Return a record, materializing it on first access"""
+        value = self._items[record_id]
+        if type(value) is _Stub:
+            with self._lock:
+                value = self._items[record_id]
+                if type(value) is _Stub:
+                    value = self._loader(value.locator)
+                    self._items[record_id] = value
+        return value
+    
+    def __setitem__(self, record_id, value):
+        """Store a materialized record"""
+        self._items[record_id] = value
+    
+    def __delitem__(self, record_id):
+        """Remove a record without materializing it"""
+        del self._items[record_id]
+    
+    def __contains__(self, record_id):
+        """Check whether a record exists without materializing it"""
+        return record_id in self._items
+    
+    def __iter__(self):
+        """Iterate over record IDs without materializing records"""
+        return iter(self._items)
+    
+    def __len__(self):
+        """Return the number of records"""
+        return len(self._items)
+    
+    def pop(self, record_id, *default):
+        """Remove a record and return it, materializing it if needed"""
+        if record_id not in self._items:
+            if default:
+                return default[0]
+            raise KeyError(record_id)
+        value = self[record_id]
+        del self._items[record_id]
+        return value
+    
+    def clear(self):
+        """Remove every record"""
+        self._items.clear()
+    
+    def materialized_count(self):
+        """Return how many records have been built so far"""
+        return sum(1 for value in self._items.values() if type(value) is not _Stub)
+    
+    def __repr__(self):
+        """String representation of LazyRecordMap"""
+        return f"LazyRecordMap({len(self)} records, {self.materialized_count()} materialized)"
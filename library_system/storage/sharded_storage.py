@@ -0,0 +1,263 @@
+"""Sharded JSON storage backend for Library Management System"""
+
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from library_system.models.book import Book
+from library_system.storage.base import StorageBackend, member_from_dict
+
+MANIFEST_VERSION = 1
+SHARD_FILE_RE = re.compile(r"(books|members)-\d{4}-of-\d{4}\.json")
+
+class ShardedStorage(StorageBackend):
+    """
+    Stores books and members in shard files partitioned by ID
+    
+    A record lives in shard ID % shard_count of its kind, so
+    books-0003-of-0016.json holds every book whose ID leaves remainder 3.
+    Each write() marks the shards of the books and members its records
+    touch as dirty and rewrites only those, so a return rewrites one small
+    book shard and one small member shard instead of both full files.
+    
+    load() reads the shards on a thread pool. Once a shard holds more than
+    max_shard_records records the shard count doubles until the average
+    shard is back under half that. Every shard is written at the new count
+    before manifest.json switches to it, so an interrupted rebalance leaves
+    the old layout in place.
+    """
+    
+    DEFAULT_SHARDS = 16
+    
+    def __init__(self, shard_dir, shard_count=None, max_shard_records=10000, load_workers=None):
+        """
+        Initialize a ShardedStorage
+        
+        Args:
+            shard_dir (str): Directory holding manifest.json and the shard files
+            shard_count (int): Number of shards; an existing directory with a
+                different count is rebalanced on load (None keeps the stored
+                count, or DEFAULT_SHARDS for a new directory)
+            max_shard_records (int): Records in one shard that trigger a rebalance
+            load_workers (int): Threads reading shards in load() (None: one per
+                shard, up to the number of CPUs)
+        """
+        self.shard_dir = shard_dir
+        self.manifest_file = os.path.join(shard_dir, "manifest.json")
+        self.requested_count = shard_count
+        self.shard_count = shard_count or self.DEFAULT_SHARDS
+        self.max_shard_records = max_shard_records
+        self.load_workers = load_workers
+        self.book_shards = [set() for _ in range(self.shard_count)]  # IDs stored in each shard
+        self.member_shards = [set() for _ in range(self.shard_count)]
+        self.dirty_books = set()  # Indexes of book shards to rewrite
+        self.dirty_members = set()
+        self.bytes_written = 0
+        self.shards_written = 0  # Shard files rewritten so far
+        self._has_manifest = False  # Whether the directory holds a complete layout
+        os.makedirs(shard_dir, exist_ok=True)
+    
+    def _shard_file(self, kind, index, count=None):
+        """Return the path of one shard file"""
+        count = count or self.shard_count
+        return os.path.join(self.shard_dir, f"{kind}-{index:04d}-of-{count:04d}.json")
+    
+    # ==================== READING ====================
+    
+    def load(self):
+        """Load every shard on a thread pool"""
+        stored_count = self._read_manifest()
+        if stored_count is None:
+            return [], []
+        self.shard_count = stored_count
+        self._has_manifest = True
+        workers = self.load_workers or min(stored_count, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            book_parts = list(pool.map(self._load_books, range(stored_count)))
+            member_parts = list(pool.map(self._load_members, range(stored_count)))
+        
+        books = [book for part in book_parts for book in part]
+        members = [member for part in member_parts for member in part]
+        books.sort(key=lambda book: book.book_id)
+        members.sort(key=lambda member: member.user_id)
+        
+        self.book_shards = [{book.book_id for book in part} for part in book_parts]
+        self.member_shards = [{member.user_id for member in part} for part in member_parts]
+        self.dirty_books.clear()
+        self.dirty_members.clear()
+        if self.requested_count and self.requested_count != stored_count:
+            self.rebalance({book.book_id: book for book in books},
+                           {member.user_id: member for member in members}, self.requested_count)
+        return books, members
+    
+    def _read_manifest(self):
+        """Return the stored shard count, or None for an empty directory"""
+        if not os.path.exists(self.manifest_file):
+            return None
+        with open(self.manifest_file, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported shard manifest version: {manifest.get('version')}")
+        return manifest["shard_count"]
+    
+    def _read_shard(self, kind, index):
+        """Parse one shard file into a list of record dictionaries"""
+        path = self._shard_file(kind, index)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r') as f:
+            return list(json.load(f).values())
+    
+    def _load_books(self, index):
+        """Build the Book objects of one shard"""
+        return [Book.from_dict(book_dict) for book_dict in self._read_shard("books", index)]
+    
+    def _load_members(self, index):
+        """Build the Member/Admin objects of one shard"""
+        return [member_from_dict(member_dict) for member_dict in self._read_shard("members", index)]
+    
+    # ==================== WRITING ====================
+    
+    def write(self, records, books, members):
+        """Rewrite only the shards holding records touched by the mutations"""
+        self.track(records, books, members)
+        if not self._has_manifest or self._needs_rebalance():
+            self.rebalance(books, members, self._grown_count(len(books), len(members)))
+            return
+        self._flush(books, members)
+    
+    def track(self, records, books, members):
+        """Mark the shards touched by records dirty, to be rewritten by the next write or save"""
+        for op, data in records:
+            book_id, user_id = self._touched(op, data)
+            if book_id is not None:
+                self._track(self.book_shards, self.dirty_books, book_id, book_id in books)
+            if user_id is not None:
+                self._track(self.member_shards, self.dirty_members, user_id, user_id in members)
+    
+    @staticmethod
+    def _touched(op, data):
+        """Return the (book ID, member ID) a mutation record touches, None where it has none"""
+        if op == "add_book":
+            return data["book"]["book_id"], None
+        if op == "add_member":
+            return None, data["member"]["user_id"]
+        if op == "remove_member":
+            return None, data["user_id"]
+        if op in ("hold", "cancel_hold"):
+            return None, data["member_id"]  # Holds are stored on the member
+        return data.get("book_id"), data.get("member_id")
+    
+    def _track(self, shards, dirty, record_id, exists):
+        """Record where an ID now lives and mark its shard dirty"""
+        index = record_id % self.shard_count
+        if exists:
+            shards[index].add(record_id)
+        else:
+            shards[index].discard(record_id)
+        dirty.add(index)
+    
+    def will_snapshot(self):
+        """
+        Shard rewrites read every record in the dirty shards
+        
+        A thread-safe Library therefore holds mutations off while they run.
+        """
+        return True
+    
+    def save(self, books, members):
+        """
+        Bring the shards in line with a full snapshot
+        
+        Only shards marked dirty, or whose set of IDs differs from what
+        this object loaded or wrote, are rewritten; a directory this object
+        has not loaded a manifest from is written in full.
+        """
+        if not self._has_manifest:
+            self.rebalance(books, members, self._grown_count(len(books), len(members)))
+            return
+        for shards, dirty, records in ((self.book_shards, self.dirty_books, books),
+                                       (self.member_shards, self.dirty_members, members)):
+            partition = [set() for _ in range(self.shard_count)]
+            for record_id in records.keys():
+                partition[record_id % self.shard_count].add(record_id)
+            for index, ids in enumerate(partition):
+                if ids != shards[index]:
+                    shards[index] = ids
+                    dirty.add(index)
+        if self._needs_rebalance():
+            self.rebalance(books, members, self._grown_count(len(books), len(members)))
+            return
+        self._flush(books, members)
+    
+    def _flush(self, books, members):
+        """Rewrite the dirty shards"""
+        for kind, shards, dirty, records in (("books", self.book_shards, self.dirty_books, books),
+                                             ("members", self.member_shards, self.dirty_members, members)):
+            for index in sorted(dirty):
+                self._write_shard(self._shard_file(kind, index),
+                                  {str(record_id): records[record_id].to_dict()
+                                   for record_id in sorted(shards[index])})
+            dirty.clear()
+    
+    def _write_shard(self, path, data):
+        """
+        Atomically write one shard as compact JSON
+        
+        Unlike books.json, shards are not indented: json only uses its C
+        encoder without indent, which makes writing a shard several times faster.
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps(data, separators=(",", ":")))
+            self.bytes_written += f.tell()
+        os.replace(tmp_path, path)
+        self.shards_written += 1
+    
+    # ==================== REBALANCING ====================
+    
+    def _needs_rebalance(self):
+        """Check whether a dirty shard grew past max_shard_records"""
+        return (any(len(self.book_shards[index]) > self.max_shard_records for index in self.dirty_books)
+                or any(len(self.member_shards[index]) > self.max_shard_records
+                       for index in self.dirty_members))
+    
+    def _grown_count(self, n_books, n_members):
+        """Double the shard count until shards average at most half of max_shard_records"""
+        count = self.shard_count
+        while max(n_books, n_members) / count > self.max_shard_records / 2:
+            count *= 2
+        return count
+    
+    def rebalance(self, books, members, shard_count):
+        """
+        Redistribute every record over shard_count shards
+        
+        Every shard is written at the new count before the manifest switches
+        to it; the files of the old count are removed last.
+        
+        Args:
+            books (dict): book_id -> Book
+            members (dict): user_id -> Member/Admin
+            shard_count (int): New number of shards
+        """
+        self.shard_count = shard_count
+        self.book_shards = [set() for _ in range(shard_count)]
+        self.member_shards = [set() for _ in range(shard_count)]
+        for book_id in books.keys():
+            self.book_shards[book_id % shard_count].add(book_id)
+        for user_id in members.keys():
+            self.member_shards[user_id % shard_count].add(user_id)
+        self.dirty_books = set(range(shard_count))
+        self.dirty_members = set(range(shard_count))
+        self._flush(books, members)
+        
+        tmp_path = self.manifest_file + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": MANIFEST_VERSION, "shard_count": shard_count}, f)
+        os.replace(tmp_path, self.manifest_file)
+        self._has_manifest = True
+        suffix = f"-of-{shard_count:04d}.json"
+        for name in os.listdir(self.shard_dir):
+            if SHARD_FILE_RE.fullmatch(name) and not name.endswith(suffix):
+                os.remove(os.path.join(self.shard_dir, name))
@@ -0,0 +1,192 @@
+"""SQLite storage backend for Library Management System"""
+
+import json
+import sqlite3
+import threading
+from library_system.models.book import Book
+from library_system.storage.base import StorageBackend, member_from_dict
+from library_system.storage.lazy import LazyRecordMap
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    book_id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    isbn TEXT NOT NULL,
+    is_available INTEGER NOT NULL,
+    borrowed_by INTEGER,
+    borrowed_at REAL,
+    due_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_books_isbn ON books (isbn);
+CREATE INDEX IF NOT EXISTS idx_books_title ON books (title);
+CREATE INDEX IF NOT EXISTS idx_books_author ON books (author);
+CREATE INDEX IF NOT EXISTS idx_books_borrowed_by ON books (borrowed_by);
+CREATE TABLE IF NOT EXISTS members (
+    user_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    role TEXT NOT NULL,
+    borrowed_books TEXT NOT NULL,
+    holds TEXT NOT NULL DEFAULT '[]'
+);
+"""
+
+BOOK_COLUMNS = "book_id, title, author, isbn, is_available, borrowed_by, borrowed_at, due_at"
+MEMBER_COLUMNS = "user_id, name, email, role, borrowed_books, holds"
+
+class SqliteStorage(StorageBackend):
+    """
+    Stores books and members in an SQLite database
+    
+    Every mutation becomes a single-row INSERT, UPDATE or DELETE, and each
+    write() call runs inside one transaction.
+    """
+    
+    def __init__(self, path):
+        """
+        Initialize a SqliteStorage
+        
+        Args:
+            path (str): Path of the database file
+        """
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn_lock = threading.Lock()  # The connection is shared across threads
+        with self._conn_lock, self.conn:
+            self.conn.executescript(SCHEMA)
+            self._migrate()
+    
+    def _migrate(self):
+        """Add columns introduced after a database was created"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(books)")}
+        for column in ("borrowed_at", "due_at"):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE books ADD COLUMN {column} REAL")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_books_due_at ON books (due_at)")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(members)")}
+        if "holds" not in columns:
+            self.conn.execute("ALTER TABLE members ADD COLUMN holds TEXT NOT NULL DEFAULT '[]'")
+    
+    def load(self):
+        """Load books and members from the database"""
+        with self._conn_lock:
+            book_rows = self.conn.execute(
+                f"SELECT {BOOK_COLUMNS} FROM books ORDER BY book_id").fetchall()
+            member_rows = self.conn.execute(
+                f"SELECT {MEMBER_COLUMNS} FROM members ORDER BY user_id").fetchall()
+        books = [Book.from_dict(self._book_dict(row)) for row in book_rows]
+        members = [member_from_dict(self._member_dict(row)) for row in member_rows]
+        return books, members
+    
+    def load_lazy(self):
+        """Read only the primary keys; rows are fetched on first access"""
+        with self._conn_lock:
+            book_ids = [row[0] for row in self.conn.execute("SELECT book_id FROM books ORDER BY book_id")]
+            user_ids = [row[0] for row in self.conn.execute("SELECT user_id FROM members ORDER BY user_id")]
+        books = LazyRecordMap(((book_id, book_id) for book_id in book_ids), self._fetch_book)
+        members = LazyRecordMap(((user_id, user_id) for user_id in user_ids), self._fetch_member)
+        return books, members
+    
+    def _fetch_book(self, book_id):
+        """Load one Book by ID"""
+        with self._conn_lock:
+            row = self.conn.execute(
+                f"SELECT {BOOK_COLUMNS} FROM books WHERE book_id = ?", (book_id,)).fetchone()
+        return Book.from_dict(self._book_dict(row))
+    
+    def _fetch_member(self, user_id):
+        """Load one Member or Admin by ID"""
+        with self._conn_lock:
+            row = self.conn.execute(
+                f"SELECT {MEMBER_COLUMNS} FROM members WHERE user_id = ?", (user_id,)).fetchone()
+        return member_from_dict(self._member_dict(row))
+    
+    @staticmethod
+    def _book_dict(row):
+        """Convert a books row to a Book dictionary"""
+        book_id, title, author, isbn, is_available, borrowed_by, borrowed_at, due_at = row
+        return {"book_id": book_id, "title": title, "author": author, "isbn": isbn,
+                "is_available": bool(is_available), "borrowed_by": borrowed_by,
+                "borrowed_at": borrowed_at, "due_at": due_at}
+    
+    @staticmethod
+    def _member_dict(row):
+        """Convert a members row to a Member dictionary"""
+        user_id, name, email, role, borrowed_books, holds = row
+        return {"user_id": user_id, "name": name, "email": email, "role": role,
+                "borrowed_books": json.loads(borrowed_books), "holds": json.loads(holds)}
+    
+    @staticmethod
+    def _book_row(book):
+        """Convert a Book dictionary to a books row"""
+        return (book["book_id"], book["title"], book["author"], book["isbn"],
+                int(book["is_available"]), book["borrowed_by"],
+                book.get("borrowed_at"), book.get("due_at"))
+    
+    @staticmethod
+    def _member_row(member):
+        """Convert a Member dictionary to a members row"""
+        return (member["user_id"], member["name"], member["email"], member["role"],
+                json.dumps(member.get("borrowed_books", [])), json.dumps(member.get("holds", [])))
+    
+    def save(self, books, members):
+        """Replace every row with a full snapshot in one transaction"""
+        with self._conn_lock, self.conn:
+            self.conn.execute("DELETE FROM books")
+            self.conn.execute("DELETE FROM members")
+            self.conn.executemany(f"INSERT INTO books ({BOOK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                  (self._book_row(book.to_dict()) for book in books.values()))
+            self.conn.executemany(f"INSERT INTO members ({MEMBER_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                                  (self._member_row(member.to_dict()) for member in members.values()))
+    
+    def write(self, records, books, members):
+        """Apply records as single-row statements inside one transaction"""
+        with self._conn_lock, self.conn:
+            for op, data in records:
+                self._write_record(op, data, members)
+    
+    def _write_record(self, op, data, members):
+        """Execute the statement for one mutation record"""
+        if op == "add_book":
+            self.conn.execute(f"INSERT OR REPLACE INTO books ({BOOK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                              self._book_row(data["book"]))
+        elif op == "remove_book":
+            self.conn.execute("DELETE FROM books WHERE book_id = ?", (data["book_id"],))
+        elif op == "add_member":
+            self.conn.execute(f"INSERT OR REPLACE INTO members ({MEMBER_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                              self._member_row(data["member"]))
+        elif op == "remove_member":
+            self.conn.execute("DELETE FROM members WHERE user_id = ?", (data["user_id"],))
+        elif op in ("borrow", "return"):
+            borrowed = op == "borrow"
+            self.conn.execute(
+                "UPDATE books SET is_available = ?, borrowed_by = ?, borrowed_at = ?, due_at = ?"
+                " WHERE book_id = ?",
+                (int(not borrowed), data["member_id"] if borrowed else None,
+                 data.get("borrowed_at") if borrowed else None,
+                 data.get("due_at") if borrowed else None, data["book_id"]))
+            self._write_borrowed_books(data["member_id"], members)
+        elif op in ("hold", "cancel_hold"):
+            self._write_holds(data["member_id"], members)
+        else:
+            raise ValueError(f"Unknown storage operation: {op}")
+    
+    def _write_borrowed_books(self, user_id, members):
+        """Store the current borrowed_books list of one member"""
+        member = members.get(user_id)
+        if member is not None:
+            self.conn.execute("UPDATE members SET borrowed_books = ? WHERE user_id = ?",
+                              (json.dumps(member.borrowed_books), user_id))
+    
+    def _write_holds(self, user_id, members):
+        """Store the current holds of one member"""
+        member = members.get(user_id)
+        if member is not None:
+            self.conn.execute("UPDATE members SET holds = ? WHERE user_id = ?",
+                              (json.dumps(list(member.holds.items())), user_id))
+    
+    def close(self):
+        """Close the database connection"""
+        with self._conn_lock:
+            self.conn.close()
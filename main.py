@@ -1,13 +1,29 @@
 """Main application for Library Management System"""
 
+import argparse
+import atexit
+import time
+from library_system.models.isbn import is_valid_isbn
+from library_system.api import run_server
 from library_system.services.library import Library
+from library_system.services.importer import CatalogImporter
+from library_system.services.metrics import Metrics
+from library_system.storage import BinaryStorage, JsonStorage, ShardedStorage, SqliteStorage
 
 class LibraryApp:
     """Main application class for Library Management System"""
     
-    def __init__(self):
-        """Initialize the application"""
-        self.library = Library()
+    PAGE_SIZE = 20  # Rows shown per page on list screens
+    TOP_K = 10  # Rows shown in each circulation report
+    
+    def __init__(self, library=None):
+        """
+        Initialize the application
+        
+        Args:
+            library (Library): Library to serve (defaults to the JSON data files)
+        """
+        self.library = library if library is not None else Library()
         self.running = True
     
     def clear_screen(self):
@@ -91,6 +107,10 @@ class LibraryApp:
             elif choice == "5":
                 self.view_all_members()
             elif choice == "6":
+                self.view_overdue_loans()
+            elif choice == "7":
+                self.circulation_reports()
+            elif choice == "8":
                 print(f"\n✓ Goodbye, {admin.name}!")
                 break
             else:
@@ -111,6 +131,8 @@ class LibraryApp:
             elif choice == "4":
                 self.view_borrowed_books(member)
             elif choice == "5":
+                self.view_holds(member)
+            elif choice == "6":
                 print(f"\n✓ Goodbye, {member.name}!")
                 break
             else:
@@ -127,7 +149,10 @@ class LibraryApp:
             print("❌ All fields are required.")
             return
         
-        book = self.library.add_book(title, author, isbn)
+        if not is_valid_isbn(isbn):
+            print("⚠ ISBN checksum is not valid; adding anyway.")
+        
+        book = self.library.add_book(title, author, isbn, duplicates="flag")
         if book:
             print(f"\n✓ Book added successfully!")
             print(f"Book ID: {book.book_id}")
@@ -157,18 +182,25 @@ class LibraryApp:
         print("\n--- Search Books ---")
         print("1. Search by Title")
         print("2. Search by Author")
+        print("3. Search by ISBN")
         choice = input("Select search type: ").strip()
         
         keyword = input("Enter search keyword: ").strip()
         
-        if choice == "1":
-            results = self.library.search_books(keyword, "title")
-        elif choice == "2":
-            results = self.library.search_books(keyword, "author")
-        else:
+        if choice in ("1", "2"):
+            search_type = "title" if choice == "1" else "author"
+            shown = self.show_pages(
+                lambda cursor: self.library.page_search_books(keyword, search_type, page_size=self.PAGE_SIZE,
+                                                              cursor=cursor),
+                print, "Search Results")
+            if shown is None:
+                self.show_closest_matches(keyword, search_type)
+            return
+        if choice != "3":
             print("❌ Invalid option.")
             return
         
+        results = self.library.get_books_by_isbn(keyword)
         if results:
             print(f"\n✓ Found {len(results)} result(s):\n")
             for book in results:
@@ -176,47 +208,152 @@ class LibraryApp:
         else:
             print("❌ No books found.")
     
-    def view_all_books(self):
-        """View all books in the library"""
-        books = self.library.list_all_books()
+    def show_closest_matches(self, keyword, search_type):
+        """Offer the most similar books when a search found nothing"""
+        matches = self.library.fuzzy_search_books(keyword, search_type, limit=10)
+        if not matches:
+            print("❌ No books found.")
+            return
+        print(f"\n❌ No exact matches. Closest {search_type}s:\n")
+        for book, score in matches:
+            print(f"{score:>4.0%}  {book}")
+    
+    def show_pages(self, fetch_page, show, title, prompt="Enter to go back"):
+        """
+        Print a listing one page at a time with next/previous controls
+        
+        Args:
+            fetch_page (callable): fetch_page(cursor) returns a Page
+            show (callable): Prints one record
+            title (str): Heading of the listing
+            prompt (str): What any other input does
         
-        if not books:
+        Returns:
+            The input that ended paging, or None if the listing is empty
+        """
+        cursor = None
+        while True:
+            page = fetch_page(cursor)
+            if not page.items and cursor is None:
+                return None
+            print(f"\n--- {title} ({page.total} total) ---\n")
+            for item in page:
+                show(item)
+            
+            controls = []
+            if page.next_cursor:
+                controls.append("'n' next")
+            if page.prev_cursor:
+                controls.append("'p' previous")
+            suffix = f" ({', '.join(controls)})" if controls else ""
+            choice = input(f"\n{prompt}{suffix}: ").strip()
+            if choice.lower() == "n" and page.next_cursor:
+                cursor = page.next_cursor
+            elif choice.lower() == "p" and page.prev_cursor:
+                cursor = page.prev_cursor
+            else:
+                return choice
+    
+    def view_all_books(self):
+        """View all books in the library, one page at a time"""
+        shown = self.show_pages(
+            lambda cursor: self.library.page_books(self.PAGE_SIZE, cursor), print, "All Books")
+        if shown is None:
             print("❌ No books in the library.")
+    
+    def view_all_members(self):
+        """View all members, one page at a time - Admin only"""
+        query = input("Filter by name prefix or email (Enter for all): ").strip()
+        
+        if "@" in query:
+            member = self.library.get_member_by_email(query)
+            if member:
+                print(f"\n{member}")
+            else:
+                print("❌ No matching members.")
             return
         
-        print(f"\n--- All Books ({len(books)} total) ---\n")
-        for book in books:
-            print(book)
+        shown = self.show_pages(
+            lambda cursor: self.library.page_members(query, self.PAGE_SIZE, cursor), print, "Members")
+        if shown is None:
+            print("❌ No matching members." if query else "❌ No members in the system.")
     
-    def view_all_members(self):
-        """View all members - Admin only"""
-        members = self.library.list_all_members()
+    def view_overdue_loans(self):
+        """View overdue loans, most overdue first - Admin only"""
+        loans = self.library.get_overdue_loans(limit=self.PAGE_SIZE)
         
-        if not members:
-            print("❌ No members in the system.")
+        if not loans:
+            print("✓ No overdue loans.")
             return
         
-        print(f"\n--- All Members ({len(members)} total) ---\n")
-        for member in members:
-            print(member)
+        print(f"\n--- Overdue Loans (showing {len(loans)}) ---\n")
+        for loan in loans:
+            book = self.library.get_book(loan.book_id)
+            member = self.library.get_member(loan.member_id)
+            title = book.title if book else f"Book #{loan.book_id}"
+            name = member.name if member else f"Member #{loan.member_id}"
+            print(f"{format_date(loan.due_at)} - '{title}' borrowed by {name}")
+    
+    def circulation_reports(self):
+        """View circulation reports - Admin only"""
+        print("\n--- Circulation Reports ---")
+        print("1. Top Titles, Authors and Members")
+        print("2. Custom Report")
+        choice = input("Select report: ").strip()
+        
+        if choice == "1":
+            report = self.library.circulation_report(k=self.TOP_K)
+            print("\n--- Most Borrowed Titles ---\n")
+            for title, borrows in report["most_borrowed_titles"]:
+                print(f"{borrows:>6}  {title}")
+            print("\n--- Author Utilization ---\n")
+            for author, on_loan, copies in report["author_utilization"]:
+                print(f"{on_loan / copies:>6.0%}  {author} ({on_loan} of {copies} on loan)")
+            print("\n--- Most Active Members ---\n")
+            for member_id, name, loans in report["most_active_members"]:
+                print(f"{loans:>6}  {name} (ID: {member_id})")
+            return
+        if choice != "2":
+            print("❌ Invalid option.")
+            return
+        
+        group_by = input("Group by (title/author/member): ").strip().lower()
+        status = input("Books that are (all/available/on_loan/overdue): ").strip().lower()
+        try:
+            counts = self.library.adhoc_report(group_by, status, k=self.TOP_K)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        if not counts:
+            print("❌ No matching books.")
+            return
+        print(f"\n--- {status} books by {group_by} ---\n")
+        for group, count in counts:
+            if group_by == "member":
+                group = f"{group[1]} (ID: {group[0]})"
+            print(f"{count:>6}  {group}")
     
     def borrow_book_member(self, member):
         """Borrow a book - Member only"""
         print("\n--- Borrow Book ---")
         
-        # Show available books
-        available = self.library.get_available_books()
-        if not available:
+        # Show available books one page at a time
+        choice = self.show_pages(
+            lambda cursor: self.library.page_available_books(self.PAGE_SIZE, cursor),
+            lambda book: print(f"ID: {book.book_id} - {book.title} by {book.author}"),
+            "Available Books", "Enter Book ID to borrow")
+        if choice is None:
             print("❌ No books available to borrow.")
             return
         
-        print("Available books:")
-        for book in available:
-            print(f"ID: {book.book_id} - {book.title} by {book.author}")
-        
         try:
-            book_id = int(input("\nEnter Book ID to borrow: "))
-            self.library.borrow_book(member.user_id, book_id)
+            book_id = int(choice)
+            if self.library.borrow_book(member.user_id, book_id):
+                return
+            book = self.library.get_book(book_id)
+            if book and not book.is_available and not member.has_borrowed(book_id):
+                if input("Place a hold and get it when it is returned? (y/n): ").strip().lower() == "y":
+                    self.library.place_hold(member.user_id, book_id)
         except ValueError:
             print("❌ Please enter a valid book ID.")
     
@@ -253,7 +390,34 @@ class LibraryApp:
         for book_id in borrowed:
             book = self.library.get_book(book_id)
             if book:
-                print(f"ID: {book.book_id} - '{book.title}' by {book.author}")
+                line = f"ID: {book.book_id} - '{book.title}' by {book.author}"
+                loan = self.library.get_loan(book_id)
+                if loan:
+                    line += f" (due {format_date(loan.due_at)}{', OVERDUE' if loan.is_overdue() else ''})"
+                print(line)
+    
+    def view_holds(self, member):
+        """View and cancel member's holds"""
+        holds = self.library.get_holds(member.user_id)
+        
+        if not holds:
+            print("\n❌ You have no holds.")
+            return
+        
+        print(f"\n--- Your Holds ({len(holds)} total) ---\n")
+        for book_id, position in holds:
+            book = self.library.get_book(book_id)
+            title = book.title if book else f"Book #{book_id}"
+            print(f"ID: {book_id} - '{title}' (number {position} in line)")
+        
+        choice = input("\nEnter Book ID to cancel its hold (Enter to go back): ").strip()
+        if not choice:
+            return
+        try:
+            if self.library.cancel_hold(member.user_id, int(choice)):
+                print("✓ Hold cancelled.")
+        except ValueError:
+            print("❌ Please enter a valid book ID.")
     
     def setup_demo_data(self):
         """Setup demo data for testing"""
@@ -281,7 +445,7 @@ class LibraryApp:
         print("="*50)
         
         # Check if this is first run
-        if not self.library.list_all_members():
+        if not self.library.members:
             print("\nThis appears to be your first run.")
             print("Setting up demo data for testing...\n")
             self.setup_demo_data()
@@ -302,10 +466,149 @@ class LibraryApp:
             else:
                 print("❌ Invalid option. Please try again.")
 
+def format_date(timestamp):
+    """Format a timestamp as a date for display"""
+    if timestamp is None:
+        return "unknown"
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+def open_library(args, threadsafe=False):
+    """Open the Library with the storage backend selected on the command line"""
+    options = {"lazy": args.lazy, "threadsafe": threadsafe, "group_commit": args.group_commit,
+               "search_cache_size": args.search_cache, "search_cache_ttl": args.search_cache_ttl}
+    if args.metrics or args.slow_log:
+        options["metrics"] = metrics = Metrics(slow_threshold=args.slow_ms / 1000, slow_log=args.slow_log)
+        if args.metrics:
+            atexit.register(metrics.write, args.metrics)
+    if args.storage == "sqlite":
+        return Library(storage=SqliteStorage(args.db or Library.DB_FILE), **options)
+    if args.storage == "binary":
+        return Library(storage=open_snapshot(args), **options)
+    if args.storage == "sharded":
+        return Library(storage=ShardedStorage(Library.SHARD_DIR, args.shards), **options)
+    return Library(journaled=args.journaled, shared=args.shared, **options)
+
+def migrate_to_sqlite(args):
+    """Handle the migrate command: copy the JSON data files into SQLite"""
+    source = Library(journaled=True)  # Also replays a journal if one exists
+    target = SqliteStorage(args.db or Library.DB_FILE)
+    try:
+        target.save(source.books, source.members)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return
+    finally:
+        target.close()
+    print(f"✓ Migrated {len(source.books)} books and {len(source.members)} members "
+          f"to {target.path}")
+
+def open_snapshot(args, journaled=False):
+    """Open the binary snapshot selected on the command line"""
+    path = args.snapshot or Library.SNAPSHOT_FILE
+    return BinaryStorage(path, path + ".journal" if journaled or args.journaled else None)
+
+def convert_snapshot(args):
+    """Handle the convert command: rewrite the data in the JSON or binary format"""
+    # Both sides name their journal, so pending records are read from the
+    # source and the target's stale journal is reset by save()
+    if args.to == "binary":
+        source = Library(journaled=True)
+        target = open_snapshot(args, journaled=True)
+    else:
+        source = Library(storage=open_snapshot(args, journaled=True))
+        target = JsonStorage(Library.BOOKS_FILE, Library.MEMBERS_FILE, Library.JOURNAL_FILE)
+    try:
+        target.save(source.books, source.members)
+    except Exception as e:
+        print(f"❌ Conversion failed: {e}")
+        return
+    print(f"✓ Converted {len(source.books)} books and {len(source.members)} members to {args.to}")
+
+def import_catalog(args):
+    """Handle the import command"""
+    library = open_library(args)
+    
+    def show_progress(report):
+        print(f"  chunk {report.chunks}: {report.imported} imported, "
+              f"{report.rejected} rejected, {report.rows_per_second:.0f} rows/s")
+    
+    importer = CatalogImporter(library, chunk_size=args.chunk_size, progress=show_progress)
+    try:
+        report = importer.import_file(args.path, fmt=args.format)
+    except (OSError, ValueError) as e:
+        print(f"❌ Import failed: {e}")
+        return
+    
+    print(f"\n✓ Imported {report.imported} of {report.rows_read} rows "
+          f"in {report.elapsed:.2f}s ({report.rows_per_second:.0f} rows/s)")
+    if report.rejected:
+        print(f"❌ Rejected {report.rejected} row(s):")
+        for row_number, reason in report.rejects:
+            print(f"  row {row_number}: {reason}")
+        if report.rejected > len(report.rejects):
+            print(f"  ... and {report.rejected - len(report.rejects)} more")
+
 def main():
     """Main entry point"""
-    app = LibraryApp()
+    parser = argparse.ArgumentParser(description="Library Management System")
+    parser.add_argument("--storage", choices=["json", "sqlite", "binary", "sharded"], default="json",
+                        help="Storage backend")
+    parser.add_argument("--db", help=f"SQLite database path (default: {Library.DB_FILE})")
+    parser.add_argument("--snapshot", help=f"Binary snapshot path (default: {Library.SNAPSHOT_FILE})")
+    parser.add_argument("--shards", type=int, metavar="N",
+                        help=f"Shard count for sharded storage (rebalances an existing {Library.SHARD_DIR})")
+    parser.add_argument("--journaled", action="store_true", help="Journal mutations (JSON and binary storage)")
+    parser.add_argument("--lazy", action="store_true", help="Build records on first access")
+    parser.add_argument("--group-commit", type=float, metavar="SECONDS",
+                        help="Write mutations in the background, grouped over this window")
+    parser.add_argument("--shared", action="store_true",
+                        help="Share the JSON data files with other running processes")
+    parser.add_argument("--search-cache", type=int, default=256, metavar="ENTRIES",
+                        help="Search results kept in the LRU cache (0 disables it)")
+    parser.add_argument("--search-cache-ttl", type=float, metavar="SECONDS",
+                        help="Expire cached search results after this long")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Write operation metrics on exit (.prom for Prometheus text, else JSON)")
+    parser.add_argument("--slow-ms", type=float, metavar="MS", default=100.0,
+                        help="Log operations slower than this many milliseconds (default: 100)")
+    parser.add_argument("--slow-log", metavar="PATH", help="Append slow operations to this file")
+    commands = parser.add_subparsers(dest="command")
+    
+    import_parser = commands.add_parser("import", help="Bulk import books from CSV or JSONL")
+    import_parser.add_argument("path", help="Catalog file (.csv, .jsonl)")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"], help="Override format detection")
+    import_parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per persistence flush")
+    
+    commands.add_parser("migrate", help="Copy the JSON data files into an SQLite database")
+    
+    convert_parser = commands.add_parser("convert", help="Convert between the JSON files and a binary snapshot")
+    convert_parser.add_argument("to", choices=["binary", "json"], help="Format to write")
+    
+    serve_parser = commands.add_parser("serve", help="Serve the library as an HTTP/JSON API")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    serve_parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    
+    args = parser.parse_args()
+    if args.shared and (args.storage != "json" or args.group_commit is not None or args.lazy):
+        parser.error("--shared works with JSON storage and without --group-commit or --lazy")
+    if args.command == "import":
+        import_catalog(args)
+        return
+    if args.command == "migrate":
+        migrate_to_sqlite(args)
+        return
+    if args.command == "convert":
+        convert_snapshot(args)
+        return
+    if args.command == "serve":
+        library = open_library(args, threadsafe=True)
+        run_server(library, args.host, args.port)
+        library.close()
+        return
+    
+    app = LibraryApp(open_library(args))
     app.run()
+    app.library.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,167 @@
+"""Tests for the HTTP/JSON API"""
+
+import asyncio
+import threading
+import pytest
+
+from library_system.api import ApiClient, LibraryServer
+from library_system.services import Library, Metrics
+
+def run_against_server(tmp_path, scenario, metrics=None):
+    """Start a server on a free port, run scenario(client, library) and stop it"""
+    library = Library(data_dir=str(tmp_path), journaled=True, threadsafe=True, metrics=metrics)
+    
+    async def main():
+        server = LibraryServer(library, port=0)
+        await server.start()
+        client = ApiClient(server.host, server.port)
+        try:
+            await scenario(client, library)
+        finally:
+            await client.close()
+            await server.close()
+    
+    asyncio.run(main())
+    return library
+
+def test_server_requires_threadsafe_library(tmp_path):
+    with pytest.raises(ValueError):
+        LibraryServer(Library(data_dir=str(tmp_path)))
+
+def test_book_member_and_loan_routes(tmp_path):
+    async def scenario(client, library):
+        status, book = await client.request("POST", "/books", {
+            "title": "Clean Code", "author": "Robert C. Martin", "isbn": "978-0132350884"})
+        assert status == 201 and book["title"] == "Clean Code"
+        status, member = await client.request("POST", "/members", {
+            "name": "John Doe", "email": "john@example.com"})
+        assert status == 201
+        assert (await client.request("POST", "/members", {
+            "name": "Johnny", "email": "JOHN@example.com"}))[0] == 409
+        
+        borrow = f"/books/{book['book_id']}/borrow"
+        status, data = await client.request("POST", borrow, {"member_id": member["user_id"], "due_at": 100})
+        assert status == 200 and data["borrowed_by"] == member["user_id"]
+        assert (await client.request("POST", borrow, {"member_id": member["user_id"]}))[0] == 409
+        assert (await client.request("DELETE", f"/members/{member['user_id']}"))[0] == 409
+        assert (await client.request("DELETE", f"/books/{book['book_id']}"))[0] == 409
+        status, data = await client.request("GET", "/loans/overdue")
+        assert [loan["book_id"] for loan in data["loans"]] == [book["book_id"]]
+        
+        status, data = await client.request("GET", "/books?q=clean%20co&available=1")
+        assert [b["book_id"] for b in data["books"]] == [book["book_id"]]
+        assert (await client.request("GET", "/books?available=1"))[1] == {"books": []}
+        status, data = await client.request("POST", f"/books/{book['book_id']}/return",
+                                            {"member_id": member["user_id"]})
+        assert status == 200 and data["is_available"]
+        
+        status, data = await client.request("GET", "/members?email=john@EXAMPLE.com")
+        assert [m["user_id"] for m in data["members"]] == [member["user_id"]]
+        assert (await client.request("DELETE", f"/members/{member['user_id']}"))[0] == 200
+        assert (await client.request("GET", f"/members/{member['user_id']}"))[0] == 404
+        assert (await client.request("DELETE", f"/books/{book['book_id']}"))[0] == 200
+        assert (await client.request("GET", f"/books/{book['book_id']}"))[0] == 404
+    
+    library = run_against_server(tmp_path, scenario)
+    reloaded = Library(data_dir=library.DATA_DIR, journaled=True)
+    assert not reloaded.books and not reloaded.members
+
+def test_bad_requests(tmp_path):
+    async def scenario(client, library):
+        assert (await client.request("GET", "/nowhere"))[0] == 404
+        assert (await client.request("PUT", "/books"))[0] == 405
+        assert (await client.request("POST", "/books", {"title": "No author"}))[0] == 400
+        assert (await client.request("GET", "/books?limit=many"))[0] == 400
+        assert (await client.request("POST", "/books/1000/borrow", {"member_id": 1}))[0] == 404
+    
+    run_against_server(tmp_path, scenario)
+
+def test_concurrent_clients_never_double_borrow(tmp_path):
+    async def scenario(client, library):
+        book = library.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+        members = library.add_members([(f"Member {i}", f"m{i}@example.com") for i in range(20)])
+        clients = [ApiClient(client.host, client.port) for _ in members]
+        statuses = await asyncio.gather(*(
+            c.request("POST", f"/books/{book.book_id}/borrow", {"member_id": m.user_id})
+            for c, m in zip(clients, members)))
+        for c in clients:
+            await c.close()
+        assert sorted(status for status, _ in statuses) == [200] + [409] * 19
+    
+    run_against_server(tmp_path, scenario)
+
+def test_metrics_route(tmp_path):
+    async def scenario(client, library):
+        await client.request("GET", "/books?q=clean")
+        status, text = await client.request("GET", "/metrics")
+        assert status == 200 and 'library_operation_seconds_count{op="search_books"} 1' in text
+        status, data = await client.request("GET", "/metrics?format=json")
+        assert data["operations"]["search_books"]["calls"] == 1
+    
+    run_against_server(tmp_path, scenario, Metrics())
+    
+    async def disabled(client, library):
+        assert (await client.request("GET", "/metrics"))[0] == 404
+    
+    run_against_server(tmp_path, disabled)
+
+def test_analytics_routes(tmp_path):
+    async def scenario(client, library):
+        book = library.add_book("Dune", "Frank Herbert", "1")
+        library.add_book("Emma", "Jane Austen", "2")
+        member = library.add_member("Alice", "alice@example.com")
+        await client.request("POST", f"/books/{book.book_id}/borrow", {"member_id": member.user_id})
+        
+        status, data = await client.request("GET", "/analytics?k=5")
+        assert status == 200
+        assert data["most_borrowed_titles"] == [{"title": "Dune", "borrows": 1}]
+        assert data["author_utilization"] == [{"author": "Frank Herbert", "on_loan": 1, "copies": 1}]
+        assert data["most_active_members"] == [{"member_id": member.user_id, "name": "Alice", "loans": 1}]
+        
+        status, data = await client.request("GET", "/analytics/adhoc?group_by=member&status=on_loan")
+        assert data["groups"] == [{"member_id": member.user_id, "name": "Alice", "count": 1}]
+        status, data = await client.request("GET", "/analytics/adhoc?group_by=author&status=available")
+        assert data["groups"] == [{"author": "Jane Austen", "count": 1}]
+        assert (await client.request("GET", "/analytics/adhoc?status=lost"))[0] == 400
+    
+    run_against_server(tmp_path, scenario)
+
+def test_hold_routes(tmp_path):
+    async def scenario(client, library):
+        book = library.add_book("Dune", "Frank Herbert", "1")
+        alice = library.add_member("Alice", "alice@example.com")
+        bob = library.add_member("Bob", "bob@example.com")
+        await client.request("POST", f"/books/{book.book_id}/borrow", {"member_id": alice.user_id})
+        
+        status, data = await client.request("POST", f"/books/{book.book_id}/hold", {"member_id": bob.user_id})
+        assert status == 201 and data["position"] == 1
+        assert (await client.request("POST", f"/books/{book.book_id}/hold", {"member_id": bob.user_id}))[0] == 409
+        status, data = await client.request("GET", f"/members/{bob.user_id}/holds")
+        assert data == {"holds": [{"book_id": book.book_id, "position": 1}]}
+        
+        status, data = await client.request("POST", f"/books/{book.book_id}/return", {"member_id": alice.user_id})
+        assert status == 200 and data["borrowed_by"] == bob.user_id
+        assert (await client.request("GET", f"/books/{book.book_id}/holds"))[1] == {"queue": []}
+        status, _ = await client.request("DELETE", f"/books/{book.book_id}/hold?member_id={bob.user_id}")
+        assert status == 404
+    
+    run_against_server(tmp_path, scenario)
+
+def test_listings_and_reports_run_off_the_event_loop(tmp_path):
+    async def scenario(client, library):
+        book = library.add_book("Dune", "Frank Herbert", "1")
+        member = library.add_member("Alice", "alice@example.com")
+        threads = {}
+        for name in ("list_all_books", "fuzzy_search_books", "find_members", "get_overdue_loans",
+                     "circulation_report", "get_hold_queue", "get_holds"):
+            def recording(*args, _name=name, _call=getattr(library, name)):
+                threads[_name] = threading.current_thread()
+                return _call(*args)
+            setattr(library, name, recording)
+        
+        for path in ("/books", "/books?q=dnue&match=fuzzy", "/members?q=al", "/loans/overdue",
+                     "/analytics", f"/books/{book.book_id}/holds", f"/members/{member.user_id}/holds"):
+            assert (await client.request("GET", path))[0] == 200
+        assert len(threads) == 7 and threading.main_thread() not in threads.values()
+    
+    run_against_server(tmp_path, scenario)
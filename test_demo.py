@@ -10,8 +10,10 @@ def test_library_system():
     print("LIBRARY MANAGEMENT SYSTEM - TEST DEMO")
     print("="*60)
     
-    # Create library instance
-    lib = Library()
+    # Create library instance on a scratch data directory
+    import tempfile
+    data_dir = tempfile.mkdtemp()
+    lib = Library(data_dir=data_dir)
     print("\n✓ Library initialized")
     
     # Test 1: Add books
@@ -90,7 +92,7 @@ def test_library_system():
     
     # Test 9: Load from persisted data
     print("\n--- TEST 9: Load from Persisted Data ---")
-    lib2 = Library()
+    lib2 = Library(data_dir=data_dir)
     print(f"Loaded {len(lib2.books)} books from storage")
     print(f"Loaded {len(lib2.members)} members from storage")
     
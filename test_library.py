@@ -0,0 +1,945 @@
+"""Tests for the Library service"""
+
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import pytest
+
+from library_system.models import Book, BookStore
+from library_system.models.id_allocator import IdAllocator
+from library_system.models.isbn import is_valid_isbn, normalize_isbn
+from library_system.services import Library, CatalogImporter, Metrics
+from library_system.services.analytics import CirculationStats
+from library_system.services.availability import SortedIdSet
+from library_system.services.pagination import encode_cursor
+from library_system.storage import BinaryStorage, ShardedStorage, SqliteStorage
+from library_system.storage.binary_storage import binary_to_json, json_to_binary
+
+@pytest.fixture(params=["json", "journal", "sqlite", "journal-lazy", "sqlite-lazy", "journal-columnar",
+                        "binary", "sharded"])
+def open_library(request, tmp_path):
+    """Factory opening a Library on one temporary data directory, per backend"""
+    def factory():
+        data_dir = str(tmp_path)
+        options = {"lazy": request.param.endswith("-lazy"),
+                   "columnar": request.param.endswith("-columnar")}
+        if request.param.startswith("sqlite"):
+            storage = SqliteStorage(os.path.join(data_dir, "library.db"))
+            return Library(data_dir=data_dir, storage=storage, **options)
+        if request.param == "binary":
+            snapshot = os.path.join(data_dir, "library.snap")
+            storage = BinaryStorage(snapshot, snapshot + ".journal", compact_threshold=512)
+            return Library(data_dir=data_dir, storage=storage, **options)
+        if request.param == "sharded":
+            storage = ShardedStorage(os.path.join(data_dir, "shards"), shard_count=2, max_shard_records=2)
+            return Library(data_dir=data_dir, storage=storage, **options)
+        return Library(data_dir=data_dir, journaled=request.param.startswith("journal"), **options)
+    return factory
+
+@pytest.fixture
+def lib(open_library):
+    """A Library backed by an empty temporary data directory"""
+    return open_library()
+
+def test_mutations_survive_reload(open_library):
+    lib = open_library()
+    book = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    gone = lib.add_book("Design Patterns", "Gang of Four", "978-0201633610")
+    admin = lib.add_member("Admin User", "admin@library.com", is_admin=True)
+    member = lib.add_member("John Doe", "john@example.com")
+    lib.borrow_book(member.user_id, book.book_id)
+    lib.borrow_book(member.user_id, gone.book_id)
+    lib.return_book(member.user_id, gone.book_id)
+    lib.remove_book(gone.book_id)
+    
+    reloaded = open_library()
+    assert list(reloaded.books) == [book.book_id]
+    assert reloaded.get_book(book.book_id).borrowed_by == member.user_id
+    assert reloaded.get_member(member.user_id).borrowed_books == [book.book_id]
+    assert reloaded.get_member(admin.user_id).get_role() == "Admin"
+
+def test_removed_member_stays_removed(open_library):
+    lib = open_library()
+    book = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    gone = lib.add_member("Jane Roe", "jane@example.com")
+    kept = lib.add_member("John Doe", "john@example.com")
+    assert lib.remove_member(gone.user_id)
+    lib.borrow_book(kept.user_id, book.book_id)  # Written after the removal
+    
+    reloaded = open_library()
+    assert reloaded.get_member(gone.user_id) is None
+    assert reloaded.get_member_by_email("jane@example.com") is None
+    assert reloaded.get_member(kept.user_id).borrowed_books == [book.book_id]
+
+def test_book_on_loan_cannot_be_removed(open_library):
+    lib = open_library()
+    book = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    member = lib.add_member("John Doe", "john@example.com")
+    lib.borrow_book(member.user_id, book.book_id)
+    assert not lib.remove_book(book.book_id)
+    assert lib.get_book(book.book_id).borrowed_by == member.user_id
+    assert [loan.book_id for loan in lib.get_loans_due_before(float("inf"))] == [book.book_id]
+    
+    # Once returned, both the book and its borrower can go
+    lib.return_book(member.user_id, book.book_id)
+    assert lib.remove_book(book.book_id) and lib.remove_member(member.user_id)
+    reloaded = open_library()
+    assert reloaded.get_book(book.book_id) is None and reloaded.get_member(member.user_id) is None
+
+def test_journaled_mutations_append_instead_of_rewriting(tmp_path):
+    lib = Library(data_dir=str(tmp_path), journaled=True)
+    book = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    member = lib.add_member("John Doe", "john@example.com")
+    assert lib.borrow_book(member.user_id, book.book_id)
+    
+    assert not os.path.exists(lib.BOOKS_FILE)
+    with open(lib.JOURNAL_FILE) as f:
+        assert len(f.readlines()) == 3
+    
+    reloaded = Library(data_dir=str(tmp_path), journaled=True)
+    assert reloaded.get_book(book.book_id).borrowed_by == member.user_id
+    assert reloaded.get_member(member.user_id).borrowed_books == [book.book_id]
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    lib = Library(data_dir=str(tmp_path), journaled=True)
+    book = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    lib.add_book("Design Patterns", "Gang of Four", "978-0201633610")
+    lib.remove_book(book.book_id)
+    lib.compact()
+    
+    assert lib.storage.journal.size() == 0
+    reloaded = Library(data_dir=str(tmp_path), journaled=True)
+    assert [b.title for b in reloaded.list_all_books()] == ["Design Patterns"]
+
+def test_journal_compacts_past_threshold(tmp_path):
+    lib = Library(data_dir=str(tmp_path), journaled=True, compact_threshold=200)
+    for i in range(5):
+        lib.add_book(f"Book {i}", "Author", "isbn")
+    
+    assert lib.storage.journal.size() < 200
+    assert len(Library(data_dir=str(tmp_path), journaled=True).books) == 5
+
+def _scan(lib, keyword, search_type):
+    """Reference substring scan matching the original search_books"""
+    keyword = keyword.lower()
+    return [b for b in lib.books.values() if keyword in getattr(b, search_type).lower()]
+
+def test_indexed_search_matches_substring_scan(lib):
+    lib.add_book("Python Programming", "Guido van Rossum", "978-0134685991")
+    lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    lib.add_book("C++ Primer", "Stanley Lippman", "978-0321714114")
+    removed = lib.add_book("Programming Pearls", "Jon Bentley", "978-0201657883")
+    lib.remove_book(removed.book_id)
+    
+    queries = ["python", "thon prog", "ROBERT C.", "c++", "t c", "code", "", " ",
+               "ram", "pearls", "an", "n c", "xyz"]
+    for keyword in queries:
+        for search_type in ("title", "author"):
+            assert lib.search_books(keyword, search_type) == _scan(lib, keyword, search_type)
+
+def test_prefix_search_mode(lib):
+    book = lib.add_book("Python Programming", "Guido van Rossum", "978-0134685991")
+    lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    
+    assert lib.search_books("prog pyth", match="prefix") == [book]
+    assert lib.search_books("thon", match="prefix") == []
+
+def test_search_index_survives_reload(open_library):
+    lib = open_library()
+    lib.add_book("Design Patterns", "Gang of Four", "978-0201633610")
+    
+    reloaded = open_library()
+    assert [b.title for b in reloaded.search_books("four", "author")] == ["Design Patterns"]
+
+def test_batch_writes_once(lib, monkeypatch):
+    writes = []
+    monkeypatch.setattr(lib.storage, "write", lambda records, books, members: writes.append(records))
+    with lib.batch():
+        book = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+        member = lib.add_member("John Doe", "john@example.com")
+        lib.borrow_book(member.user_id, book.book_id)
+        assert writes == []
+    assert [[op for op, _ in records] for records in writes] == [["add_book", "add_member", "borrow"]]
+
+def test_batch_rolls_back_on_error(lib):
+    kept = lib.add_book("Design Patterns", "Gang of Four", "978-0201633610")
+    member = lib.add_member("John Doe", "john@example.com")
+    with pytest.raises(RuntimeError):
+        with lib.batch():
+            lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+            lib.borrow_book(member.user_id, kept.book_id)
+            lib.remove_book(kept.book_id)
+            raise RuntimeError("abort")
+    
+    assert list(lib.books) == [kept.book_id]
+    assert kept.is_available and member.borrowed_books == []
+    assert lib.search_books("clean") == []
+    assert lib.search_books("design") == [kept]
+
+def test_bulk_add_books_and_members(open_library):
+    lib = open_library()
+    books = lib.add_books([("Clean Code", "Robert C. Martin", "1"),
+                           {"title": "C++ Primer", "author": "Stanley Lippman", "isbn": "2"}])
+    members = lib.add_members([("John Doe", "john@example.com"),
+                               {"name": "Admin", "email": "admin@library.com", "is_admin": True}])
+    assert len(books) == 2 and members[1].get_role() == "Admin"
+    assert lib.add_books([("Only", "Two")]) == []
+    
+    reloaded = open_library()
+    assert len(reloaded.books) == 2 and len(reloaded.members) == 2
+
+def test_streaming_import_reports_rejects(lib, tmp_path):
+    csv_path = tmp_path / "catalog.csv"
+    csv_path.write_text("Title,Author,ISBN\n"
+                        "  Clean   Code ,Robert C. Martin,978-0132350884\n"
+                        ",Nobody,123\n"
+                        "C++ Primer,Stanley Lippman,978-0321714115\n"
+                        "Design Patterns,Gang of Four,978-0201633610\n")
+    jsonl_path = tmp_path / "catalog.jsonl"
+    jsonl_path.write_text('{"title": "SICP", "author": "Abelson", "isbn": "0262510871"}\n'
+                          '{broken\n')
+    
+    chunks = []
+    importer = CatalogImporter(lib, chunk_size=1, progress=lambda r: chunks.append(r.imported))
+    report = importer.import_file(str(csv_path))
+    assert (report.rows_read, report.imported, report.rejected) == (4, 2, 2)
+    assert [row for row, _ in report.rejects] == [3, 4]
+    assert chunks == [1, 2]
+    assert lib.search_books("clean code")[0].title == "Clean Code"
+    
+    report = importer.import_file(str(jsonl_path))
+    assert (report.imported, report.rejected) == (1, 1)
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_lazy_loading_materializes_on_access(tmp_path, backend):
+    def open_lazy():
+        if backend == "sqlite":
+            return Library(data_dir=str(tmp_path), lazy=True,
+                           storage=SqliteStorage(os.path.join(str(tmp_path), "library.db")))
+        return Library(data_dir=str(tmp_path), lazy=True)
+    
+    lib = open_lazy()
+    books = lib.add_books([(f"Book {i}", "Author", str(i)) for i in range(10)])
+    member = lib.add_member("John Doe", "john@example.com")
+    
+    lazy = open_lazy()
+    assert len(lazy.books) == 10 and lazy.books.materialized_count() == 0
+    assert lazy.authenticate_member(member.user_id).name == "John Doe"
+    assert lazy.get_book(books[3].book_id).title == "Book 3"
+    assert lazy.books.materialized_count() == 1
+    assert lazy.add_book("New", "Author", "x").book_id > books[-1].book_id
+
+def test_book_store_views_write_through():
+    store = BookStore()
+    books = [Book(f"Title {i}", "Same Author", str(i)) for i in range(4)]
+    for book in reversed(books):
+        store[book.book_id] = book
+    
+    assert list(store) == [book.book_id for book in books]
+    view = store[books[1].book_id]
+    view.is_available = False
+    view.borrowed_by = 1001
+    assert store[books[1].book_id].to_dict() == dict(books[1].to_dict(), is_available=False, borrowed_by=1001)
+    assert store[books[2].book_id].author is store[books[3].book_id].author
+    
+    del store[books[0].book_id]
+    del store[books[2].book_id]
+    del store[books[3].book_id]
+    assert list(store) == [books[1].book_id] and len(store.ids) == 1
+    assert repr(store[books[1].book_id]).startswith(f"Book(ID: {books[1].book_id}, Title: 'Title 1'")
+
+def test_availability_index_tracks_loans(open_library):
+    lib = open_library()
+    books = lib.add_books([(f"Book {i}", "Author", str(i)) for i in range(5)])
+    member = lib.add_member("John Doe", "john@example.com")
+    lib.borrow_book(member.user_id, books[1].book_id)
+    lib.borrow_book(member.user_id, books[3].book_id)
+    lib.return_book(member.user_id, books[3].book_id)
+    lib.remove_book(books[4].book_id)
+    
+    expected = [books[0].book_id, books[2].book_id, books[3].book_id]
+    for current in (lib, open_library()):
+        assert current.count_available_books() == 3
+        assert [b.book_id for b in current.get_available_books()] == expected
+        assert [b.book_id for b in current.get_available_books(limit=1, after=books[0].book_id)] == expected[1:2]
+
+def test_isbn_normalization():
+    assert is_valid_isbn("0-306-40615-2") and is_valid_isbn("978-0-306-40615-7")
+    assert not is_valid_isbn("978-0-306-40615-8") and not is_valid_isbn("not-an-isbn")
+    assert normalize_isbn("0 306 40615 2") == "9780306406157"
+
+def test_isbn_index_and_duplicates(open_library):
+    lib = open_library()
+    first = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    copy = lib.add_book("Clean Code", "Robert C. Martin", "0132350882", duplicates="flag")
+    assert copy is not None
+    assert lib.add_book("Clean Code", "Robert C. Martin", "9780132350884", duplicates="reject") is None
+    assert lib.add_book("Refactoring", "Martin Fowler", "978-0134757599").book_id == copy.book_id + 1
+    
+    lib.remove_book(first.book_id)
+    for current in (lib, open_library()):
+        assert [b.book_id for b in current.get_books_by_isbn("978 0 13 235088 4")] == [copy.book_id]
+
+def test_member_directory(open_library):
+    lib = open_library()
+    john = lib.add_member("John Doe", "John@Example.com")
+    jane = lib.add_member("Jane Doe", "jane@example.com")
+    admin = lib.add_member("Admin User", "admin@library.com", is_admin=True)
+    assert lib.add_member("Johnny", "JOHN@example.COM ") is None
+    
+    for current in (lib, open_library()):
+        assert current.get_member_by_email("john@EXAMPLE.com").user_id == john.user_id
+        assert [m.user_id for m in current.find_members("j")] == [jane.user_id, john.user_id]
+        assert [m.user_id for m in current.find_members("DOE")] == [john.user_id, jane.user_id]
+        assert [m.user_id for m in current.find_members("")] == [admin.user_id, jane.user_id, john.user_id]
+        assert current.find_members("jo", limit=1)[0].user_id == john.user_id
+
+def test_loan_ledger_orders_overdue_loans(open_library):
+    lib = open_library()
+    books = lib.add_books([(f"Book {i}", "Author", str(i)) for i in range(4)])
+    member = lib.add_member("John Doe", "john@example.com")
+    for book, due_at in zip(books, (300.0, 100.0, 200.0, 5e12)):
+        lib.borrow_book(member.user_id, book.book_id, due_at=due_at)
+    lib.return_book(member.user_id, books[2].book_id)
+    
+    for current in (lib, open_library()):
+        assert current.get_member(member.user_id).has_borrowed(books[0].book_id)
+        assert [l.book_id for l in current.get_overdue_loans()] == [books[1].book_id, books[0].book_id]
+        assert [l.book_id for l in current.get_loans_due_before(250.0)] == [books[1].book_id]
+        assert current.get_overdue_loans(limit=1)[0].due_at == 100.0
+        assert current.get_loan(books[3].book_id).is_overdue() is False
+        assert current.get_loan(books[2].book_id) is None
+
+def test_batch_rollback_restores_loan(lib):
+    book = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    member = lib.add_member("John Doe", "john@example.com")
+    lib.borrow_book(member.user_id, book.book_id, due_at=100.0)
+    with pytest.raises(RuntimeError):
+        with lib.batch():
+            lib.return_book(member.user_id, book.book_id)
+            raise RuntimeError("abort")
+    assert lib.get_loan(book.book_id).due_at == 100.0
+    assert [l.book_id for l in lib.get_overdue_loans()] == [book.book_id]
+
+@pytest.mark.parametrize("backend", ["journal", "sqlite", "json-columnar"])
+def test_threadsafe_borrow_return_stress(tmp_path, backend):
+    def open_threadsafe():
+        data_dir = str(tmp_path)
+        if backend == "sqlite":
+            storage = SqliteStorage(os.path.join(data_dir, "library.db"))
+            return Library(data_dir=data_dir, storage=storage, threadsafe=True)
+        return Library(data_dir=data_dir, journaled=backend == "journal",
+                       columnar=backend.endswith("-columnar"), threadsafe=True)
+    
+    lib = open_threadsafe()
+    books = lib.add_books([(f"Book {i}", "Author", str(i)) for i in range(12)])
+    members = lib.add_members([(f"Member {i}", f"m{i}@example.com") for i in range(6)])
+    threads = 8
+    barrier = threading.Barrier(threads)
+    racers = []
+    
+    def worker(seed):
+        rng = random.Random(seed)
+        member = members[seed % len(members)]
+        barrier.wait()
+        racers.append(lib.borrow_book(member.user_id, books[0].book_id))
+        for _ in range(150):
+            book = rng.choice(books[1:])
+            if rng.random() < 0.5:
+                lib.borrow_book(member.user_id, book.book_id)
+            else:
+                lib.return_book(member.user_id, book.book_id)
+        if seed % 2:
+            lib.save_data()
+    
+    pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    
+    assert racers.count(True) == 1
+    for current in (lib, open_threadsafe()):
+        holders = {}
+        for member in current.list_all_members():
+            for book_id in member.borrowed_books:
+                assert book_id not in holders
+                holders[book_id] = member.user_id
+        for book in current.list_all_books():
+            assert book.is_available == (book.book_id not in holders)
+            assert book.borrowed_by == holders.get(book.book_id)
+        assert current.count_available_books() == len(books) - len(holders)
+        assert {loan.book_id for loan in current.get_loans_due_before(float("inf"))} == set(holders)
+
+@pytest.mark.parametrize("backend", ["journal", "sqlite"])
+def test_group_commit_coalesces_writes(tmp_path, backend):
+    def open_group_commit(**options):
+        data_dir = str(tmp_path)
+        if backend == "sqlite":
+            storage = SqliteStorage(os.path.join(data_dir, "library.db"))
+            return Library(data_dir=data_dir, storage=storage, **options)
+        return Library(data_dir=data_dir, journaled=True, **options)
+    
+    lib = open_group_commit(group_commit=60.0, group_commit_ops=10)
+    calls = []
+    write = lib.storage.write
+    lib.storage.write = lambda records, *args: calls.append(len(records)) or write(records, *args)
+    books = lib.add_books([(f"Book {i}", "Author", str(i)) for i in range(4)])
+    member = lib.add_member("John Doe", "john@example.com")
+    for book in books[:3]:
+        lib.borrow_book(member.user_id, book.book_id)
+    assert calls == [] and lib.write_stats()["pending"] == 8
+    assert lib.flush() == 8 and calls == [8]
+    
+    for book in books[:3]:
+        lib.return_book(member.user_id, book.book_id)
+    for book in books:
+        lib.borrow_book(member.user_id, book.book_id)
+    for book in books[:3]:
+        lib.return_book(member.user_id, book.book_id)
+    deadline = time.time() + 5
+    while lib.write_stats()["flushes"] < 2 and time.time() < deadline:
+        time.sleep(0.01)  # 10 pending mutations trigger the writer before the window ends
+    assert calls == [8, 10] and lib.write_stats()["largest_flush"] == 10
+    
+    lib.borrow_book(member.user_id, books[0].book_id)
+    lib.close()  # Writes the last pending mutation
+    assert calls == [8, 10, 1] and lib.writer is None
+    reloaded = open_group_commit()
+    assert reloaded.get_member(member.user_id).borrowed_books == [books[3].book_id, books[0].book_id]
+
+def test_group_commit_flushes_on_exit(tmp_path):
+    script = (
+        "import sys; sys.path.insert(0, sys.argv[2])\n"
+        "from library_system.services import Library\n"
+        "lib = Library(data_dir=sys.argv[1], journaled=True, group_commit=60.0)\n"
+        "lib.add_book('Clean Code', 'Robert C. Martin', '978-0132350884')\n"
+    )
+    repo = os.path.dirname(os.path.abspath(__file__))
+    subprocess.run([sys.executable, "-c", script, str(tmp_path), repo], check=True)
+    assert [b.title for b in Library(data_dir=str(tmp_path), journaled=True).list_all_books()] == ["Clean Code"]
+
+def test_shared_mode_reads_only_new_records(tmp_path):
+    a = Library(data_dir=str(tmp_path), shared=True)
+    b = Library(data_dir=str(tmp_path), shared=True)
+    loads = []
+    load = b.storage.load
+    b.storage.load = lambda: loads.append(1) or load()
+    
+    book = a.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    member = a.add_member("John Doe", "john@example.com")
+    assert b.get_book(book.book_id).title == "Clean Code"
+    assert b.borrow_book(member.user_id, book.book_id)
+    assert not a.borrow_book(member.user_id, book.book_id)  # a caught up before checking
+    assert a.get_member(member.user_id).borrowed_books == [book.book_id]
+    
+    a.compact()  # b is now one generation behind and reads the rotated journal
+    a.return_book(member.user_id, book.book_id)
+    assert b.get_book(book.book_id).is_available and loads == []
+    
+    a.compact()
+    a.borrow_book(member.user_id, book.book_id)
+    a.compact()  # Two generations behind: b reloads from scratch
+    assert b.get_member(member.user_id).borrowed_books == [book.book_id] and loads == [1]
+    second = b.add_book("Design Patterns", "Gang of Four", "978-0201633610")
+    assert second.book_id != book.book_id and a.get_book(second.book_id).title == "Design Patterns"
+
+def test_shared_mode_keeps_other_processes_holds(tmp_path):
+    a = Library(data_dir=str(tmp_path), shared=True)
+    b = Library(data_dir=str(tmp_path), shared=True)
+    first, second, third, spare = a.add_books([(f"Book {i}", "Author", str(i)) for i in range(4)])
+    owner, waiting, leaving, late = a.add_members([(f"Member {i}", f"m{i}@example.com") for i in range(4)])
+    for book in (first, second, third):
+        a.borrow_book(owner.user_id, book.book_id)
+    a.place_hold(leaving.user_id, third.book_id)
+    
+    # Each of a's changes below comes after a hold b placed, which a must not write over
+    assert b.place_hold(waiting.user_id, first.book_id) == 1
+    assert a.remove_member(leaving.user_id)
+    assert b.place_hold(waiting.user_id, second.book_id) == 1
+    assert a.remove_book(spare.book_id)
+    assert b.place_hold(late.user_id, first.book_id) == 2
+    assert a.return_book(owner.user_id, third.book_id) and a.borrow_book(owner.user_id, third.book_id)
+    
+    reloaded = Library(data_dir=str(tmp_path), journaled=True)
+    assert reloaded.get_holds(waiting.user_id) == [(first.book_id, 1), (second.book_id, 1)]
+    assert reloaded.get_hold_queue(first.book_id) == [waiting.user_id, late.user_id]
+    assert reloaded.get_holds(leaving.user_id) == []
+
+def test_hold_hand_off_never_lends_to_a_removed_member(tmp_path):
+    lib = Library(data_dir=str(tmp_path), threadsafe=True)
+    book = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    owner = lib.add_member("John Doe", "john@example.com")
+    holder = lib.add_member("Jane Roe", "jane@example.com")
+    lib.borrow_book(owner.user_id, book.book_id)
+    lib.place_hold(holder.user_id, book.book_id)
+    
+    # Remove the holder while the return is handing the book over
+    removed = []
+    remover = threading.Thread(target=lambda: removed.append(lib.remove_member(holder.user_id)))
+    pop_next = lib.holds.pop_next
+    
+    def pop_then_race(book_id):
+        member_id = pop_next(book_id)
+        remover.start()
+        time.sleep(0.05)
+        return member_id
+    
+    lib.holds.pop_next = pop_then_race
+    assert lib.return_book(owner.user_id, book.book_id)
+    remover.join()
+    borrower = lib.get_book(book.book_id).borrowed_by
+    assert borrower is None or lib.get_member(borrower) is not None
+    assert removed == [borrower is None]
+
+def test_shared_mode_reads_after_another_process_compacts(tmp_path):
+    with pytest.raises(ValueError):
+        Library(data_dir=str(tmp_path), shared=True, lazy=True)
+    a = Library(data_dir=str(tmp_path), shared=True)
+    b = Library(data_dir=str(tmp_path), shared=True)
+    books = a.add_books([(f"Book {i}", "Author", str(i)) for i in range(4)])
+    a.compact()
+    assert [b.get_book(book.book_id).title for book in books] == [book.title for book in books]
+    
+    # Rewriting books.json shifts every later record; b must not read at stale positions
+    a.remove_book(books[0].book_id)
+    a.compact()
+    assert b.get_book(books[0].book_id) is None
+    assert [b.get_book(book.book_id).title for book in books[1:]] == [book.title for book in books[1:]]
+    a.compact()
+    a.compact()  # b is now two generations behind and reloads
+    assert [book.book_id for book in b.list_all_books()] == [book.book_id for book in books[1:]]
+
+def _shared_worker(data_dir, member_id, book_ids, seed, barrier, results):
+    """Worker process for test_multi_process_borrow_return"""
+    lib = Library(data_dir=data_dir, shared=True, compact_threshold=4096)
+    barrier.wait()
+    won = lib.borrow_book(member_id, book_ids[0])
+    rng = random.Random(seed)
+    for _ in range(60):
+        book_id = rng.choice(book_ids[1:])
+        if rng.random() < 0.5:
+            lib.borrow_book(member_id, book_id)
+        else:
+            lib.return_book(member_id, book_id)
+    results.put((member_id, won, lib.get_member(member_id).borrowed_books))
+    lib.close()
+
+def test_multi_process_borrow_return(tmp_path):
+    data_dir = str(tmp_path)
+    lib = Library(data_dir=data_dir, shared=True)
+    books = lib.add_books([(f"Book {i}", "Author", str(i)) for i in range(8)])
+    members = lib.add_members([(f"Member {i}", f"m{i}@example.com") for i in range(4)])
+    lib.close()
+    
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(len(members))
+    results = context.Queue()
+    workers = [context.Process(target=_shared_worker,
+                               args=(data_dir, m.user_id, [b.book_id for b in books], i, barrier, results))
+               for i, m in enumerate(members)]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+    
+    assert sum(won for _, won, _ in outcomes) == 1
+    reloaded = Library(data_dir=data_dir, journaled=True)
+    held = {}
+    for member_id, _, borrowed in outcomes:
+        assert reloaded.get_member(member_id).borrowed_books == borrowed
+        for book_id in borrowed:
+            assert book_id not in held
+            held[book_id] = member_id
+    for book in reloaded.list_all_books():
+        assert book.borrowed_by == held.get(book.book_id)
+    with open(os.path.join(data_dir, "library.lock")) as f:
+        assert int(f.read()) > 0  # The journal was compacted while workers ran
+
+def test_metrics_count_calls_errors_and_bytes(tmp_path):
+    plain = Library(data_dir=str(tmp_path / "plain"))
+    assert plain.metrics is None and "borrow_book" not in vars(plain)  # Nothing wrapped
+    
+    metrics = Metrics(slow_threshold=0.0, slow_log=str(tmp_path / "slow.log"))
+    lib = Library(data_dir=str(tmp_path / "lib"), journaled=True, metrics=metrics)
+    book = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    member = lib.add_member("John Doe", "john@example.com")
+    assert lib.borrow_book(member.user_id, book.book_id)
+    assert not lib.borrow_book(member.user_id, book.book_id)
+    lib.save_data()
+    
+    ops = metrics.snapshot()["operations"]
+    assert ops["load_data"]["calls"] == 1 and ops["save_data"]["calls"] == 1
+    assert ops["borrow_book"]["calls"] == 2 and ops["borrow_book"]["errors"] == 1
+    assert "get_member" not in ops  # Called only from inside borrow_book
+    assert ops["storage.write"]["calls"] == 3 and ops["storage.save"]["calls"] == 1
+    journal_bytes = os.path.getsize(lib.JOURNAL_FILE) if os.path.exists(lib.JOURNAL_FILE) else 0
+    assert metrics.bytes_written() >= os.path.getsize(lib.BOOKS_FILE) + journal_bytes > 0
+    
+    text = metrics.to_prometheus()
+    assert 'library_operation_seconds_count{op="borrow_book"} 2' in text
+    assert 'library_operation_errors_total{op="borrow_book"} 1' in text
+    assert 'library_operation_seconds_bucket{op="borrow_book",le="+Inf"} 2' in text
+    with open(tmp_path / "slow.log") as f:
+        assert len(f.readlines()) == metrics.slow_count > 0
+    metrics.write(str(tmp_path / "metrics.json"))
+    with open(tmp_path / "metrics.json") as f:
+        assert json.load(f)["operations"]["add_book"]["calls"] == 1
+
+def test_sorted_id_set_splits_chunks():
+    ids = SortedIdSet()
+    ids.CHUNK_SIZE = 4
+    ids.rebuild_ids(range(0, 40, 2))
+    expected = set(range(0, 40, 2))
+    rng = random.Random(7)
+    for _ in range(500):
+        record_id = rng.randrange(-5, 45)
+        if rng.random() < 0.5:
+            ids.add(record_id)
+            expected.add(record_id)
+        else:
+            ids.discard(record_id)
+            expected.discard(record_id)
+    expected = sorted(expected)
+    assert list(ids) == expected and len(ids) == len(expected)
+    assert all(len(chunk) <= 4 for chunk in ids.chunks)
+    assert ids.page(after=10, limit=3) == [i for i in expected if i > 10][:3]
+    assert ids[5:9] == expected[5:9] and ids[-1] == expected[-1]
+    assert (11 in ids) == (11 in expected)
+
+def test_cursor_pagination_is_stable(lib):
+    books = lib.add_books([(f"Python Book {i}", "Author", str(i)) for i in range(25)])
+    ids = [book.book_id for book in books]
+    first = lib.page_books(10)
+    assert [b.book_id for b in first] == ids[:10] and first.prev_cursor is None and first.total == 25
+    second = lib.page_books(10, first.next_cursor)
+    assert [b.book_id for b in second] == ids[10:20]
+    
+    lib.remove_book(ids[0])  # Rows before the cursor do not shift later pages
+    lib.add_book("Python Book 25", "Author", "25")
+    third = lib.page_books(10, second.next_cursor)
+    assert [b.book_id for b in third] == ids[20:] + [third.items[-1].book_id] and third.next_cursor is None
+    back = lib.page_books(10, third.prev_cursor)
+    assert [b.book_id for b in back] == ids[10:20]
+    assert [b.book_id for b in lib.page_books(10, back.prev_cursor)] == ids[1:11]  # Filled from the start
+    
+    lib.borrow_book(lib.add_member("John Doe", "john@example.com").user_id, ids[1])
+    assert ids[1] not in [b.book_id for b in lib.iter_available_books(batch_size=3)]
+    assert [b.book_id for b in lib.iter_books(batch_size=7)] == sorted(lib.books)
+    page = lib.page_search_books("python", page_size=20)
+    assert len(page) == 20 and len(lib.page_search_books("python", cursor=page.next_cursor)) == 5
+    assert len(list(lib.iter_search_books("book 2"))) == 7
+    with pytest.raises(ValueError):
+        lib.page_available_books(10, first.next_cursor)  # Cursor of another listing
+    with pytest.raises(ValueError):
+        lib.page_books(10, "not-a-cursor")
+    for key in ("10", 10.5, True, [1, 2]):  # Well-formed, but not a book ID
+        with pytest.raises(ValueError):
+            lib.page_books(10, encode_cursor("books", "next", key))
+    with pytest.raises(ValueError):  # A fuzzy search cursor on a substring search
+        lib.page_search_books("python", cursor=encode_cursor("search", "next", [0, ids[2]]))
+
+def test_member_pages_in_name_order(lib):
+    lib.add_members([("Carol King", "c@example.com"), ("alice Smith", "a@example.com"),
+                     ("Bob Smith", "b@example.com"), ("Dave Jones", "d@example.com")])
+    page = lib.page_members(page_size=3)
+    assert [m.name for m in page] == ["alice Smith", "Bob Smith", "Carol King"]
+    assert [m.name for m in lib.page_members(page_size=3, cursor=page.next_cursor)] == ["Dave Jones"]
+    assert [m.name for m in lib.page_members("smith")] == ["alice Smith", "Bob Smith"]
+    assert [m.name for m in lib.iter_members(batch_size=1)] == [m.name for m in page] + ["Dave Jones"]
+
+def test_fuzzy_search_ranks_typos(lib):
+    lib.add_books([("Clean Code", "Robert C. Martin", "978-0132350884"),
+                   ("Clean Architecture", "Robert C. Martin", "978-0134494166"),
+                   ("Python Programming", "Guido van Rossum", "978-0134685991"),
+                   ("Code Complete", "Steve McConnell", "978-0735619678")])
+    ranked = lib.fuzzy_search_books("Clen Code", limit=2)
+    assert [book.title for book, _ in ranked] == ["Clean Code", "Code Complete"]
+    assert ranked[0][1] > ranked[1][1]
+    assert [b.title for b in lib.search_books("Rossum Guido", "author", "fuzzy")] == ["Python Programming"]
+    assert lib.fuzzy_search_books("zzzz qqqq") == []
+    
+    # The trigram index follows later mutations
+    added = lib.add_book("Refactoring", "Martin Fowler", "978-0134757599")
+    assert lib.fuzzy_search_books("Refactorng")[0][0].book_id == added.book_id
+    lib.remove_book(added.book_id)
+    assert all(book.book_id != added.book_id for book, _ in lib.fuzzy_search_books("Refactorng"))
+    page = lib.page_search_books("clean", match="fuzzy", page_size=1)
+    assert page.items[0].title in ("Clean Code", "Clean Architecture")
+    assert lib.page_search_books("clean", match="fuzzy", page_size=1, cursor=page.next_cursor).items != page.items
+
+def test_search_cache_hits_and_invalidation(tmp_path, monkeypatch):
+    lib = Library(data_dir=str(tmp_path), search_cache_size=2)
+    book = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    member = lib.add_member("John Doe", "john@example.com")
+    assert lib.search_books("clean") == [book]
+    assert lib.search_books("CLEAN") == [book]  # Same normalized query
+    assert lib.search_cache_stats()["hits"] == 1
+    
+    lib.borrow_book(member.user_id, book.book_id)  # Availability is read live from the Book
+    assert lib.search_books("clean")[0].is_available is False
+    assert lib.search_cache_stats()["hits"] == 2
+    
+    second = lib.add_book("Clean Architecture", "Robert C. Martin", "978-0134494166")
+    assert lib.search_books("clean") == [book, second]
+    lib.remove_book(second.book_id)
+    assert lib.search_books("clean") == [book]
+    stats = lib.search_cache_stats()
+    assert stats["hits"] == 2 and stats["stale"] == 2
+    
+    lib.search_books("code", "title")
+    lib.search_books("martin", "author")  # Evicts "clean", the least recently used
+    lib.search_books("clean")
+    assert lib.search_cache_stats()["evictions"] >= 1 and len(lib.search_cache) == 2
+    
+    lib.search_cache.ttl = 60
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    lib.search_books("robert", "author")
+    clock[0] += 61
+    hits = lib.search_cache_stats()["hits"]
+    lib.search_books("robert", "author")
+    assert lib.search_cache_stats()["hits"] == hits  # Expired
+    
+    assert Library(data_dir=str(tmp_path), search_cache_size=0).search_cache_stats() is None
+
+def test_binary_snapshot_round_trips_through_json(tmp_path):
+    lib = Library(data_dir=str(tmp_path))
+    book = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    lib.add_book("Clean Architecture", "Robert C. Martin", "978-0134494166")
+    lib.add_book("Naïve Bayes — ünïcode", "Ærøskøbing", "0")
+    admin = lib.add_member("Admin User", "admin@library.com", is_admin=True)
+    member = lib.add_member("John Doe", "john@example.com")
+    lib.borrow_book(member.user_id, book.book_id)
+    books_file, members_file = lib.BOOKS_FILE, lib.MEMBERS_FILE
+    snapshot = os.path.join(str(tmp_path), "library.snap")
+    
+    assert json_to_binary(books_file, members_file, snapshot) == (3, 2)
+    expected_books = {b.book_id: b.to_dict() for b in lib.books.values()}
+    expected_members = {m.user_id: m.to_dict() for m in lib.members.values()}
+    books, members = BinaryStorage(snapshot).load()
+    assert {b.book_id: b.to_dict() for b in books} == expected_books
+    assert {m.user_id: m.to_dict() for m in members} == expected_members
+    
+    os.remove(books_file)
+    os.remove(members_file)
+    assert binary_to_json(snapshot, books_file, members_file) == (3, 2)
+    reloaded = Library(data_dir=str(tmp_path))
+    assert reloaded.get_book(book.book_id).borrowed_by == member.user_id
+    assert reloaded.get_member(admin.user_id).get_role() == "Admin"
+    
+    with open(snapshot, "r+b") as f:
+        f.truncate(40)
+    with pytest.raises(ValueError):
+        BinaryStorage(snapshot).load()
+
+def test_sharded_storage_rewrites_only_dirty_shards(tmp_path):
+    shard_dir = os.path.join(str(tmp_path), "shards")
+    lib = Library(data_dir=str(tmp_path), storage=ShardedStorage(shard_dir, shard_count=4))
+    books = lib.add_books([(f"Book {i}", "Author", str(i)) for i in range(20)])
+    member = lib.add_member("John Doe", "john@example.com")
+    assert lib.storage.shards_written == 9  # Every shard of the new layout, then one member shard
+    
+    lib.borrow_book(member.user_id, books[5].book_id)
+    assert lib.storage.shards_written == 11  # One book shard and one member shard
+    lib.save_data()
+    assert lib.storage.shards_written == 11  # Nothing changed since the last write
+    
+    # Loading in parallel, then asking for more shards rebalances the files
+    reloaded = Library(data_dir=str(tmp_path), storage=ShardedStorage(shard_dir, shard_count=8, load_workers=4))
+    assert list(reloaded.books) == [book.book_id for book in books]
+    assert reloaded.get_book(books[5].book_id).borrowed_by == member.user_id
+    assert reloaded.storage.shard_count == 8
+    assert sorted(os.listdir(shard_dir)) == sorted(
+        ["manifest.json"] + [f"{kind}-{i:04d}-of-0008.json" for kind in ("books", "members") for i in range(8)])
+    
+    # Growing past max_shard_records doubles the shard count until shards hold 2 on average
+    reloaded.storage.max_shard_records = 4
+    reloaded.add_books([(f"More {i}", "Author", f"m{i}") for i in range(20)])
+    assert reloaded.storage.shard_count == 32
+    assert len(Library(data_dir=str(tmp_path), storage=ShardedStorage(shard_dir)).books) == 40
+
+def test_id_allocator_reserves_disjoint_blocks(tmp_path):
+    path = os.path.join(str(tmp_path), "ids.json")
+    first, second = IdAllocator(path, block_size=10), IdAllocator(path, block_size=10)
+    minted = []
+    
+    def mint(allocator):
+        for _ in range(100):
+            minted.append(allocator.allocate("book"))
+    
+    threads = [threading.Thread(target=mint, args=(allocator,)) for allocator in (first, second) * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(minted)) == 400 and min(minted) == 1000
+    assert first.blocks_reserved + second.blocks_reserved == 40
+    assert list(first.allocate_many("book", 50)) == list(range(1400, 1450))
+    assert first.allocate("user") == 1000  # Kinds are independent
+    
+    # A data directory written before ids.json existed seeds the allocator
+    lib = Library(data_dir=str(tmp_path / "data"))
+    book = lib.add_book("Clean Code", "Robert C. Martin", "978-0132350884")
+    os.remove(lib.IDS_FILE)
+    reloaded = Library(data_dir=str(tmp_path / "data"))
+    assert reloaded.add_book("Refactoring", "Martin Fowler", "978-0134757599").book_id == book.book_id + 1
+    
+    with pytest.raises(RuntimeError):
+        with reloaded.batch():
+            rolled_back = reloaded.add_book("Rolled Back", "Nobody", "0")
+            raise RuntimeError("abort")
+    assert reloaded.add_book("Next", "Somebody", "1").book_id > rolled_back.book_id  # Never reused
+    reloaded.clear_all_data()
+    assert reloaded.add_member("John Doe", "john@example.com").user_id == 1000
+
+def test_circulation_reports(open_library):
+    lib = open_library()
+    books = lib.add_books([("Dune", "Frank Herbert", "1"), ("Dune", "Frank Herbert", "2"),
+                           ("Emma", "Jane Austen", "3"), ("Persuasion", "Jane Austen", "4"),
+                           ("Ubik", "Philip K. Dick", "5")])
+    alice = lib.add_member("Alice", "alice@example.com")
+    bob = lib.add_member("Bob", "bob@example.com")
+    for book in books[:2]:
+        lib.borrow_book(alice.user_id, book.book_id)
+        lib.return_book(alice.user_id, book.book_id)
+    lib.borrow_book(alice.user_id, books[0].book_id)
+    lib.borrow_book(alice.user_id, books[2].book_id)
+    lib.borrow_book(bob.user_id, books[4].book_id, due_at=time.time() - 60)
+    with pytest.raises(RuntimeError):
+        with lib.batch():
+            lib.borrow_book(bob.user_id, books[3].book_id)
+            raise RuntimeError("abort")  # Rolled-back borrows are not counted
+    
+    report = lib.circulation_report(k=2)
+    assert report["most_borrowed_titles"] == [("Dune", 3), ("Emma", 1)]
+    assert report["author_utilization"] == [("Philip K. Dick", 1, 1), ("Frank Herbert", 1, 2)]
+    assert report["most_active_members"] == [(alice.user_id, "Alice", 2), (bob.user_id, "Bob", 1)]
+    
+    assert lib.adhoc_report("author", "on_loan") == [("Frank Herbert", 1), ("Jane Austen", 1),
+                                                     ("Philip K. Dick", 1)]
+    assert lib.adhoc_report("title", "available") == [("Dune", 1), ("Persuasion", 1)]
+    assert lib.adhoc_report("member", "overdue") == [((bob.user_id, "Bob"), 1)]
+    with pytest.raises(ValueError):
+        lib.adhoc_report("isbn")
+    
+    # Lifetime counts are logged as borrows commit, before any save or close
+    assert CirculationStats(lib.CIRCULATION_FILE).most_borrowed_titles(1) == [("Dune", 3)]
+    
+    # ... and folded into the file on save; current loans are recounted on load
+    lib.remove_book(books[1].book_id)
+    lib.save_data()
+    assert not os.path.exists(lib.circulation.log_path)
+    reloaded = open_library()
+    report = reloaded.circulation_report()
+    assert report["most_borrowed_titles"][0] == ("Dune", 3)
+    assert ("Frank Herbert", 1, 1) in report["author_utilization"]
+    assert reloaded.adhoc_report("author", "all", k=1) == [("Jane Austen", 2)]
+
+def test_borrows_are_counted_once_written(tmp_path, monkeypatch):
+    lib = Library(data_dir=str(tmp_path), journaled=True, group_commit=60.0)
+    book = lib.add_book("Dune", "Frank Herbert", "1")
+    member = lib.add_member("Alice", "alice@example.com")
+    lib.flush()
+    lib.borrow_book(member.user_id, book.book_id)
+    assert lib.circulation.most_borrowed_titles(1) == []  # Not flushed yet, so not counted yet
+    assert not os.path.exists(lib.circulation.log_path)
+    lib.flush()
+    assert lib.circulation.most_borrowed_titles(1) == [("Dune", 1)]
+    assert CirculationStats(lib.CIRCULATION_FILE).most_borrowed_titles(1) == [("Dune", 1)]
+    
+    def fail(records, books, members):
+        raise OSError("disk full")
+    monkeypatch.setattr(lib.storage, "write", fail)
+    lib.return_book(member.user_id, book.book_id)
+    lib.borrow_book(member.user_id, book.book_id)
+    lib.flush()  # A borrow that was never saved is not counted
+    assert lib.circulation.most_borrowed_titles(1) == [("Dune", 1)]
+    lib.close()
+
+def test_hold_queues_hand_off_on_return(open_library):
+    lib = open_library()
+    book, other = lib.add_books([("Dune", "Frank Herbert", "1"), ("Emma", "Jane Austen", "2")])
+    alice, bob, carol = (lib.add_member(name, f"{name}@example.com") for name in ("alice", "bob", "carol"))
+    lib.borrow_book(alice.user_id, book.book_id)
+    
+    assert lib.place_hold(bob.user_id, other.book_id) is None  # Available: borrow it instead
+    assert lib.place_hold(alice.user_id, book.book_id) is None  # Already has it
+    assert lib.place_hold(bob.user_id, book.book_id) == 1
+    assert lib.place_hold(bob.user_id, book.book_id) is None  # Already in line
+    assert lib.place_hold(carol.user_id, book.book_id) == 2
+    assert lib.get_hold_queue(book.book_id) == [bob.user_id, carol.user_id]
+    
+    # Queues survive a restart
+    reloaded = open_library()
+    assert reloaded.get_hold_queue(book.book_id) == [bob.user_id, carol.user_id]
+    assert reloaded.get_holds(carol.user_id) == [(book.book_id, 2)]
+    
+    # A return lends the book to the first holder, and a rolled-back return restores the queue
+    with pytest.raises(RuntimeError):
+        with reloaded.batch():
+            reloaded.return_book(alice.user_id, book.book_id)
+            assert reloaded.get_book(book.book_id).borrowed_by == bob.user_id
+            raise RuntimeError("abort")
+    assert reloaded.get_book(book.book_id).borrowed_by == alice.user_id
+    assert reloaded.get_hold_queue(book.book_id) == [bob.user_id, carol.user_id]
+    
+    assert reloaded.return_book(alice.user_id, book.book_id)
+    assert reloaded.get_book(book.book_id).borrowed_by == bob.user_id
+    assert reloaded.get_member(bob.user_id).has_borrowed(book.book_id)
+    assert reloaded.get_holds(carol.user_id) == [(book.book_id, 1)]
+    
+    # Holders removed from the library are skipped
+    reloaded.add_member("dave", "dave@example.com")
+    dave = reloaded.get_member_by_email("dave@example.com")
+    assert reloaded.place_hold(dave.user_id, book.book_id) == 2
+    assert reloaded.remove_member(carol.user_id)
+    assert reloaded.get_hold_queue(book.book_id) == [dave.user_id]
+    assert reloaded.cancel_hold(dave.user_id, book.book_id)
+    assert not reloaded.cancel_hold(dave.user_id, book.book_id)
+    assert reloaded.return_book(bob.user_id, book.book_id)
+    assert reloaded.get_book(book.book_id).is_available
+    
+    final = open_library()
+    assert final.get_hold_queue(book.book_id) == [] and final.get_book(book.book_id).is_available
+
+def test_hold_hand_off_is_written_with_the_return(open_library, monkeypatch):
+    lib = open_library()
+    book = lib.add_book("Dune", "Frank Herbert", "1")
+    alice, bob, carol = lib.add_members([("Alice", "alice@example.com"), ("Bob", "bob@example.com"),
+                                         ("Carol", "carol@example.com")])
+    lib.borrow_book(alice.user_id, book.book_id)
+    lib.place_hold(bob.user_id, book.book_id)
+    lib.place_hold(carol.user_id, book.book_id)
+    
+    # A rolled-back hand-off leaves the loan, the queue and the stored data as they were
+    with pytest.raises(RuntimeError):
+        with lib.batch():
+            lib.return_book(alice.user_id, book.book_id)
+            lib.cancel_hold(carol.user_id, book.book_id)
+            raise RuntimeError("abort")
+    for current in (lib, open_library()):
+        assert current.get_book(book.book_id).borrowed_by == alice.user_id
+        assert current.get_hold_queue(book.book_id) == [bob.user_id, carol.user_id]
+        assert current.get_holds(bob.user_id) == [(book.book_id, 1)]
+    
+    # The return, the hold it serves and the new loan reach storage in one write
+    writes = []
+    write = lib.storage.write
+    def recording_write(records, books, members):
+        writes.append([op for op, _ in records])
+        write(records, books, members)
+    monkeypatch.setattr(lib.storage, "write", recording_write)
+    assert lib.return_book(alice.user_id, book.book_id)
+    assert writes == [["return", "cancel_hold", "borrow"]]
+    reloaded = open_library()
+    assert reloaded.get_book(book.book_id).borrowed_by == bob.user_id
+    assert reloaded.get_hold_queue(book.book_id) == [carol.user_id]
+    assert reloaded.get_holds(bob.user_id) == [] and reloaded.get_holds(carol.user_id) == [(book.book_id, 1)]